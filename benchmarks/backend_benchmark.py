@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Benchmark that compares the translation throughput of the backends on a template dominated by loops.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'engine'))
+
+import compilation  # noqa: E402
+import symbol_table  # noqa: E402
+import translator  # noqa: E402
+
+TEMPLATE = ("Report for {{ variable1 }}\n"
+            "{{ #loop array1 row }}\n"
+            "row {{ row }}:{{ #loop array2 column }} {{ row }}.{{ column }}{{ /loop }}\n"
+            "{{ /loop }}\n"
+            "{{ variable1 }} out\n")
+
+
+class CountingSink:
+    """
+    Sink that counts the characters of the translated chunks.
+    """
+
+    def __init__(self):
+        """
+        Constructor that initializes the object arguments.
+        """
+        self.size = 0
+
+    def print(self, chunk):
+        """
+        Counts the characters of the chunk.
+        :param chunk: String with the translated text.
+        """
+        self.size += len(chunk)
+
+
+def main():
+    """
+    Main function of the module. Executes the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Compares the translation throughput of the backends.")
+    parser.add_argument("-n", "--items", type=int, default=300, help="Number of items of each array.")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Number of repetitions.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        template_path = os.path.join(temp_dir, "template.txt")
+        variables_path = os.path.join(temp_dir, "variables.txt")
+        with open(template_path, 'w') as f:
+            f.write(TEMPLATE)
+        items = ", ".join('"{}"'.format(idx) for idx in range(args.items))
+        with open(variables_path, 'w') as f:
+            f.write('"variable1": "hello"\n"array1": [{0}]\n"array2": [{0}]\n'.format(items))
+        compiled_template = compilation.CompiledTemplate.compile(template_path)
+        var_mgr = symbol_table.VariableManager(variables_path)
+        var_mgr.parse()
+
+    for name, backend in sorted(translator.BACKENDS.items()):
+        renderer = backend(compiled_template, None)
+        best = None
+        for _ in range(args.repeat):
+            sink = CountingSink()
+            start = time.perf_counter()
+            renderer.render(var_mgr, sink)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print("{:<8} {:>10} chars {:.3f} s {:8.1f} MB/s".format(name, sink.size, best, sink.size / best / 1e6))
+
+
+if __name__ == '__main__':
+    main()
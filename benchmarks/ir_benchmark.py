@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Benchmark that compares the memory and the translation time of the tree of elements against the intermediate
+representation.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'engine'))
+
+import compilation  # noqa: E402
+import intermediate_representation  # noqa: E402
+import symbol_table  # noqa: E402
+
+PARAGRAPH = ("Dear {{ variable1 }}, {{ #loop array1 item }}\n"
+             "- {{ item }} and {{ variable2 }}\n"
+             "{{ /loop }}\n"
+             "See you {{ variable2 }}\n")
+VARIABLES = '"variable1": "hello"\n"variable2": "bye"\n"array1": ["a", "b", "c", "d", "e", "f", "g", "h"]\n'
+
+
+class NullSink:
+    """
+    Sink that discards the translated chunks.
+    """
+
+    def print(self, chunk):
+        """
+        Discards the chunk.
+        :param chunk: String with the translated text.
+        """
+
+
+def best_time(function, repeat):
+    """
+    Measures the best time of several executions of a function.
+    :param function: Function without arguments to execute.
+    :param repeat: Integer with the number of executions.
+    :return: Float with the seconds of the fastest execution.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    """
+    Main function of the module. Executes the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Compares the tree of elements against the intermediate "
+                                                 "representation.")
+    parser.add_argument("-p", "--paragraphs", type=int, default=20000, help="Number of paragraphs of the template.")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Number of repetitions.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        template_path = os.path.join(temp_dir, "template.txt")
+        variables_path = os.path.join(temp_dir, "variables.txt")
+        with open(template_path, 'w') as f:
+            f.write(PARAGRAPH * args.paragraphs)
+        with open(variables_path, 'w') as f:
+            f.write(VARIABLES)
+        compiled_template = compilation.CompiledTemplate.compile(template_path)
+        var_mgr = symbol_table.VariableManager(variables_path)
+        var_mgr.parse()
+
+    program = intermediate_representation.Program.compile(compiled_template)
+    tree_size, nodes = intermediate_representation.tree_memory_size(compiled_template.elements)
+    program_size = program.memory_size()
+    tree_time = best_time(lambda: compiled_template.render(var_mgr, NullSink()), args.repeat)
+    program_time = best_time(lambda: program.render(var_mgr, NullSink()), args.repeat)
+    print("tree    {:>8} nodes      {:>10} bytes {:6.1f} bytes/node {:.3f} s".format(
+        nodes, tree_size, tree_size / nodes, tree_time))
+    print("program {:>8} operations {:>10} bytes {:6.1f} bytes/node {:.3f} s".format(
+        len(program), program_size, program_size / nodes, program_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""
+Benchmark that measures the peak of memory used by the translation of a long loop with several flush sizes.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'engine'))
+
+import compilation  # noqa: E402
+import symbol_table  # noqa: E402
+
+TEMPLATE = "{{ #loop array1 item }}\nline with the item {{ item }} and {{ variable1 }}\n{{ /loop }}\n"
+
+
+class NullSink:
+    """
+    Sink that discards the translated chunks.
+    """
+
+    def print(self, chunk):
+        """
+        Discards the chunk.
+        :param chunk: String with the translated text.
+        """
+
+
+def main():
+    """
+    Main function of the module. Executes the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Measures the memory used by the translation of a long loop.")
+    parser.add_argument("-n", "--items", type=int, default=200000, help="Number of items of the array.")
+    parser.add_argument("-f", "--flush_sizes", type=int, nargs='+', default=[0, 4096, 64 * 1024, sys.maxsize],
+                        help="Flush sizes to measure.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        template_path = os.path.join(temp_dir, "template.txt")
+        variables_path = os.path.join(temp_dir, "variables.txt")
+        with open(template_path, 'w') as f:
+            f.write(TEMPLATE)
+        with open(variables_path, 'w') as f:
+            f.write('"variable1": "hello"\n"array1": [{}]\n'.format(
+                ", ".join('"{}"'.format(idx) for idx in range(args.items))))
+        compiled_template = compilation.CompiledTemplate.compile(template_path)
+        var_mgr = symbol_table.VariableManager(variables_path)
+        var_mgr.parse()
+
+    for flush_size in args.flush_sizes:
+        tracemalloc.start()
+        start = time.perf_counter()
+        compiled_template.render(var_mgr, NullSink(), flush_size)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print("flush size {:>20} {:.3f} s peak {:>12} bytes".format(flush_size, elapsed, peak))
+
+
+if __name__ == '__main__':
+    main()
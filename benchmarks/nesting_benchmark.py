@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Benchmark that measures the cost per chunk of the translation of loops nested from 1 to 20 levels deep.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'engine'))
+
+import compilation  # noqa: E402
+import symbol_table  # noqa: E402
+import syntactical_analysis  # noqa: E402
+import translator  # noqa: E402
+
+
+class ArrayVariables:
+    """
+    Variable manager with an array of one item to nest the loops and a long array for the innermost one.
+    """
+
+    def __init__(self, items):
+        """
+        Constructor that initializes the object arguments.
+        :param items: Integer with the number of items of the long array.
+        """
+        self._variables = {"one": ["x"], "many": [str(idx) for idx in range(items)]}
+
+    def get_replacement(self, key):
+        """
+        Gets the value of a variable.
+        :param key: String containing the variable name.
+        :return: String or List with the value.
+        :raise: VariableNotFound if the variable does not exist.
+        """
+        if key not in self._variables:
+            raise symbol_table.VariableNotFoundException(key)
+        return self._variables[key]
+
+
+class CountingSink:
+    """
+    Sink that counts the translated chunks.
+    """
+
+    def __init__(self):
+        """
+        Constructor that initializes the object arguments.
+        """
+        self.chunks = 0
+
+    def print(self, chunk):
+        """
+        Counts the chunk.
+        :param chunk: String with the translated text.
+        """
+        self.chunks += 1
+
+
+def nested_template(depth):
+    """
+    Creates a template with loops nested at the given depth whose innermost loop iterates over the long array.
+    :param depth: Integer with the number of nested loops.
+    :return: engine.compilation.CompiledTemplate with the template.
+    """
+    elements = [syntactical_analysis.ReplacementElement("item{}".format(depth)), syntactical_analysis.EolElement()]
+    elements = [syntactical_analysis.LoopElement("many", "item{}".format(depth), elements)]
+    for level in range(depth - 1, 0, -1):
+        elements = [syntactical_analysis.LoopElement("one", "item{}".format(level), elements)]
+    return compilation.CompiledTemplate(elements)
+
+
+def main():
+    """
+    Main function of the module. Executes the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Measures the cost per chunk of nested loops.")
+    parser.add_argument("-n", "--items", type=int, default=200000, help="Number of items of the innermost loop.")
+    parser.add_argument("-d", "--max_depth", type=int, default=20, help="Maximum nesting depth.")
+    args = parser.parse_args()
+
+    var_mgr = ArrayVariables(args.items)
+    print("depth " + "".join("{:>18}".format(name + " ns/chunk") for name in sorted(translator.BACKENDS)))
+    for depth in range(1, args.max_depth + 1):
+        compiled_template = nested_template(depth)
+        costs = []
+        for name, backend in sorted(translator.BACKENDS.items()):
+            renderer = backend(compiled_template, None)
+            sink = CountingSink()
+            start = time.perf_counter()
+            if name == 'tree':
+                # The chunks of the loops are not joined, so the chunks printed are the chunks translated.
+                renderer.render(var_mgr, sink, 0)
+            else:
+                renderer.render(var_mgr, sink)
+            costs.append((time.perf_counter() - start) * 1e9 / (args.items * 2))
+        print("{:>5} ".format(depth) + "".join("{:>18.1f}".format(cost) for cost in costs))
+
+
+if __name__ == '__main__':
+    main()
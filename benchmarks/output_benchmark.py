@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+Benchmark that measures the throughput of the output file manager writing outputs of several sizes made of short chunks,
+as the ones printed for the text of the template, and of long chunks, as the ones printed for the translation of the
+loops, against writing each chunk in a buffered file as the translation did before.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'engine'))
+
+import translator  # noqa: E402
+
+CHUNKS = {
+    'short': ["Hello", " ", "world", ",", " ", "this", " ", "is", " ", "a", " ", "line", "\n"],
+    'long': ["line of the translation of a loop\n" * 2000],
+}
+
+
+class FileWriter:
+    """
+    Writer that writes every chunk in a file with the default buffer.
+    """
+
+    def __init__(self, filepath, encoding):
+        """
+        Constructor that initializes the arguments of the object.
+        :param filepath: String containing the path of the output file.
+        :param encoding: String with the encoding of the binary file or None to write it in text mode.
+        """
+        self.filepath = filepath
+        self.encoding = encoding
+
+    def __enter__(self):
+        """
+        Context manager that opens the file.
+        :return: The object itself.
+        """
+        self.file = open(self.filepath, 'w' if self.encoding is None else 'wb')
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """
+        Context manager that closes the file.
+        :param exc_type:
+        :param exc_val:
+        :param exc_tb:
+        """
+        self.file.close()
+
+    def print(self, chunk):
+        """
+        Writes the chunk in the file.
+        :param chunk: String or bytes with the text.
+        """
+        if self.encoding is not None and isinstance(chunk, str):
+            chunk = chunk.encode(self.encoding)
+        self.file.write(chunk)
+
+
+def measure(create_writer, chunks, size):
+    """
+    Prints the chunks repeatedly until the size of the output is reached.
+    :param create_writer: Function that creates the writer.
+    :param chunks: List of Strings or bytes printed in order.
+    :param size: Integer with the number of bytes of the output.
+    :return: Float with the megabytes written per second.
+    """
+    repetitions = max(size // sum(len(chunk) for chunk in chunks), 1)
+    start = time.perf_counter()
+    with create_writer() as writer:
+        print_chunk = writer.print
+        for _ in range(repetitions):
+            for chunk in chunks:
+                print_chunk(chunk)
+    elapsed = time.perf_counter() - start
+    return repetitions * sum(len(chunk) for chunk in chunks) / elapsed / 1e6
+
+
+def main():
+    """
+    Main function of the module. Executes the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Measures the throughput of the output file manager.")
+    parser.add_argument("-s", "--sizes", type=int, nargs='+', default=[10 ** 6, 10 ** 7, 10 ** 8],
+                        help="Numbers of bytes of the outputs, such as 1000000 to 10000000000.")
+    parser.add_argument("-b", "--buffer_size", type=int, default=translator.OutputFileManager.DEFAULT_BUFFER_SIZE,
+                        help="Number of bytes buffered by the output file manager.")
+    parser.add_argument("-c", "--chunks", nargs='+', default=sorted(CHUNKS.keys()), choices=sorted(CHUNKS.keys()),
+                        help="Kinds of chunks printed.")
+    parser.add_argument("-d", "--directory", default=None, help="Directory where the outputs are written.")
+    args = parser.parse_args()
+
+    print("{:>12} {:>6} {:>8} {:>12} {:>12} {:>8}".format("bytes", "chunks", "mode", "file (MB/s)", "size (MB/s)",
+                                                           "speedup"))
+    with tempfile.TemporaryDirectory(dir=args.directory) as temp_dir:
+        output_path = os.path.join(temp_dir, "output.txt")
+        for size in args.sizes:
+            for name in args.chunks:
+                for encoding in [None, 'utf-8']:
+                    results = []
+                    for create_writer in [lambda: FileWriter(output_path, encoding),
+                                          lambda: translator.OutputFileManager(output_path, encoding,
+                                                                               args.buffer_size)]:
+                        results.append(measure(create_writer, CHUNKS[name], size))
+                        os.remove(output_path)
+                    print("{:>12} {:>6} {:>8} {:>12.1f} {:>12.1f} {:>7.2f}x".format(
+                        size, name, "text" if encoding is None else "binary", *results, results[1] / results[0]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""
+Benchmark that compares the serial translation of a long loop against its translation with 1, 2, 4 and 8 processes.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'engine'))
+
+import compilation  # noqa: E402
+import parallel_analysis  # noqa: E402
+import symbol_table  # noqa: E402
+import syntactical_analysis  # noqa: E402
+
+
+class ArrayVariables:
+    """
+    Variable manager with a long array and a string variable.
+    """
+
+    def __init__(self, items):
+        """
+        Constructor that initializes the object arguments.
+        :param items: Integer with the number of items of the array.
+        """
+        self._variables = {"title": "listed", "many": ["item{}".format(idx) for idx in range(items)]}
+
+    def get_replacement(self, key):
+        """
+        Gets the value of a variable.
+        :param key: String containing the variable name.
+        :return: String or List with the value.
+        :raise: VariableNotFound if the variable does not exist.
+        """
+        if key not in self._variables:
+            raise symbol_table.VariableNotFoundException(key)
+        return self._variables[key]
+
+
+class SizeSink:
+    """
+    Sink that counts the translated characters.
+    """
+
+    def __init__(self):
+        """
+        Constructor that initializes the object arguments.
+        """
+        self.size = 0
+
+    def print(self, chunk):
+        """
+        Counts the characters of the chunk.
+        :param chunk: String with the translated text.
+        """
+        self.size += len(chunk)
+
+
+def measure(compiled_template, var_mgr, loop_translator):
+    """
+    Translates the template.
+    :param compiled_template: engine.compilation.CompiledTemplate to translate.
+    :param var_mgr: Object with the variables of the template.
+    :param loop_translator: engine.parallel_analysis.ParallelLoopTranslator or None.
+    :return: Tuple (Integer, Float) with the number of characters translated and the seconds elapsed.
+    """
+    sink = SizeSink()
+    start = time.perf_counter()
+    compiled_template.render(var_mgr, sink, loop_translator=loop_translator)
+    return sink.size, time.perf_counter() - start
+
+
+def main():
+    """
+    Main function of the module. Executes the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Compares the serial translation of a loop against the parallel one.")
+    parser.add_argument("-n", "--items", type=int, default=2000000, help="Number of items of the loop.")
+    parser.add_argument("-w", "--workers", type=int, nargs='+', default=[1, 2, 4, 8], help="Numbers of processes.")
+    args = parser.parse_args()
+
+    var_mgr = ArrayVariables(args.items)
+    elements = [syntactical_analysis.VerbatimElement("- "), syntactical_analysis.ReplacementElement("item"),
+                syntactical_analysis.VerbatimElement(" is "), syntactical_analysis.ReplacementElement("title"),
+                syntactical_analysis.EolElement()]
+    compiled_template = compilation.CompiledTemplate([syntactical_analysis.LoopElement("many", "item", elements)])
+
+    size, elapsed = measure(compiled_template, var_mgr, None)
+    print("serial     {} characters {:.3f} s".format(size, elapsed))
+    for workers in args.workers:
+        size, elapsed = measure(compiled_template, var_mgr, parallel_analysis.ParallelLoopTranslator(workers))
+        print("{} workers  {} characters {:.3f} s".format(workers, size, elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Benchmark that compares the serial parser against the parallel parser on a template made of many top level sections.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'engine'))
+
+import lexical_analysis  # noqa: E402
+import parallel_analysis  # noqa: E402
+import syntactical_analysis  # noqa: E402
+
+SECTION = ("Section text with {{ variable1 }} and some more words to read\n"
+           "{{ #loop array1 item }}\n"
+           "- {{ item }} is listed with {{ variable2 }}\n"
+           "{{ /loop }}\n")
+
+
+def measure(parser):
+    """
+    Analyzes the whole template.
+    :param parser: Parser with a parse method.
+    :return: Tuple (Integer, Float) with the number of top level elements and the seconds elapsed.
+    """
+    start = time.perf_counter()
+    count = sum(1 for _ in parser.parse())
+    return count, time.perf_counter() - start
+
+
+def main():
+    """
+    Main function of the module. Executes the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Compares the serial parser against the parallel parser.")
+    parser.add_argument("-m", "--megabytes", type=int, default=50, help="Size of the template in megabytes.")
+    parser.add_argument("-w", "--workers", type=int, nargs='+', default=[1, 2, 4], help="Numbers of processes.")
+    parser.add_argument("-c", "--chunk_size", type=int, default=parallel_analysis.ParallelParser.DEFAULT_CHUNK_SIZE,
+                        help="Minimum size of the chunks in bytes.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        template_path = os.path.join(temp_dir, "template.txt")
+        with open(template_path, 'w') as f:
+            f.write(SECTION * (args.megabytes * 1024 * 1024 // len(SECTION)))
+
+        count, elapsed = measure(syntactical_analysis.Parser(lexical_analysis.BufferScanner(template_path)))
+        print("serial     {} elements {:.3f} s".format(count, elapsed))
+        for workers in args.workers:
+            count, elapsed = measure(parallel_analysis.ParallelParser(template_path, workers, args.chunk_size))
+            print("{} workers  {} elements {:.3f} s".format(workers, count, elapsed))
+
+
+if __name__ == '__main__':
+    main()
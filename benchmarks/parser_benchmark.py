@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+Benchmark that measures the cost per token of the parser on a template dominated by placeholders.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'engine'))
+
+import syntactical_analysis  # noqa: E402
+from utils import LexTokens  # noqa: E402
+
+PARAGRAPH = "{{ variable1 }} {{variable2}} {{ #loop array1 item }}\n{{ item }}-{{ variable1 }}\n{{ /loop }}\n"
+
+
+class ListScanner:
+    """
+    Scanner that returns tokens already analyzed, so only the parser is measured.
+    """
+
+    def __init__(self, tokens):
+        """
+        Constructor that initializes the arguments of the object.
+        :param tokens: List of tuples (engine.LexTokens, String) to return.
+        """
+        self.tokens = tokens
+
+    def scan(self):
+        """
+        Returns the tokens one by one.
+        :return: Tuple (engine.LexTokens, String) containing the type of the token and its contents.
+        """
+        return iter(self.tokens)
+
+
+def tokenize(paragraphs):
+    """
+    Generates the tokens of the template as the line scanner would do.
+    :param paragraphs: Integer with the number of paragraphs of the template.
+    :return: List of tuples (engine.LexTokens, String).
+    """
+    tokens = []
+    words = {'{{': LexTokens.INIT_EXPRESSION, '}}': LexTokens.END_EXPRESSION, '#loop': LexTokens.INIT_LOOP,
+             '/loop': LexTokens.END_LOOP}
+    for line in (PARAGRAPH * paragraphs).splitlines():
+        for word in line.replace('{{', ' {{ ').replace('}}', ' }} ').split(' '):
+            if word in words:
+                tokens.append((words[word], None))
+            elif word:
+                tokens.append((LexTokens.VERBATIM, word))
+            else:
+                tokens.append((LexTokens.BLANK, " "))
+        tokens.append((LexTokens.EOL, "\n"))
+    return tokens
+
+
+def main():
+    """
+    Main function of the module. Executes the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Measures the cost per token of the parser.")
+    parser.add_argument("-p", "--paragraphs", type=int, default=50000, help="Number of paragraphs of the template.")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Number of repetitions.")
+    args = parser.parse_args()
+
+    tokens = tokenize(args.paragraphs)
+    best = None
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for _ in syntactical_analysis.Parser(ListScanner(tokens)).parse():
+            pass
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print("{} tokens {:.3f} s {:.1f} ns/token".format(len(tokens), best, best * 1e9 / len(tokens)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+Benchmark that compares the line scanner against the whole buffer, the chunked and the memory mapped scanners.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'engine'))
+
+import lexical_analysis  # noqa: E402
+
+PARAGRAPH = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut labore\n"
+             "et dolore magna aliqua. Ut enim ad minim veniam, quis nostrud {{ variable1 }} exercitation ullamco\n"
+             "laboris nisi ut aliquip ex ea commodo consequat.\n"
+             "{{ #loop array1 item }}\n"
+             "Duis aute irure dolor in {{ item }} reprehenderit in voluptate velit esse cillum dolore\n"
+             "{{ /loop }}\n")
+
+
+def benchmark(scanner_class, filepath):
+    """
+    Scans the whole template with the scanner class given keeping the contents of the tokens alive.
+    :param scanner_class: engine.lexical_analysis.Scanner class to benchmark.
+    :param filepath: String with the path of the template file.
+    :return: Tuple (Integer, Float, Integer) with the number of tokens, the seconds elapsed and the peak of memory
+    allocated by python in bytes.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    tokens = [token for token in scanner_class(filepath).scan()]
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return len(tokens), elapsed, peak
+
+
+def main():
+    """
+    Main function of the module. Executes the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Compares the performance of the scanners.")
+    parser.add_argument("-p", "--paragraphs", type=int, default=20000, help="Number of paragraphs of the template.")
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as template_file:
+        template_file.write(PARAGRAPH * args.paragraphs)
+    try:
+        for scanner_class in [lexical_analysis.Scanner, lexical_analysis.BufferScanner, lexical_analysis.ChunkedScanner,
+                              lexical_analysis.MappedScanner]:
+            tokens, elapsed, peak = benchmark(scanner_class, template_file.name)
+            print("{:<15} {:>10} tokens {:>10.3f} s {:>10.1f} MB".format(
+                scanner_class.__name__, tokens, elapsed, peak / 2 ** 20))
+    finally:
+        os.remove(template_file.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+Benchmark that compares the translation in bulk of a loop made only of verbatim text and replacements against its
+translation element by element for arrays of 10k, 1M and 10M items.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'engine'))
+
+import semantic_analysis  # noqa: E402
+import symbol_table  # noqa: E402
+import syntactical_analysis  # noqa: E402
+
+
+class ArrayVariables:
+    """
+    Variable manager with a long array and a string variable.
+    """
+
+    def __init__(self, items):
+        """
+        Constructor that initializes the object arguments.
+        :param items: Integer with the number of items of the array.
+        """
+        # The array repeats a thousand distinct strings to keep the memory used by the longest arrays low.
+        values = ["item{}".format(idx) for idx in range(1000)]
+        self._variables = {"title": "listed", "many": (values * (items // 1000 + 1))[:items]}
+
+    def get_replacement(self, key):
+        """
+        Gets the value of a variable.
+        :param key: String containing the variable name.
+        :return: String or List with the value.
+        :raise: VariableNotFound if the variable does not exist.
+        """
+        if key not in self._variables:
+            raise symbol_table.VariableNotFoundException(key)
+        return self._variables[key]
+
+
+class ElementByElementAnalyzer(semantic_analysis.SemanticAnalyzer):
+    """
+    Semantic analyzer that translates every loop element by element.
+    """
+
+    def _translate_simple_loop(self, loop, scope, loop_array=None):
+        """
+        Disables the translation in bulk.
+        :param loop: engine.syntactical_analysis.LoopElement to translate.
+        :param scope: engine.symbol_table.Scope with the loop iterators of the translation.
+        :param loop_array: Value of the array of the loop or None.
+        :return: None always.
+        """
+        return None
+
+
+def measure(analyzer_class, loop, var_mgr):
+    """
+    Translates the loop.
+    :param analyzer_class: engine.semantic_analysis.SemanticAnalyzer class used for the translation.
+    :param loop: engine.syntactical_analysis.LoopElement to translate.
+    :param var_mgr: Object with the variables of the loop.
+    :return: Tuple (Integer, Float) with the number of characters translated and the seconds elapsed.
+    """
+    start = time.perf_counter()
+    size = sum(len(chunk) for chunk in analyzer_class(None, var_mgr).run_elements([loop]))
+    return size, time.perf_counter() - start
+
+
+def main():
+    """
+    Main function of the module. Executes the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Compares the translation in bulk of simple loops.")
+    parser.add_argument("-n", "--items", type=int, nargs='+', default=[10000, 1000000, 10000000],
+                        help="Numbers of items of the loop.")
+    args = parser.parse_args()
+
+    loop = syntactical_analysis.LoopElement("many", "item", [
+        syntactical_analysis.VerbatimElement("- "), syntactical_analysis.ReplacementElement("item"),
+        syntactical_analysis.VerbatimElement(" is "), syntactical_analysis.ReplacementElement("title"),
+        syntactical_analysis.EolElement()])
+    print("{:>10} {:>14} {:>14} {:>8}".format("items", "element (s)", "bulk (s)", "speedup"))
+    for items in args.items:
+        var_mgr = ArrayVariables(items)
+        size, element_time = measure(ElementByElementAnalyzer, loop, var_mgr)
+        bulk_size, bulk_time = measure(semantic_analysis.SemanticAnalyzer, loop, var_mgr)
+        assert size == bulk_size
+        print("{:>10} {:>14.3f} {:>14.3f} {:>7.1f}x".format(items, element_time, bulk_time, element_time / bulk_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Benchmark that measures the peak of memory used to parse the variables and translate a loop over a long array with the
+array decoded as a list and streamed from the variables file or from a file with one item per line.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'engine'))
+
+import compilation  # noqa: E402
+import symbol_table  # noqa: E402
+
+TEMPLATE = "{{ #loop array1 item }}\nline with the item {{ item }} and {{ variable1 }}\n{{ /loop }}\n"
+
+
+class NullSink:
+    """
+    Sink that discards the translated chunks.
+    """
+
+    def print(self, chunk):
+        """
+        Discards the chunk.
+        :param chunk: String with the translated text.
+        """
+
+
+def measure(compiled_template, create_manager):
+    """
+    Parses the variables and translates the template.
+    :param compiled_template: engine.compilation.CompiledTemplate to translate.
+    :param create_manager: Function that creates the engine.symbol_table.VariableManager.
+    :return: Tuple (Float, Integer) with the seconds elapsed and the peak of memory in bytes.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    var_mgr = create_manager()
+    var_mgr.parse()
+    compiled_template.render(var_mgr, NullSink())
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    """
+    Main function of the module. Executes the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Measures the memory used by the loops over streamed arrays.")
+    parser.add_argument("-n", "--items", type=int, nargs='+', default=[100000, 1000000, 3000000],
+                        help="Numbers of items of the array.")
+    args = parser.parse_args()
+
+    print("{:>10} {:>24} {:>24} {:>24}".format("items", "list (s, bytes)", "inline stream (s, bytes)",
+                                               "file stream (s, bytes)"))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        template_path = os.path.join(temp_dir, "template.txt")
+        with open(template_path, 'w') as f:
+            f.write(TEMPLATE)
+        compiled_template = compilation.CompiledTemplate.compile(template_path)
+        for items in args.items:
+            variables_path = os.path.join(temp_dir, "variables.txt")
+            strings_path = os.path.join(temp_dir, "strings.txt")
+            array_path = os.path.join(temp_dir, "array.txt")
+            with open(variables_path, 'w') as f:
+                f.write('"variable1": "hello"\n"array1": [{}]\n'.format(
+                    ", ".join('"{}"'.format(idx) for idx in range(items))))
+            with open(strings_path, 'w') as f:
+                f.write('"variable1": "hello"\n')
+            with open(array_path, 'w') as f:
+                f.writelines("{}\n".format(idx) for idx in range(items))
+            results = [
+                measure(compiled_template, lambda: symbol_table.VariableManager(variables_path)),
+                measure(compiled_template, lambda: symbol_table.StreamingVariableManager(variables_path,
+                                                                                          stream_size=0)),
+                measure(compiled_template, lambda: symbol_table.StreamingVariableManager(
+                    strings_path, {"array1": array_path})),
+            ]
+            print("{:>10} {}".format(items, " ".join("{:>9.3f} s {:>12}".format(*result) for result in results)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+Benchmark that compares the translation of several templates with the same variables file parsing the variables in
+every translation and reusing them from the cache of variables.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'engine'))
+
+import translator  # noqa: E402
+import variables_cache  # noqa: E402
+
+
+def measure(template_paths, variables_path, output_path, cache):
+    """
+    Translates the templates.
+    :param template_paths: List of Strings with the paths to the templates.
+    :param variables_path: String containing the path to the variables file.
+    :param output_path: String containing the path to the output file.
+    :param cache: engine.variables_cache.VariablesCache or None.
+    :return: Float with the seconds elapsed.
+    """
+    start = time.perf_counter()
+    for template_path in template_paths:
+        translator.Template(template_path, variables_path, output_path, variables_cache=cache).replace()
+    return time.perf_counter() - start
+
+
+def main():
+    """
+    Main function of the module. Executes the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Compares the translations with and without the cache of variables.")
+    parser.add_argument("-l", "--lines", type=int, default=200000, help="Number of string variables.")
+    parser.add_argument("-t", "--templates", type=int, default=10, help="Number of templates translated.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        variables_path = os.path.join(temp_dir, "variables.txt")
+        output_path = os.path.join(temp_dir, "output.txt")
+        with open(variables_path, 'w') as f:
+            f.writelines('"variable{0}": "value number {0}"\n'.format(idx) for idx in range(args.lines))
+        template_paths = []
+        for idx in range(args.templates):
+            template_paths.append(os.path.join(temp_dir, "template{}.txt".format(idx)))
+            with open(template_paths[-1], 'w') as f:
+                f.write("template {} uses {{{{ variable{} }}}}\n".format(idx, idx))
+        uncached = measure(template_paths, variables_path, output_path, None)
+        cache = variables_cache.VariablesCache()
+        cached = measure(template_paths, variables_path, output_path, cache)
+        print("{} templates, {} variables: parsing every time {:.3f} s, cached {:.3f} s, speedup {:.1f}x".format(
+            args.templates, args.lines, uncached, cached, uncached / cached))
+        print("hits {}, misses {}, evictions {}, {} bytes cached".format(cache.hits, cache.misses, cache.evictions,
+                                                                        cache.size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Benchmark that compares the time to load the same variables from the replacements file, a JSON file and a snapshot
+against the time to read the bytes of the snapshot.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'engine'))
+
+import symbol_table  # noqa: E402
+
+
+def measure(function):
+    """
+    Calls the function.
+    :param function: Function to measure.
+    :return: Tuple (Object, Float) with the value returned by the function and the seconds elapsed.
+    """
+    start = time.perf_counter()
+    value = function()
+    return value, time.perf_counter() - start
+
+
+def read_bytes(filepath):
+    """
+    Reads the bytes of a file.
+    :param filepath: String containing the path of the file.
+    :return: Bytes of the file.
+    """
+    with open(filepath, 'rb') as f:
+        return f.read()
+
+
+def main():
+    """
+    Main function of the module. Executes the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Compares the formats of the variables.")
+    parser.add_argument("-l", "--lines", type=int, default=200000, help="Number of string variables.")
+    parser.add_argument("-a", "--array_items", type=int, default=1000000, help="Number of items of the array.")
+    args = parser.parse_args()
+
+    print("{:<8} {:>10} {:>10} {:>10} {:>10}".format("", "text (s)", "json (s)", "snapshot", "read (s)"))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, variables in [
+                ("strings", {"variable{}".format(idx): "value number {}".format(idx) for idx in range(args.lines)}),
+                ("array", {"array": ["item{}".format(idx) for idx in range(args.array_items)]})]:
+            text_path = os.path.join(temp_dir, name + ".txt")
+            json_path = os.path.join(temp_dir, name + ".json")
+            snapshot_path = os.path.join(temp_dir, name + ".tvs")
+            with open(text_path, 'w') as f:
+                for variable, value in variables.items():
+                    if isinstance(value, str):
+                        f.write('"{}": "{}"\n'.format(variable, value))
+                    else:
+                        f.write('"{}": [{}]\n'.format(variable, ", ".join('"{}"'.format(item) for item in value)))
+            with open(json_path, 'w') as f:
+                json.dump(variables, f)
+            symbol_table.SnapshotVariableManager.save(variables, snapshot_path)
+            times = []
+            for manager_class, path in [(symbol_table.VariableManager, text_path),
+                                        (symbol_table.JsonVariableManager, json_path),
+                                        (symbol_table.SnapshotVariableManager, snapshot_path)]:
+                loaded, seconds = measure(lambda: manager_class(path).read())
+                assert loaded == variables
+                times.append(seconds)
+            times.append(measure(lambda: read_bytes(snapshot_path))[1])
+            print("{:<8} {:>10.3f} {:>10.3f} {:>10.3f} {:>10.3f}".format(name, *times))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Benchmark that compares the parser of the variables file against the first version, which applied a regular
+expression to every line and evaluated the value with ast.literal_eval, and against the lazy manager decoding only the
+few variables a template references.
+"""
+
+import argparse
+import ast
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'engine'))
+
+import symbol_table  # noqa: E402
+
+
+def regex_parse(filepath):
+    """
+    Parses a variables file as the first version of the parser did.
+    :param filepath: String containing the path of the variables file.
+    :return: Dictionary with the variables.
+    """
+    variables = {}
+    with open(filepath, 'r') as f:
+        for line in f:
+            line = line.strip(' \r\n')
+            if len(line) > 0:
+                result = re.search(
+                    r' *"(?P<token>[a-zA-Z]\w*)" *: *(?P<value>(("[^"]*")|\["[^"]*"(( *, *"[^"]*")+)\])) *$', line)
+                if not result:
+                    raise symbol_table.LineParseException(line)
+                variables[result.group('token')] = ast.literal_eval(result.group('value'))
+    return variables
+
+
+def measure(parse, filepath):
+    """
+    Parses the variables file.
+    :param parse: Function that parses the file and returns the variables.
+    :param filepath: String containing the path of the variables file.
+    :return: Tuple (Dictionary, Float) with the variables and the seconds elapsed.
+    """
+    start = time.perf_counter()
+    variables = parse(filepath)
+    return variables, time.perf_counter() - start
+
+
+def manager_parse(filepath):
+    """
+    Parses a variables file with the engine.symbol_table.VariableManager.
+    :param filepath: String containing the path of the variables file.
+    :return: Dictionary with the variables.
+    """
+    var_mgr = symbol_table.VariableManager(filepath)
+    var_mgr.parse()
+    return dict(var_mgr._variables)
+
+
+def lazy_parse(filepath, names):
+    """
+    Indexes a variables file with the engine.symbol_table.LazyVariableManager and decodes some variables.
+    :param filepath: String containing the path of the variables file.
+    :param names: Iterable of Strings with the names of the variables decoded.
+    :return: Dictionary with the variables decoded.
+    """
+    var_mgr = symbol_table.LazyVariableManager(filepath)
+    var_mgr.parse()
+    var_mgr.load(names)
+    return {name: var_mgr.get_replacement(name) for name in var_mgr.loaded_names}
+
+
+def main():
+    """
+    Main function of the module. Executes the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Compares the parsers of the variables file.")
+    parser.add_argument("-l", "--lines", type=int, default=200000, help="Number of string variables.")
+    parser.add_argument("-a", "--array_items", type=int, default=1000000, help="Number of items of the array.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, contents in [
+                ("strings", ('"variable{0}": "value number {0}"\n'.format(idx) for idx in range(args.lines))),
+                ("array", ['"array": [{}]\n'.format(", ".join('"item{}"'.format(idx)
+                                                              for idx in range(args.array_items)))])]:
+            filepath = os.path.join(temp_dir, name + ".txt")
+            with open(filepath, 'w') as f:
+                f.writelines(contents)
+            expected, regex_time = measure(regex_parse, filepath)
+            variables, parser_time = measure(manager_parse, filepath)
+            assert expected == variables
+            referenced = sorted(variables)[:10]
+            lazy_variables, lazy_time = measure(lambda path: lazy_parse(path, referenced), filepath)
+            assert lazy_variables == {name: variables[name] for name in referenced}
+            print("{:<8} regex {:.3f} s, parser {:.3f} s, speedup {:.1f}x, lazy {:.3f} s for {} variables".format(
+                name, regex_time, parser_time, regex_time / parser_time, lazy_time, len(referenced)))
+
+
+if __name__ == '__main__':
+    main()
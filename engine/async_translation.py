@@ -0,0 +1,187 @@
+import asyncio
+import inspect
+import logging
+import os
+
+import symbol_table
+
+# Number of chunks translated between two yields to the event loop.
+DEFAULT_YIELD_EVERY = 64
+
+
+async def load_variables(variables_path, manager_class=symbol_table.VariableManager):
+    """
+    Parses a variables file without blocking the event loop.
+    :param variables_path: String containing the path to the variables file.
+    :param manager_class: engine.symbol_table.VariableManager class used to parse the file.
+    :return: engine.symbol_table.VariableManager already parsed.
+    :raise: IOError when there is no file with such path.
+    :raise: LineParseException if a line of the file is not correct.
+    """
+    var_mgr = manager_class(variables_path)
+    await asyncio.get_running_loop().run_in_executor(None, var_mgr.parse)
+    return var_mgr
+
+
+class AsyncTranslator:
+    """
+    Class that translates a template as an asynchronous generator of chunks, yielding to the event loop every few
+    chunks so the translation of a long template does not stall the other tasks.
+    """
+
+    def __init__(self, renderer, yield_every=DEFAULT_YIELD_EVERY):
+        """
+        Constructor that initializes the object arguments.
+        :param renderer: Object with a run method that receives the variables and returns the translated chunks, such as
+        engine.compilation.CompiledTemplate or engine.intermediate_representation.Program.
+        :param yield_every: Integer with the number of chunks translated between two yields to the event loop.
+        :raise: ValueError when the renderer does not translate the template in chunks or the number of chunks is not
+        a positive number.
+        """
+        if not hasattr(renderer, 'run'):
+            raise ValueError("The renderer {} does not translate the template in chunks".format(
+                renderer.__class__.__name__))
+        if yield_every < 1:
+            raise ValueError("Invalid number of chunks {}".format(yield_every))
+        self.renderer = renderer
+        self.yield_every = yield_every
+
+    async def run(self, variable_manager):
+        """
+        Performs the translation of the template returning the translated chunks one by one.
+        :param variable_manager: engine.symbol_table.VariableManager already parsed with the replacement variables.
+        :return: String or bytes-like object with the next translated chunk.
+        :raise: FileParseException if the variables file has not yet been parsed.
+        :raise: VariableNotFound if the variable was not in the file.
+        :raise: VariableHiddenException if a loop iterator has the same name as a variable of the file.
+        """
+        count = 0
+        for chunk in self.renderer.run(variable_manager):
+            yield chunk
+            count += 1
+            if count == self.yield_every:
+                count = 0
+                await asyncio.sleep(0)
+
+    async def render(self, variable_manager, sink):
+        """
+        Performs the translation of the template printing the translated chunks in the sink.
+        :param variable_manager: engine.symbol_table.VariableManager already parsed with the replacement variables.
+        :param sink: Object with a print method that receives the translated chunks and may return an awaitable, such
+        as engine.async_translation.AsyncOutputFileManager, engine.async_translation.StreamSink or
+        engine.translator.OutputFileManager.
+        :raise: FileParseException if the variables file has not yet been parsed.
+        :raise: VariableNotFound if the variable was not in the file.
+        :raise: VariableHiddenException if a loop iterator has the same name as a variable of the file.
+        """
+        print_chunk = sink.print
+        async for chunk in self.run(variable_manager):
+            result = print_chunk(chunk)
+            if inspect.isawaitable(result):
+                await result
+
+
+class StreamSink:
+    """
+    Class that prints the translated chunks in an asyncio.StreamWriter, waiting for its buffer to drain.
+    """
+
+    def __init__(self, writer, encoding='utf-8'):
+        """
+        Constructor that initializes the arguments of the object.
+        :param writer: asyncio.StreamWriter that receives the chunks.
+        :param encoding: String with the encoding of the string chunks.
+        """
+        self.writer = writer
+        self.encoding = encoding
+
+    async def print(self, chunk):
+        """
+        Writes the chunk in the stream.
+        :param chunk: String or bytes-like object with the translated text.
+        """
+        if isinstance(chunk, str):
+            chunk = chunk.encode(self.encoding)
+        self.writer.write(chunk)
+        await self.writer.drain()
+
+
+class AsyncOutputFileManager:
+    """
+    Class that manages the output file writing the chunks in the default executor of the event loop, so the event loop
+    is not blocked by the disk.
+    """
+
+    # Number of characters or bytes joined before writing them.
+    DEFAULT_BUFFER_SIZE = 64 * 1024
+
+    def __init__(self, filepath, encoding=None, buffer_size=DEFAULT_BUFFER_SIZE):
+        """
+        Constructor that initializes the arguments of the object.
+        :param filepath: String containing the path of the output file.
+        :param encoding: String with the encoding used to write the file in binary mode, so bytes-like chunks can be
+        written directly. If None the file is written in text mode.
+        :param buffer_size: Integer with the number of characters or bytes joined before writing them.
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.filepath = filepath
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+        self.file = None
+        self._buffer = []
+        self._buffered = 0
+
+    async def _run(self, function, *args):
+        """
+        Calls a blocking function in the default executor.
+        :param function: Function to call.
+        :param args: Arguments of the function.
+        :return: Value returned by the function.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    async def __aenter__(self):
+        """
+        Asynchronous context manager that allows declaring the object in an async with statement.
+        :return: The object itself.
+        """
+        if os.path.isfile(self.filepath):
+            self.logger.warning("The file {} already exists. It will be truncated".format(self.filepath))
+        self.file = await self._run(open, self.filepath, 'w' if self.encoding is None else 'wb')
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """
+        Asynchronous context manager that writes the pending chunks and closes the file at the end of the async with
+        statement.
+        :param exc_type:
+        :param exc_val:
+        :param exc_tb:
+        """
+        try:
+            await self.flush()
+        finally:
+            await self._run(self.file.close)
+
+    async def print(self, chunk):
+        """
+        Prints the specified chunk of text in the output file.
+        :param chunk: String with the text to print or bytes-like object if the file is written in binary mode.
+        """
+        if self.encoding is not None and isinstance(chunk, str):
+            chunk = chunk.encode(self.encoding)
+        self._buffer.append(chunk)
+        self._buffered += len(chunk)
+        if self._buffered >= self.buffer_size:
+            await self.flush()
+
+    async def flush(self):
+        """
+        Writes the pending chunks in the file.
+        """
+        if not self._buffer:
+            return
+        data = ("" if self.encoding is None else b"").join(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+        await self._run(self.file.write, data)
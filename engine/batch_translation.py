@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+# PYTHON_ARGCOMPLETE_OK
+
+import argparse
+import concurrent.futures
+import functools
+import logging
+import sys
+import time
+
+import compilation
+import lexical_analysis
+import symbol_table
+import template_cache
+import translator
+import variables_cache
+try:
+    from argcomplete import autocomplete
+except ImportError:
+    # If module argcomplete is not available, just skip the completion
+    def autocomplete(_):
+        pass
+
+# Executors of the pools that translate the jobs.
+POOLS = {
+    'thread': concurrent.futures.ThreadPoolExecutor,
+    'process': concurrent.futures.ProcessPoolExecutor,
+}
+
+# Renderer and encoding of the template translated by the worker process and class and cache of its variables, set once
+# by the initializer of the pool.
+_worker_template = None
+
+
+class JobResult:
+    """
+    Class that stores the result of the translation of a template with a variables file.
+    """
+
+    __slots__ = ('variables_path', 'output_path', 'seconds', 'error')
+
+    def __init__(self, variables_path, output_path, seconds, error=None):
+        """
+        Constructor that initializes the object arguments.
+        :param variables_path: String containing the path to the variables file.
+        :param output_path: String containing the path to the output file.
+        :param seconds: Float with the seconds spent parsing the variables and translating the template.
+        :param error: String with the type and message of the exception that stopped the job or None if it succeeded.
+        """
+        self.variables_path = variables_path
+        self.output_path = output_path
+        self.seconds = seconds
+        self.error = error
+
+    @property
+    def succeeded(self):
+        """
+        Whether the output file was written.
+        :return: Boolean saying whether the job did not raise any exception.
+        """
+        return self.error is None
+
+
+def _run_job(renderer, encoding, variables_class, variables_cache, variables_path, output_path):
+    """
+    Parses a variables file and translates the template with it, catching the errors so the other jobs go on.
+    :param renderer: Object with a render method that receives the variables and the sink, as in
+    engine.translator.BACKENDS.
+    :param encoding: String with the encoding of the bytes-like verbatim values or None if they are strings.
+    :param variables_class: engine.symbol_table.VariableManager class used to read the variables file.
+    :param variables_cache: engine.variables_cache.VariablesCache used to reuse the parsed variables or None.
+    :param variables_path: String containing the path to the variables file.
+    :param output_path: String containing the path to the output file.
+    :return: engine.batch_translation.JobResult with the timing and the error of the job.
+    """
+    start = time.perf_counter()
+    try:
+        if variables_cache is not None:
+            var_mgr = variables_cache.load(variables_path, variables_class)
+        else:
+            var_mgr = variables_class(variables_path)
+            var_mgr.parse()
+        with translator.OutputFileManager(output_path, encoding) as out_mgr:
+            renderer.render(var_mgr, out_mgr)
+    except Exception as e:
+        return JobResult(variables_path, output_path, time.perf_counter() - start,
+                         "{}: {}".format(e.__class__.__name__, e))
+    return JobResult(variables_path, output_path, time.perf_counter() - start)
+
+
+def _init_worker(data, backend, variables_format, variables_cache_size):
+    """
+    Initializes a worker process with the template it translates, so the template is received once and not once per
+    job.
+    :param data: Bytes with the template serialized with engine.compilation.CompiledTemplate.dumps.
+    :param backend: String with the key of the BACKENDS used to translate the template.
+    :param variables_format: String with the key of the engine.symbol_table.FORMATS of the variables files.
+    :param variables_cache_size: Integer with the maximum size of the cache of variables of the worker process or None
+    to parse the variables of every job.
+    """
+    global _worker_template
+    compiled_template = compilation.CompiledTemplate.loads(data)
+    var_cache = None
+    if variables_cache_size is not None:
+        var_cache = variables_cache.VariablesCache(variables_cache_size)
+    _worker_template = (translator.BACKENDS[backend](compiled_template, None), compiled_template.encoding,
+                        symbol_table.FORMATS[variables_format], var_cache)
+
+
+def _run_worker_job(variables_path, output_path):
+    """
+    Translates the template of the worker process with a variables file.
+    :param variables_path: String containing the path to the variables file.
+    :param output_path: String containing the path to the output file.
+    :return: engine.batch_translation.JobResult with the timing and the error of the job.
+    """
+    renderer, encoding, variables_class, variables_cache = _worker_template
+    return _run_job(renderer, encoding, variables_class, variables_cache, variables_path, output_path)
+
+
+class BatchTranslator:
+    """
+    Class that translates one template with many variables files. The template is analyzed once and the jobs are
+    translated in a pool of threads or processes.
+    """
+
+    def __init__(self, template_path, scanner_class=lexical_analysis.Scanner, cache=None, backend='tree', workers=None,
+                 pool='thread', variables_format='text', variables_cache=None):
+        """
+        Constructor that initializes the object arguments.
+        :param template_path: String containing the path to the template file to analyze.
+        :param scanner_class: engine.lexical_analysis.Scanner class used for the lexical analysis of the template.
+        :param cache: engine.template_cache.TemplateCache used to store the compiled template or None.
+        :param backend: String with the key of the engine.translator.BACKENDS used to translate the template.
+        :param workers: Integer with the number of threads or processes or None to use the default of the pool.
+        :param pool: String with the key of the POOLS used to translate the jobs.
+        :param variables_format: String with the key of the engine.symbol_table.FORMATS of the variables files.
+        :param variables_cache: engine.variables_cache.VariablesCache used to reuse the parsed variables of the jobs
+        with the same variables file or None. Each process of a pool of processes has its own cache of the same size.
+        :raise: ValueError when the backend, the pool or the format of the variables are not known.
+        """
+        if backend not in translator.BACKENDS:
+            raise ValueError("Unknown backend {}".format(backend))
+        if pool not in POOLS:
+            raise ValueError("Unknown pool {}".format(pool))
+        if variables_format not in symbol_table.FORMATS:
+            raise ValueError("Unknown format of variables {}".format(variables_format))
+        self.template_path = template_path
+        self.scanner_class = scanner_class
+        self.cache = cache
+        self.backend = backend
+        self.workers = workers
+        self.pool = pool
+        self.variables_format = variables_format
+        self.variables_cache = variables_cache
+        self.compiled_template = None
+
+    def compile(self):
+        """
+        Performs the lexical and syntactical analysis of the template the first time it is called.
+        :return: engine.compilation.CompiledTemplate with the elements of the template.
+        :raise: SyntaxException if it finds syntax errors in the template.
+        """
+        if self.compiled_template is None and self.cache is not None:
+            self.compiled_template = self.cache.load(self.template_path, self.scanner_class)
+        elif self.compiled_template is None:
+            self.compiled_template = compilation.CompiledTemplate.compile(self.template_path, self.scanner_class)
+        return self.compiled_template
+
+    def run(self, jobs):
+        """
+        Translates the template with each variables file. A job that fails does not stop the others.
+        :param jobs: Iterable of tuples (String, String) with the path to a variables file and the path to its output
+        file.
+        :return: engine.batch_translation.JobResult of each job in the same order as the jobs.
+        :raise: SyntaxException if it finds syntax errors in the template.
+        """
+        compiled_template = self.compile()
+        variables_paths, output_paths = [], []
+        for variables_path, output_path in jobs:
+            variables_paths.append(variables_path)
+            output_paths.append(output_path)
+        if self.pool == 'process':
+            executor = POOLS[self.pool](self.workers, initializer=_init_worker,
+                                        initargs=(compiled_template.dumps(), self.backend, self.variables_format,
+                                                  None if self.variables_cache is None
+                                                  else self.variables_cache.max_size))
+            job = _run_worker_job
+        else:
+            executor = POOLS[self.pool](self.workers)
+            renderer = translator.BACKENDS[self.backend](compiled_template, self.cache)
+            job = functools.partial(_run_job, renderer, compiled_template.encoding,
+                                    symbol_table.FORMATS[self.variables_format], self.variables_cache)
+        with executor:
+            yield from executor.map(job, variables_paths, output_paths)
+
+
+def read_jobs(jobs_path):
+    """
+    Reads the jobs file. Each line has the path to a variables file and the path to its output file separated by a tab.
+    :param jobs_path: String containing the path to the jobs file.
+    :return: List of tuples (String, String) with the paths of each job.
+    :raise: ValueError if a line does not have two paths.
+    """
+    jobs = []
+    with open(jobs_path, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.rstrip('\r\n')
+            if not line.strip():
+                continue
+            paths = line.split('\t')
+            if len(paths) != 2:
+                raise ValueError("Line {} of the jobs file {} does not have two paths separated by a tab".format(
+                    line_number, jobs_path))
+            jobs.append((paths[0], paths[1]))
+    return jobs
+
+
+def parse_command_line():
+    """
+    Parses the user input.
+    :return: argparse.Namespace with the user input.
+    """
+    parser = argparse.ArgumentParser(
+        description="Template processor that translates one template file with many variable files. Each line of the"
+                    " jobs file has the path to a variables file and the path to its output file separated by a tab.",
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-t", "--template_file_path", required=True, default=None, action="store",
+                        help="Path to the template file.")
+    parser.add_argument("-j", "--jobs_file_path", required=True, default=None, action="store",
+                        help="Path to the jobs file.")
+    parser.add_argument("-s", "--scanner", required=False, default="line", choices=sorted(translator.SCANNERS.keys()),
+                        action="store", help="Lexical analysis mode of the template file.")
+    parser.add_argument("--cache_dir", required=False, default=None, action="store",
+                        help="Directory where the compiled templates are stored to be reused in later executions.")
+    parser.add_argument("--cache_size", required=False, default=template_cache.TemplateCache.DEFAULT_MAX_SIZE,
+                        type=int, action="store", help="Maximum number of bytes used by the cache directory.")
+    parser.add_argument("--backend", required=False, default="tree", choices=sorted(translator.BACKENDS.keys()),
+                        action="store", help="Representation of the template used for the translation.")
+    parser.add_argument("--variables_format", required=False, default="text",
+                        choices=sorted(symbol_table.FORMATS.keys()), action="store",
+                        help="Format of the variables files.")
+    parser.add_argument("--variables_cache_size", required=False, default=None, type=int, action="store",
+                        help="Maximum number of bytes of the parsed variables kept in memory, so the jobs with the same"
+                             " variables file do not parse it again.")
+    parser.add_argument("--pool", required=False, default="thread", choices=sorted(POOLS.keys()), action="store",
+                        help="Kind of pool used to translate the jobs.")
+    parser.add_argument("--workers", required=False, default=None, type=int, action="store",
+                        help="Number of threads or processes used to translate the jobs.")
+    parser.add_argument("--verbose", required=False, default=False, action="store_true",
+                        help="Logs the timing of every job.")
+
+    autocomplete(parser)
+    return parser.parse_args()
+
+
+def main():
+    """
+    Main function of the module. Executes the translations and exits with an error if any job failed.
+    """
+    args = parse_command_line()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(name)s: %(message)s")
+    logger = logging.getLogger(BatchTranslator.__name__)
+    cache = None
+    if args.cache_dir:
+        cache = template_cache.TemplateCache(args.cache_dir, args.cache_size)
+    var_cache = None
+    if args.variables_cache_size is not None:
+        var_cache = variables_cache.VariablesCache(args.variables_cache_size)
+    batch = BatchTranslator(args.template_file_path, translator.SCANNERS[args.scanner], cache, args.backend,
+                            args.workers, args.pool, args.variables_format, var_cache)
+    failures = 0
+    start = time.perf_counter()
+    for result in batch.run(read_jobs(args.jobs_file_path)):
+        if result.succeeded:
+            logger.info("{} -> {}: {:.3f} s".format(result.variables_path, result.output_path, result.seconds))
+        else:
+            failures += 1
+            logger.error("{} -> {} failed after {:.3f} s: {}".format(
+                result.variables_path, result.output_path, result.seconds, result.error))
+    logger.info("Jobs translated in {:.3f} s, {} failed".format(time.perf_counter() - start, failures))
+    if var_cache is not None and args.pool == 'thread':
+        logger.info("Variables cache hits: {}, misses: {}, evictions: {}".format(
+            var_cache.hits, var_cache.misses, var_cache.evictions))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
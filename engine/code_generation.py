@@ -0,0 +1,166 @@
+import itertools
+import marshal
+
+import symbol_table
+from syntactical_analysis import LoopElement, ReplacementElement
+
+# Maximum number of loops nested in the same generated function. The deeper loops are generated in inner functions
+# because python limits the number of blocks nested statically in a function.
+MAX_NESTED_LOOPS = 16
+
+# Value of the variables that were not defined.
+_MISSING = object()
+
+
+def _lookup(get_replacement, name):
+    """
+    Obtains the value of a variable without raising an exception if it was not defined.
+    :param get_replacement: Function that obtains the value of a variable by its name.
+    :param name: String with the name of the variable.
+    :return: String or list of strings with the value of the variable or _MISSING if it was not defined.
+    """
+    try:
+        return get_replacement(name)
+    except symbol_table.VariableNotFoundException:
+        return _MISSING
+
+
+def _hidden(name, item, value):
+    """
+    Raises the exception of a loop iterator hiding a variable of the file, as engine.symbol_table.Scope does.
+    :param name: String with the name of the iterator.
+    :param item: Value of the iterator.
+    :param value: Value of the variable hidden.
+    :raise: VariableHiddenException always.
+    """
+    raise symbol_table.VariableHiddenException("The variable '{0}:{1}' hides the existing '{0}':'{2}'".format(
+        name, item, value))
+
+
+class GeneratedTemplate:
+    """
+    Class that translates a template with a python function generated from its syntactical elements. The loops are
+    generated as for loops and the variables as local variables, so the translation does not walk the tree of elements.
+    """
+
+    FILENAME = "<generated template>"
+
+    def __init__(self, source, constants, encoding=None, code=None):
+        """
+        Constructor that initializes the object arguments compiling the source if needed.
+        :param source: String with the python source of the module with the render function.
+        :param constants: Tuple with the verbatim values used by the source as c0, c1...
+        :param encoding: String with the encoding of the bytes-like verbatim values or None if they are strings.
+        :param code: Code object of the source already compiled or None to compile it.
+        """
+        self.source = source
+        self.constants = tuple(constants)
+        self.encoding = encoding
+        self._code = compile(source, GeneratedTemplate.FILENAME, 'exec') if code is None else code
+        namespace = {'MISSING': _MISSING, 'lookup': _lookup, 'hidden': _hidden}
+        namespace.update(('c{}'.format(index), value) for index, value in enumerate(self.constants))
+        exec(self._code, namespace)
+        self._render = namespace['render']
+
+    @classmethod
+    def generate(cls, compiled_template):
+        """
+        Generates the python source of a compiled template.
+        :param compiled_template: engine.compilation.CompiledTemplate to convert.
+        :return: engine.code_generation.GeneratedTemplate with the template.
+        """
+        constants = []
+        interned = {}
+        global_variables = {}
+        hidden_flags = {}
+        counter = itertools.count()
+
+        def constant(value):
+            if not isinstance(value, str):
+                # Bytes-like values of memory mapped templates are not interned to avoid hashing their contents.
+                constants.append(value)
+                return 'c{}'.format(len(constants) - 1)
+            if value not in interned:
+                interned[value] = len(constants)
+                constants.append(value)
+            return 'c{}'.format(interned[value])
+
+        def variable(name, scope, lines, indent):
+            if name in scope:
+                return scope[name]
+            if name not in global_variables:
+                global_variables[name] = 'g{}'.format(len(global_variables))
+            lines.append(indent + "if {} is MISSING: get_replacement({!r})".format(global_variables[name], name))
+            return global_variables[name]
+
+        def emit(elements, scope, lines, indent, depth):
+            for element in elements:
+                if isinstance(element, ReplacementElement):
+                    lines.append(indent + "write({})".format(variable(element.variable_name, scope, lines, indent)))
+                elif isinstance(element, LoopElement):
+                    loop_array = variable(element.variable_name, scope, lines, indent)
+                    if depth == MAX_NESTED_LOOPS:
+                        function = 'loop{}'.format(next(counter))
+                        lines.append(indent + "def {}():".format(function))
+                        emit([element], scope, lines, indent + "    ", 0)
+                        lines.append(indent + "{}()".format(function))
+                        continue
+                    iterator = 'i{}'.format(next(counter))
+                    lines.append(indent + "for {} in {}:".format(iterator, loop_array))
+                    name = element.iterator_variable
+                    # An iterator hides the iterators with the same name of the enclosing loops, which already
+                    # checked the variables of the file.
+                    if name not in scope:
+                        if name not in hidden_flags:
+                            hidden_flags[name] = 'h{}'.format(len(hidden_flags))
+                        lines.append(indent + "    if {}: hidden({!r}, {}, get_replacement({!r}))".format(
+                            hidden_flags[name], name, iterator, name))
+                    loop_scope = dict(scope)
+                    loop_scope[name] = iterator
+                    body_start = len(lines)
+                    emit(element.loop_elements, loop_scope, lines, indent + "    ", depth + 1)
+                    if len(lines) == body_start:
+                        # The loop hides an enclosing iterator and its body is empty.
+                        lines.append(indent + "    pass")
+                else:
+                    lines.append(indent + "write({})".format(constant(element.value)))
+
+        body = []
+        emit(compiled_template.elements, {}, body, "    ", 0)
+        lines = ["def render(variable_manager, write):", "    get_replacement = variable_manager.get_replacement"]
+        for name, local_name in global_variables.items():
+            lines.append("    {} = lookup(get_replacement, {!r})".format(local_name, name))
+        for name, flag in hidden_flags.items():
+            lines.append("    {} = lookup(get_replacement, {!r}) is not MISSING".format(flag, name))
+        lines.extend(body or ["    pass"])
+        return cls("\n".join(lines) + "\n", constants, compiled_template.encoding)
+
+    def dumps(self):
+        """
+        Serializes the generated template, including its compiled code, in a binary form.
+        :return: Bytes with the serialized template.
+        """
+        constants = tuple(value if isinstance(value, str) else bytes(value) for value in self.constants)
+        return marshal.dumps((self.encoding, constants, self.source, self._code))
+
+    @classmethod
+    def loads(cls, data):
+        """
+        Creates a generated template from its serialized form without compiling the source again.
+        :param data: Bytes obtained with the `dumps` method.
+        :return: engine.code_generation.GeneratedTemplate with the template.
+        :raise: ValueError, EOFError or TypeError if the data is not a serialized template.
+        """
+        encoding, constants, source, code = marshal.loads(data)
+        return cls(source, constants, encoding, code)
+
+    def render(self, variable_manager, sink):
+        """
+        Performs the translation of the template printing the result in the sink.
+        :param variable_manager: engine.symbol_table.VariableManager already parsed with the replacement variables.
+        :param sink: Object with a print method that receives the translated chunks.
+        :raise: FileParseException if the variables file has not yet been parsed.
+        :raise: VariableNotFound if the variable was not in the file.
+        :raise: VariableHiddenException if a loop iterator has the same name as another variable.
+        """
+        self._render(variable_manager, sink.print)
@@ -0,0 +1,179 @@
+import marshal
+
+import lexical_analysis
+import optimization
+import semantic_analysis
+import syntactical_analysis
+
+
+class CompiledTemplate:
+    """
+    Class that stores the syntactical elements of a template parsed only once, so it can be translated many times with
+    different variables.
+    """
+
+    def __init__(self, elements, encoding=None):
+        """
+        Constructor that initializes the object arguments.
+        :param elements: Iterable of engine.syntactical_analysis.ParserElement with the top level elements of the
+        template. The elements of the loops are frozen as tuples.
+        :param encoding: String with the encoding of the bytes-like verbatim values or None if they are strings.
+        """
+        self._elements = tuple(CompiledTemplate._freeze(element) for element in elements)
+        self.encoding = encoding
+
+    @classmethod
+    def compile(cls, template_path, scanner_class=lexical_analysis.Scanner):
+        """
+        Performs the lexical and syntactical analysis of a template file.
+        :param template_path: String containing the path to the template file to analyze.
+        :param scanner_class: engine.lexical_analysis.Scanner class used for the lexical analysis of the template.
+        :return: engine.compilation.CompiledTemplate with the elements of the template.
+        :raise: IOError when there is no file with such path.
+        :raise: SyntaxException if it finds syntax errors in the template.
+        """
+        scanner = scanner_class(template_path)
+        return cls(syntactical_analysis.Parser(scanner).parse(), scanner.encoding)
+
+    @staticmethod
+    def _freeze(element):
+        """
+        Replaces the list of elements of the loops by tuples so they can not be modified.
+        :param element: engine.syntactical_analysis.ParserElement to freeze.
+        :return: The same element.
+        """
+        if isinstance(element, syntactical_analysis.LoopElement):
+            element.loop_elements = tuple(CompiledTemplate._freeze(loop_element)
+                                          for loop_element in element.loop_elements)
+        return element
+
+    @staticmethod
+    def serialize_element(element):
+        """
+        Converts a syntactical element in a structure of built-in types. Verbatim elements are stored as their values,
+        replacements as a tuple with the variable name and loops as a tuple with the variable name, the iterator and
+        the tuple of serialized elements of the loop.
+        :param element: engine.syntactical_analysis.ParserElement to convert.
+        :return: String, bytes or tuple with the contents of the element.
+        """
+        if isinstance(element, syntactical_analysis.LoopElement):
+            return (element.variable_name, element.iterator_variable,
+                    tuple(CompiledTemplate.serialize_element(loop_element) for loop_element in element.loop_elements))
+        if isinstance(element, syntactical_analysis.ReplacementElement):
+            return element.variable_name,
+        if isinstance(element.value, str):
+            return element.value
+        return bytes(element.value)
+
+    @staticmethod
+    def deserialize_element(value):
+        """
+        Converts a structure obtained with `serialize_element` in a syntactical element.
+        :param value: String, bytes or tuple with the contents of the element.
+        :return: engine.syntactical_analysis.ParserElement with the element.
+        :raise: ValueError if the structure does not have the shape of an element.
+        """
+        if isinstance(value, (str, bytes)):
+            return syntactical_analysis.VerbatimElement(value)
+        if not isinstance(value, tuple) or not all(isinstance(name, str) for name in value[:2]):
+            raise ValueError("The structure {!r} is not a serialized element".format(value))
+        if len(value) == 1:
+            return syntactical_analysis.ReplacementElement(value[0])
+        if len(value) != 3 or not isinstance(value[2], tuple):
+            raise ValueError("The structure {!r} is not a serialized element".format(value))
+        return syntactical_analysis.LoopElement(
+            value[0], value[1], [CompiledTemplate.deserialize_element(loop_value) for loop_value in value[2]])
+
+    def dumps(self):
+        """
+        Serializes the compiled template in a compact binary form.
+        :return: Bytes with the serialized template.
+        """
+        return marshal.dumps((self.encoding,
+                              tuple(CompiledTemplate.serialize_element(element) for element in self._elements)))
+
+    @classmethod
+    def loads(cls, data):
+        """
+        Creates a compiled template from its serialized form.
+        :param data: Bytes obtained with the `dumps` method.
+        :return: engine.compilation.CompiledTemplate with the elements of the template.
+        :raise: ValueError, EOFError or TypeError if the data is not a serialized template.
+        """
+        value = marshal.loads(data)
+        if not isinstance(value, tuple) or len(value) != 2 or not isinstance(value[1], tuple):
+            raise ValueError("The data is not a serialized template")
+        encoding, elements = value
+        return cls((CompiledTemplate.deserialize_element(element) for element in elements), encoding)
+
+    @property
+    def elements(self):
+        """
+        Top level syntactical elements of the template.
+        :return: Tuple of engine.syntactical_analysis.ParserElement.
+        """
+        return self._elements
+
+    def variable_names(self):
+        """
+        Obtains the names of the variables of the variables file the template uses: the variables replaced and the
+        arrays of the loops that are not loop iterators.
+        :return: Frozenset of Strings with the names of the variables.
+        """
+        names = set()
+        cache = {}
+        for element in self._elements:
+            if isinstance(element, syntactical_analysis.ReplacementElement):
+                names.add(element.variable_name)
+            elif isinstance(element, syntactical_analysis.LoopElement):
+                names.update(semantic_analysis.free_variables(element, cache))
+        return frozenset(names)
+
+    def optimize(self, variable_manager=None, dump_node_counts=False):
+        """
+        Creates an optimized version of the template merging the consecutive verbatim elements and, if the variables
+        are given, folding the replacements of string variables.
+        :param variable_manager: engine.symbol_table.VariableManager already parsed or None.
+        :param dump_node_counts: Boolean saying whether the number of elements before and after the optimization are
+        logged.
+        :return: engine.compilation.CompiledTemplate with the optimized elements.
+        """
+        optimizer = optimization.Optimizer(variable_manager, dump_node_counts)
+        return CompiledTemplate(optimizer.optimize(self._elements), self.encoding)
+
+    def parse(self):
+        """
+        Returns the syntactical constructions of the template without analyzing it again, so the object can be used
+        instead of an engine.syntactical_analysis.Parser.
+        :return: ParserElement with the next syntactical construction.
+        """
+        return iter(self._elements)
+
+    def run(self, variable_manager, flush_size=semantic_analysis.SemanticAnalyzer.DEFAULT_FLUSH_SIZE):
+        """
+        Performs the translation of the template returning the translated chunks one by one.
+        :param variable_manager: engine.symbol_table.VariableManager already parsed with the replacement variables.
+        :param flush_size: Integer with the number of characters of the translation of a loop joined before returning
+        them.
+        :return: String or bytes-like object with the next translated chunk.
+        :raise: FileParseException if the variables file has not yet been parsed.
+        :raise: VariableNotFound if the variable was not in the file.
+        :raise: VariableHiddenException if a variable with the same name already exists.
+        """
+        return semantic_analysis.SemanticAnalyzer(self, variable_manager, flush_size).run()
+
+    def render(self, variable_manager, sink, flush_size=semantic_analysis.SemanticAnalyzer.DEFAULT_FLUSH_SIZE,
+               loop_translator=None):
+        """
+        Performs the translation of the template printing the result in the sink.
+        :param variable_manager: engine.symbol_table.VariableManager already parsed with the replacement variables.
+        :param sink: Object with a print method that receives the translated chunks, such as
+        engine.translator.OutputFileManager.
+        :param flush_size: Integer with the number of characters of the translation of a loop joined before printing
+        them.
+        :param loop_translator: engine.parallel_analysis.ParallelLoopTranslator used for the top level loops or None.
+        :raise: FileParseException if the variables file has not yet been parsed.
+        :raise: VariableNotFound if the variable was not in the file.
+        :raise: VariableHiddenException if a variable with the same name already exists.
+        """
+        semantic_analysis.SemanticAnalyzer(self, variable_manager, flush_size, loop_translator).render(sink)
@@ -0,0 +1,223 @@
+import bisect
+
+import lexical_analysis
+import syntactical_analysis
+from utils import LexTokens, BaseManager
+
+
+class _RegionScanner:
+    """
+    Class that performs the lexical analysis of a region of the template keeping the spans of the tokens returned.
+    """
+
+    def __init__(self, region, after_expression):
+        """
+        Constructor that initializes the arguments of the object.
+        :param region: String with the contents of the region.
+        :param after_expression: Boolean saying whether the region starts right after the end of an expression.
+        """
+        self.region = region
+        self.after_expression = after_expression
+        self.tokens = []
+
+    def scan(self):
+        """
+        Performs the lexical analysis of the region returning the tokens one by one.
+        :return: Tuple (engine.LexTokens, String) containing the type of the token and its contents.
+        """
+        for token, start, end in lexical_analysis.BufferScanner.scan_spans(self.region, 0, self.after_expression):
+            self.tokens.append((token, start, end))
+            if token in (LexTokens.INIT_EXPRESSION, LexTokens.END_EXPRESSION, LexTokens.INIT_LOOP, LexTokens.END_LOOP):
+                yield token, None
+            else:
+                yield token, self.region[start:end]
+
+
+class IncrementalParser(BaseManager):
+    """
+    Syntactical parser that keeps the tokens and the syntactical elements of the template together with their position
+    in the template, so after an edit only the top level elements around the modified region are analyzed again.
+    """
+
+    # Number of characters compared at once when looking for the region modified in the template file.
+    _COMPARE_BLOCK_SIZE = 4096
+
+    def __init__(self, filepath):
+        """
+        Constructor that initializes the arguments of the object.
+        :param filepath: String containing the path of the template file.
+        :raise: IOError when there is no file with such path.
+        """
+        super().__init__(filepath)
+        self._source = None
+        # Top level syntactical elements, position where each of them starts and spans of their tokens relative to it.
+        self._elements = None
+        self._starts = None
+        self._tokens = None
+        # Tuple (Integer, Integer) with the region of the template analyzed in the last update.
+        self.last_region = None
+
+    def parse(self):
+        """
+        Returns the top level syntactical constructions of the template, analyzing the file the first time.
+        :return: ParserElement with the next syntactical construction found.
+        :raise: SyntaxException if it finds syntax errors in the template.
+        """
+        if self._elements is None:
+            if self._source is None:
+                self.reload()
+            else:
+                self._parse_all(self._source)
+        for element in self._elements:
+            yield element
+
+    def reload(self):
+        """
+        Reads the template file again and updates the region that changed since the last time it was analyzed.
+        :raise: SyntaxException if it finds syntax errors in the template.
+        """
+        with open(self._filepath, 'r') as template_file:
+            source = template_file.read()
+        if self._elements is None:
+            self._parse_all(source)
+            return
+        start, old_end, new_end = IncrementalParser._changed_range(self._source, source)
+        if start is not None:
+            self.update(start, old_end, source[start:new_end])
+
+    def update(self, start, end, text):
+        """
+        Replaces a region of the template analyzing only the top level elements affected by the change.
+        :param start: Integer with the position where the replaced region starts.
+        :param end: Integer with the position where the replaced region ends (not included).
+        :param text: String with the new contents of the region.
+        :raise: SyntaxException if it finds syntax errors in the template.
+        """
+        old_length = len(self._source)
+        self._source = self._source[:start] + text + self._source[end:]
+        if not self._elements:
+            self._parse_all(self._source)
+            return
+
+        delta = len(text) - (end - start)
+        # The neighbour elements are analyzed too because the change might merge them with the modified ones.
+        first = max(self._element_index(start) - 1, 0)
+        last = min(self._element_index(max(end - 1, start)) + 1, len(self._elements) - 1)
+        after_expression = first > 0 and self._tokens[first - 1][-1][0] == LexTokens.END_EXPRESSION
+        while True:
+            at_eof = last == len(self._elements) - 1
+            region_start = self._starts[first]
+            region_end = (old_length if at_eof else self._starts[last + 1]) + delta
+            try:
+                result = self._parse_region(region_start, region_end, after_expression, at_eof)
+            except syntactical_analysis.SyntaxException:
+                self._elements = None
+                raise
+            if result is not None:
+                elements, starts, tokens = result
+                if at_eof or self._last_token(first, tokens) == self._tokens[last][-1][0]:
+                    break
+            # The region does not end in the same state as before, so it is extended with the next element.
+            last += 1
+
+        self._elements[first:last + 1] = elements
+        self._starts[first:last + 1] = starts
+        self._tokens[first:last + 1] = tokens
+        following = first + len(elements)
+        if delta:
+            self._starts[following:] = [element_start + delta for element_start in self._starts[following:]]
+        self.last_region = (region_start, region_end)
+
+    def _parse_all(self, source):
+        """
+        Analyzes the whole template.
+        :param source: String with the contents of the template.
+        :raise: SyntaxException if it finds syntax errors in the template.
+        """
+        self._source = source
+        self._elements, self._starts, self._tokens = self._parse_region(0, len(source), False, True)
+        self.last_region = (0, len(source))
+
+    def _parse_region(self, region_start, region_end, after_expression, at_eof):
+        """
+        Analyzes a region of the template that starts at the beginning of a top level element.
+        :param region_start: Integer with the position where the region starts.
+        :param region_end: Integer with the position where the region ends (not included).
+        :param after_expression: Boolean saying whether the region starts right after the end of an expression.
+        :param at_eof: Boolean saying whether the region ends at the end of the template.
+        :return: Tuple (List, List, List) with the elements found, their positions and the spans of their tokens or
+        None if the region does not end with a complete element.
+        :raise: SyntaxException if it finds syntax errors in the region.
+        """
+        scanner = _RegionScanner(self._source[region_start:region_end], after_expression)
+        elements = []
+        boundaries = []
+        for element in syntactical_analysis.Parser(scanner).parse():
+            elements.append(element)
+            boundaries.append(len(scanner.tokens))
+
+        starts = []
+        tokens = []
+        consumed = 0
+        for element, boundary in zip(elements, boundaries):
+            # The end of line after a loop is discarded by the parser, so it belongs to the loop.
+            if isinstance(element, syntactical_analysis.LoopElement) and boundary < len(scanner.tokens) and \
+                    scanner.tokens[boundary][0] == LexTokens.EOL:
+                boundary += 1
+            element_start = scanner.tokens[consumed][1]
+            starts.append(region_start + element_start)
+            tokens.append([(token, start - element_start, end - element_start)
+                           for token, start, end in scanner.tokens[consumed:boundary]])
+            consumed = boundary
+        if consumed < len(scanner.tokens) and not at_eof:
+            return None
+        return elements, starts, tokens
+
+    def _last_token(self, first, tokens):
+        """
+        Obtains the type of the last token before the elements following a region.
+        :param first: Integer with the index of the first element of the region.
+        :param tokens: List with the spans of the tokens of the elements of the region.
+        :return: engine.LexTokens with the type of the last token or None if there are no tokens before.
+        """
+        if tokens:
+            return tokens[-1][-1][0]
+        if first > 0:
+            return self._tokens[first - 1][-1][0]
+        return None
+
+    def _element_index(self, position):
+        """
+        Obtains the index of the top level element that contains a position of the template.
+        :param position: Integer with the position in the template.
+        :return: Integer with the index of the element.
+        """
+        return max(bisect.bisect_right(self._starts, position) - 1, 0)
+
+    @staticmethod
+    def _changed_range(old, new):
+        """
+        Obtains the region that differs between two versions of the template.
+        :param old: String with the previous contents of the template.
+        :param new: String with the current contents of the template.
+        :return: Tuple (Integer, Integer, Integer) with the start of the region and its end in the previous and current
+        contents. (None, None, None) if both versions are the same.
+        """
+        if old == new:
+            return None, None, None
+        block = IncrementalParser._COMPARE_BLOCK_SIZE
+        limit = min(len(old), len(new))
+        start = 0
+        while start + block <= limit and old[start:start + block] == new[start:start + block]:
+            start += block
+        while start < limit and old[start] == new[start]:
+            start += 1
+
+        suffix = 0
+        limit -= start
+        while suffix + block <= limit and old[len(old) - suffix - block:len(old) - suffix] == \
+                new[len(new) - suffix - block:len(new) - suffix]:
+            suffix += block
+        while suffix < limit and old[len(old) - suffix - 1] == new[len(new) - suffix - 1]:
+            suffix += 1
+        return start, len(old) - suffix, len(new) - suffix
@@ -0,0 +1,235 @@
+import array
+import sys
+
+import symbol_table
+from syntactical_analysis import LoopElement, ReplacementElement
+
+# Operation codes of the intermediate representation. The arguments of each operation follow its code.
+# VERBATIM constant: prints the constant with the given index.
+VERBATIM = 0
+# REPLACE slot: prints the value of the variable stored in the slot.
+REPLACE = 1
+# LOOP array_slot iterator_slot end: starts a loop over the array stored in a slot, jumping to end if it is empty.
+LOOP = 2
+# NEXT start: stores the next item of the loop in its iterator slot and jumps to the start of its body, or ends it.
+NEXT = 3
+
+# Number of arguments of each operation code.
+_ARGUMENTS = {VERBATIM: 1, REPLACE: 1, LOOP: 3, NEXT: 1}
+
+# Value of the slots of the variables that were not defined.
+_MISSING = object()
+
+
+class Program:
+    """
+    Class that stores a template as a flat array of operation codes together with a table of interned constants. The
+    variables are resolved to integer slots when the program is compiled, so the translation indexes a list instead of
+    looking the variables up by name.
+    """
+
+    __slots__ = ('code', 'constants', 'names', 'global_slots', 'encoding')
+
+    def __init__(self, code, constants, names, global_slots, encoding=None):
+        """
+        Constructor that initializes the object arguments.
+        :param code: array.array of integers with the operation codes and their arguments.
+        :param constants: Tuple with the verbatim values.
+        :param names: Tuple with the name of the variable of each slot.
+        :param global_slots: Tuple with the slots of the variables read from the variables file.
+        :param encoding: String with the encoding of the bytes-like verbatim values or None if they are strings.
+        """
+        self.code = code
+        self.constants = constants
+        self.names = names
+        self.global_slots = global_slots
+        self.encoding = encoding
+
+    @classmethod
+    def compile(cls, compiled_template):
+        """
+        Converts the syntactical elements of a template in a program.
+        :param compiled_template: engine.compilation.CompiledTemplate to convert.
+        :return: engine.intermediate_representation.Program with the template.
+        """
+        code = array.array('l')
+        constants = []
+        interned = {}
+        names = []
+        global_slots = {}
+
+        def constant_index(value):
+            if not isinstance(value, str):
+                # Bytes-like values of memory mapped templates are not interned to avoid hashing their contents.
+                constants.append(value)
+                return len(constants) - 1
+            if value not in interned:
+                interned[value] = len(constants)
+                constants.append(value)
+            return interned[value]
+
+        def global_slot(name):
+            if name not in global_slots:
+                global_slots[name] = len(names)
+                names.append(name)
+            return global_slots[name]
+
+        def emit(elements, scope):
+            for element in elements:
+                if isinstance(element, ReplacementElement):
+                    slot = scope.get(element.variable_name)
+                    code.extend((REPLACE, global_slot(element.variable_name) if slot is None else slot))
+                elif isinstance(element, LoopElement):
+                    start = len(code)
+                    slot = scope.get(element.variable_name)
+                    array_slot = global_slot(element.variable_name) if slot is None else slot
+                    iterator_slot = len(names)
+                    names.append(element.iterator_variable)
+                    code.extend((LOOP, array_slot, iterator_slot, 0))
+                    loop_scope = dict(scope)
+                    loop_scope[element.iterator_variable] = iterator_slot
+                    emit(element.loop_elements, loop_scope)
+                    code.extend((NEXT, start))
+                    code[start + 3] = len(code)
+                else:
+                    code.extend((VERBATIM, constant_index(element.value)))
+
+        emit(compiled_template.elements, {})
+        return cls(code, tuple(constants), tuple(names), tuple(global_slots.values()), compiled_template.encoding)
+
+    def _load_slots(self, variable_manager):
+        """
+        Creates the list of slots with the values of the variables read from the variables file.
+        :param variable_manager: engine.symbol_table.VariableManager already parsed with the replacement variables.
+        :return: List with the value of each slot.
+        :raise: FileParseException if the file has not yet been parsed.
+        """
+        slots = [None] * len(self.names)
+        for slot in self.global_slots:
+            try:
+                slots[slot] = variable_manager.get_replacement(self.names[slot])
+            except symbol_table.VariableNotFoundException:
+                slots[slot] = _MISSING
+        return slots
+
+    def run(self, variable_manager):
+        """
+        Performs the translation of the program returning the translated chunks one by one.
+        :param variable_manager: engine.symbol_table.VariableManager already parsed with the replacement variables.
+        :return: String or bytes-like object with the next translated chunk.
+        :raise: FileParseException if the file has not yet been parsed.
+        :raise: VariableNotFound if the variable was not in the file.
+        :raise: VariableHiddenException if a loop iterator has the same name as another variable.
+        """
+        code = self.code
+        constants = self.constants
+        slots = self._load_slots(variable_manager) if self.global_slots else []
+        # Iterators of the loops being translated.
+        loops = []
+        pc = 0
+        end = len(code)
+        while pc < end:
+            operation = code[pc]
+            if operation == VERBATIM:
+                yield constants[code[pc + 1]]
+                pc += 2
+            elif operation == REPLACE:
+                value = slots[code[pc + 1]]
+                if value is _MISSING:
+                    variable_manager.get_replacement(self.names[code[pc + 1]])
+                yield value
+                pc += 2
+            elif operation == LOOP:
+                loop_array = slots[code[pc + 1]]
+                if loop_array is _MISSING:
+                    variable_manager.get_replacement(self.names[code[pc + 1]])
+                iterator = iter(loop_array)
+                item = next(iterator, _MISSING)
+                if item is _MISSING:
+                    pc = code[pc + 3]
+                    continue
+                self._check_hidden(pc, item, variable_manager)
+                slots[code[pc + 2]] = item
+                loops.append(iterator)
+                pc += 4
+            else:
+                start = code[pc + 1]
+                item = next(loops[-1], _MISSING)
+                if item is _MISSING:
+                    loops.pop()
+                    pc += 2
+                else:
+                    slots[code[start + 2]] = item
+                    pc = start + 4
+
+    def _check_hidden(self, pc, item, variable_manager):
+        """
+        Checks that the iterator of a loop does not hide a variable of the file, as engine.symbol_table.Scope does.
+        The iterators with the same name of the enclosing loops are hidden.
+        :param pc: Integer with the position of the loop in the code.
+        :param item: Value of the first item of the loop.
+        :param variable_manager: engine.symbol_table.VariableManager with the replacement variables.
+        :raise: VariableHiddenException if the iterator has the same name as a variable of the file.
+        """
+        name = self.names[self.code[pc + 2]]
+        try:
+            value = variable_manager.get_replacement(name)
+        except symbol_table.VariableNotFoundException:
+            return
+        raise symbol_table.VariableHiddenException("The variable '{0}:{1}' hides the existing '{0}':'{2}'".format(
+            name, item, value))
+
+    def render(self, variable_manager, sink):
+        """
+        Performs the translation of the program printing the result in the sink.
+        :param variable_manager: engine.symbol_table.VariableManager already parsed with the replacement variables.
+        :param sink: Object with a print method that receives the translated chunks.
+        :raise: FileParseException if the file has not yet been parsed.
+        :raise: VariableNotFound if the variable was not in the file.
+        :raise: VariableHiddenException if a loop iterator has the same name as another variable.
+        """
+        for chunk in self.run(variable_manager):
+            sink.print(chunk)
+
+    def __len__(self):
+        """
+        Obtains the number of operations of the program.
+        :return: Integer with the number of operations.
+        """
+        count = 0
+        pc = 0
+        while pc < len(self.code):
+            pc += _ARGUMENTS[self.code[pc]] + 1
+            count += 1
+        return count
+
+    def memory_size(self):
+        """
+        Obtains the memory used by the program including its constants.
+        :return: Integer with the number of bytes.
+        """
+        return (sys.getsizeof(self.code) + sys.getsizeof(self.constants) + sys.getsizeof(self.names) +
+                sum(sys.getsizeof(value) for value in self.constants))
+
+
+def tree_memory_size(elements):
+    """
+    Obtains the memory used by a tree of syntactical elements including their values.
+    :param elements: Iterable of engine.syntactical_analysis.ParserElement.
+    :return: Tuple (Integer, Integer) with the number of bytes and the number of elements.
+    """
+    size = 0
+    count = 0
+    for element in elements:
+        count += 1
+        size += sys.getsizeof(element)
+        if hasattr(element, '__dict__'):
+            size += sys.getsizeof(element.__dict__)
+        if isinstance(element, LoopElement):
+            size += sys.getsizeof(element.loop_elements)
+            loop_size, loop_count = tree_memory_size(element.loop_elements)
+            size += loop_size
+            count += loop_count
+        elif not isinstance(element, ReplacementElement):
+            size += sys.getsizeof(element.value)
+    return size, count
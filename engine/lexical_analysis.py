@@ -1,13 +1,37 @@
+import mmap
+import os
 import re
 
 from utils import LexTokens, BaseManager
 
 
+# Splits the template buffer in runs of verbatim text and "{{ ... }}" expressions. An expression without the closing
+# "}}" extends until the end of the buffer.
+_RUN_REGEX = re.compile(r"(?P<verbatim>(?:[^{]|{(?!{))[^{]*(?:{(?!{)[^{]*)*)"
+                        r"|{{(?P<expression>[^}]*(?:}(?!})[^}]*)*)(?P<end>}})?")
+# Splits the contents of an expression in words, blanks and end of lines.
+_EXPRESSION_REGEX = re.compile(r"{{|}}| |\n|[^ \n{}]+|[{}]")
+# Tokens with a fixed representation that can be found inside an expression.
+_EXPRESSION_TOKENS = {
+    '{{': LexTokens.INIT_EXPRESSION,
+    '}}': LexTokens.END_EXPRESSION,
+    '#loop': LexTokens.INIT_LOOP,
+    '/loop': LexTokens.END_LOOP,
+    ' ': LexTokens.BLANK,
+    '\n': LexTokens.EOL,
+}
+# Tokens of an expression that can not continue in the next characters.
+_COMPLETE_TOKENS = frozenset(('{{', '}}', ' ', '\n'))
+
+
 class Scanner(BaseManager):
     """
     Class that performs a lexical analysis of the template.
     """
 
+    # Encoding of the bytes-like contents of the tokens or None if the contents are strings.
+    encoding = None
+
     def __init__(self, filepath):
         """
         Constructor that initializes the arguments of the object.
@@ -23,8 +47,10 @@ class Scanner(BaseManager):
         """
         with open(self._filepath, 'r') as template_file:
             for line in template_file:
-                # Remove the \n character at the end of the line
-                line = line[:-1]
+                # Remove the \n character at the end of the line. The last line of the file might not have it.
+                eol = line.endswith('\n')
+                if eol:
+                    line = line[:-1]
 
                 line = re.findall(r"{{2}|}{2}|[^ \n{}]*", line)
                 # Removes the last empty token generated by the regex.
@@ -43,4 +69,202 @@ class Scanner(BaseManager):
                         yield LexTokens.BLANK, " "
                     else:
                         yield LexTokens.VERBATIM, word
-                yield LexTokens.EOL, "\n"
+                if eol:
+                    yield LexTokens.EOL, "\n"
+
+
+class BufferScanner(Scanner):
+    """
+    Class that performs a lexical analysis of the whole template buffer at once. All the text found between expressions,
+    including blanks and end of lines, is returned as a single VERBATIM token.
+    """
+
+    _run_regex = _RUN_REGEX
+    _expression_regex = _EXPRESSION_REGEX
+    _expression_tokens = _EXPRESSION_TOKENS
+    _eol = '\n'
+
+    def scan(self):
+        """
+        Performs the lexical analysis of the template file returning the tokens one by one.
+        :return: Tuple (engine.LexTokens, String) containing the type of the token and its contents.
+        """
+        with open(self._filepath, 'r') as template_file:
+            buffer = template_file.read()
+
+        for token, start, end in self.scan_spans(buffer):
+            if token in (LexTokens.INIT_EXPRESSION, LexTokens.END_EXPRESSION, LexTokens.INIT_LOOP, LexTokens.END_LOOP):
+                yield token, None
+            else:
+                yield token, buffer[start:end]
+
+    @classmethod
+    def scan_spans(cls, buffer, offset=0, after_expression=False):
+        """
+        Performs the lexical analysis of a buffer returning the tokens as spans of the buffer.
+        :param buffer: String (or bytes-like object for the engine.lexical_analysis.MappedScanner) with the contents of
+        the template.
+        :param offset: Integer with the position of the buffer where the analysis starts.
+        :param after_expression: Boolean saying whether the analysis starts right after the end of an expression.
+        :return: Tuple (engine.LexTokens, Integer, Integer) with the type of the token and its start and end positions.
+        """
+        for run in cls._run_regex.finditer(buffer, offset):
+            start, end = run.span()
+            if run.group('verbatim') is not None:
+                # The end of line after an expression is returned on its own so the parser can discard it after the
+                # loop constructions.
+                if after_expression and buffer[start:start + 1] == cls._eol:
+                    yield LexTokens.EOL, start, start + 1
+                    start += 1
+                if start < end:
+                    yield LexTokens.VERBATIM, start, end
+                after_expression = False
+                continue
+
+            yield LexTokens.INIT_EXPRESSION, start, start + 2
+            for word in cls._expression_regex.finditer(buffer, start + 2, run.end('expression')):
+                yield cls._expression_tokens.get(word.group(), LexTokens.VERBATIM), word.start(), word.end()
+            if run.group('end') is not None:
+                yield LexTokens.END_EXPRESSION, end - 2, end
+            after_expression = True
+
+
+class ChunkedScanner(BufferScanner):
+    """
+    Class that performs a lexical analysis of the template reading it in chunks of a fixed size, so the memory used does
+    not depend on the length of the lines of the file. The text found between expressions is returned as VERBATIM
+    tokens whose size is bounded by the size of a chunk. The words inside the expressions, such as the names of the
+    variables, are returned whole, so a word split between chunks is kept until it ends and the memory used is bounded
+    by the size of a chunk plus the length of the longest word of the expressions.
+    """
+
+    DEFAULT_CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, filepath, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Constructor that initializes the arguments of the object.
+        :param filepath: String containing the path of the template file.
+        :param chunk_size: Integer with the number of characters read from the file at once.
+        :raise: IOError when there is no file with such path.
+        :raise: ValueError when the chunk size is not a positive number.
+        """
+        super().__init__(filepath)
+        if chunk_size < 1:
+            raise ValueError("Invalid chunk size {}".format(chunk_size))
+        self.chunk_size = chunk_size
+
+    def scan(self):
+        """
+        Performs the lexical analysis of the template file returning the tokens one by one.
+        :return: Tuple (engine.LexTokens, String) containing the type of the token and its contents.
+        """
+        in_expression = False
+        after_expression = False
+        pending = ""
+        with open(self._filepath, 'r') as template_file:
+            while True:
+                chunk = template_file.read(self.chunk_size)
+                last_chunk = not chunk
+                # Only the characters that could not be processed with the previous chunk are kept.
+                pending += chunk
+                pos = 0
+                while True:
+                    if in_expression:
+                        word = _EXPRESSION_REGEX.match(pending, pos)
+                        if not word:
+                            break
+                        # A word or a brace at the end of the chunk might continue in the next one, even if it is a
+                        # keyword, as "#loop" might be the beginning of "#loopa".
+                        if word.end() == len(pending) and not last_chunk and word.group() not in _COMPLETE_TOKENS:
+                            break
+                        pos = word.end()
+                        token = _EXPRESSION_TOKENS.get(word.group(), LexTokens.VERBATIM)
+                        if token == LexTokens.END_EXPRESSION:
+                            in_expression = False
+                            after_expression = True
+                        if token in (LexTokens.INIT_EXPRESSION, LexTokens.END_EXPRESSION, LexTokens.INIT_LOOP,
+                                     LexTokens.END_LOOP):
+                            yield token, None
+                        else:
+                            yield token, word.group()
+                        continue
+
+                    if after_expression:
+                        # The end of line after an expression is returned on its own so the parser can discard it
+                        # after the loop constructions.
+                        if pos == len(pending) and not last_chunk:
+                            break
+                        if pending.startswith('\n', pos):
+                            yield LexTokens.EOL, "\n"
+                            pos += 1
+                        after_expression = False
+
+                    idx = pending.find('{{', pos)
+                    if idx == -1:
+                        # A "{" at the end of the chunk might be the beginning of a "{{".
+                        end = len(pending)
+                        if not last_chunk and pending.endswith('{'):
+                            end -= 1
+                        if pos < end:
+                            yield LexTokens.VERBATIM, pending[pos:end]
+                        pos = end
+                        break
+                    if pos < idx:
+                        yield LexTokens.VERBATIM, pending[pos:idx]
+                    yield LexTokens.INIT_EXPRESSION, None
+                    pos = idx + 2
+                    in_expression = True
+
+                pending = pending[pos:]
+                if last_chunk:
+                    break
+
+
+class MappedScanner(BufferScanner):
+    """
+    Class that performs a lexical analysis of the whole template mapping the file in memory. The VERBATIM tokens found
+    outside the expressions are returned as memoryview objects of the mapped file, so their contents are never copied.
+    """
+
+    encoding = 'utf-8'
+
+    _run_regex = re.compile(_RUN_REGEX.pattern.encode())
+    _expression_regex = re.compile(_EXPRESSION_REGEX.pattern.encode())
+    _expression_tokens = {key.encode(): value for key, value in _EXPRESSION_TOKENS.items()}
+    _eol = b'\n'
+
+    def map(self):
+        """
+        Maps the template file in memory. The file is unmapped once there are no more references to the buffer.
+        :return: memoryview of the template file.
+        """
+        with open(self._filepath, 'rb') as template_file:
+            if os.fstat(template_file.fileno()).st_size == 0:
+                return memoryview(b'')
+            return memoryview(mmap.mmap(template_file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def scan(self):
+        """
+        Performs the lexical analysis of the template file returning the tokens one by one.
+        :return: Tuple (engine.LexTokens, memoryview or String) containing the type of the token and its contents. The
+        contents of the tokens inside an expression are decoded as strings.
+        """
+        buffer = self.map()
+        in_expression = False
+        for token, start, end in self.scan_spans(buffer):
+            if token == LexTokens.INIT_EXPRESSION:
+                in_expression = True
+                yield token, None
+            elif token == LexTokens.END_EXPRESSION:
+                in_expression = False
+                yield token, None
+            elif token in (LexTokens.INIT_LOOP, LexTokens.END_LOOP):
+                yield token, None
+            elif token == LexTokens.BLANK:
+                yield token, " "
+            elif token == LexTokens.EOL:
+                yield token, "\n"
+            elif in_expression:
+                yield token, str(buffer[start:end], self.encoding)
+            else:
+                yield token, buffer[start:end]
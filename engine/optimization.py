@@ -0,0 +1,98 @@
+import logging
+
+import symbol_table
+from syntactical_analysis import LoopElement, VerbatimElement, ReplacementElement
+
+
+class Optimizer:
+    """
+    Class that simplifies the syntactical elements of a template before its translation. The consecutive verbatim
+    elements are merged in a single one and, if the variables are known, the replacements of string variables are
+    folded into verbatim text.
+    """
+
+    def __init__(self, variable_manager=None, dump_node_counts=False):
+        """
+        Constructor that initializes the object arguments.
+        :param variable_manager: engine.symbol_table.VariableManager already parsed with the variables used to fold
+        the replacements or None to keep all the replacements.
+        :param dump_node_counts: Boolean saying whether the number of elements before and after the optimization are
+        logged.
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.var_mgr = variable_manager
+        self.dump_node_counts = dump_node_counts
+
+    @staticmethod
+    def count_nodes(elements):
+        """
+        Counts the syntactical elements including the ones inside the loops.
+        :param elements: Iterable of engine.syntactical_analysis.ParserElement.
+        :return: Integer with the number of elements.
+        """
+        count = 0
+        for element in elements:
+            count += 1
+            if isinstance(element, LoopElement):
+                count += Optimizer.count_nodes(element.loop_elements)
+        return count
+
+    def optimize(self, elements):
+        """
+        Optimizes the syntactical elements of a template.
+        :param elements: Iterable of engine.syntactical_analysis.ParserElement with the top level elements.
+        :return: List of engine.syntactical_analysis.ParserElement with the optimized elements.
+        """
+        elements = list(elements)
+        optimized = self._optimize(elements, frozenset())
+        if self.dump_node_counts:
+            self.logger.info("Nodes before optimization: {}, after optimization: {}".format(
+                Optimizer.count_nodes(elements), Optimizer.count_nodes(optimized)))
+        return optimized
+
+    def _optimize(self, elements, iterators):
+        """
+        Optimizes a list of syntactical elements.
+        :param elements: Iterable of engine.syntactical_analysis.ParserElement.
+        :param iterators: Set with the names of the iterators of the loops that contain the elements.
+        :return: List of engine.syntactical_analysis.ParserElement with the optimized elements.
+        """
+        optimized = []
+        # Values of the consecutive verbatim text not added yet.
+        pending = []
+        for element in elements:
+            if isinstance(element, ReplacementElement):
+                value = self._constant(element.variable_name, iterators)
+                if value is not None:
+                    pending.append(value)
+                    continue
+            elif isinstance(element, VerbatimElement) and isinstance(element.value, str):
+                pending.append(element.value)
+                continue
+            elif isinstance(element, LoopElement):
+                element = LoopElement(element.variable_name, element.iterator_variable,
+                                      self._optimize(element.loop_elements, iterators | {element.iterator_variable}))
+            # Bytes-like verbatim values of memory mapped templates are not merged to avoid copying them.
+            if pending:
+                optimized.append(VerbatimElement("".join(pending)))
+                pending = []
+            optimized.append(element)
+        if pending:
+            optimized.append(VerbatimElement("".join(pending)))
+        return optimized
+
+    def _constant(self, variable_name, iterators):
+        """
+        Obtains the value of a replacement that can be folded.
+        :param variable_name: String with the name of the variable replaced.
+        :param iterators: Set with the names of the iterators of the loops that contain the replacement.
+        :return: String with the value of the variable or None if it can not be folded.
+        """
+        if self.var_mgr is None or variable_name in iterators:
+            return None
+        try:
+            value = self.var_mgr.get_replacement(variable_name)
+        except symbol_table.VariableNotFoundException:
+            # The replacement is kept so the error is raised during the translation.
+            return None
+        return value if isinstance(value, str) else None
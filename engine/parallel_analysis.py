@@ -0,0 +1,307 @@
+import concurrent.futures
+import io
+import marshal
+import mmap
+import os
+import re
+
+import compilation
+import lexical_analysis
+import semantic_analysis
+import symbol_table
+import syntactical_analysis
+from utils import LexTokens, BaseManager
+
+# Finds the expressions that start a line, where the template can be split, and the loop keywords, that tell whether the
+# expression is inside a loop. The first group is the keyword of an expression that starts a line and the second one
+# the keyword of any other expression.
+_SPLIT_REGEX = re.compile(rb"^{{(?: *(#loop|/loop)(?![^ \n{}]))?|{{ *(#loop|/loop)(?![^ \n{}])", re.MULTILINE)
+
+# Name of the slice of the array translated by a worker process. It is not a valid variable name, so it does not hide
+# any variable used by the body of the loop.
+_SLICE_NAME = " slice"
+
+# Loop translated by the worker process, set once by the initializer of the pool.
+_worker_loop = None
+
+
+class _TextScanner:
+    """
+    Class that performs the lexical analysis of a piece of a template as the engine.lexical_analysis.BufferScanner does,
+    counting the tokens returned and keeping the type of the last one.
+    """
+
+    def __init__(self, text):
+        """
+        Constructor that initializes the arguments of the object.
+        :param text: String with the contents of the piece of the template.
+        """
+        self.text = text
+        self.count = 0
+        self.last_token = None
+
+    def scan(self):
+        """
+        Performs the lexical analysis of the text returning the tokens one by one.
+        :return: Tuple (engine.LexTokens, String) containing the type of the token and its contents.
+        """
+        for token, start, end in lexical_analysis.BufferScanner.scan_spans(self.text):
+            self.count += 1
+            self.last_token = token
+            if token in (LexTokens.INIT_EXPRESSION, LexTokens.END_EXPRESSION, LexTokens.INIT_LOOP, LexTokens.END_LOOP):
+                yield token, None
+            else:
+                yield token, self.text[start:end]
+
+
+def _read(filepath, start, end=None):
+    """
+    Reads a piece of the template as a file opened in text mode does.
+    :param filepath: String containing the path of the template file.
+    :param start: Integer with the position in bytes where the piece starts.
+    :param end: Integer with the position in bytes where the piece ends (not included) or None to read until the end.
+    :return: String with the contents of the piece.
+    """
+    with open(filepath, 'rb') as template_file:
+        template_file.seek(start)
+        data = template_file.read(-1 if end is None else end - start)
+    return io.TextIOWrapper(io.BytesIO(data)).read()
+
+
+def _parse_chunk(filepath, start, end):
+    """
+    Performs the lexical and syntactical analysis of a chunk of the template in a worker process.
+    :param filepath: String containing the path of the template file.
+    :param start: Integer with the position in bytes where the chunk starts.
+    :param end: Integer with the position in bytes where the chunk ends (not included).
+    :return: Bytes with the top level elements of the chunk serialized as engine.compilation.CompiledTemplate does,
+    which is faster than pickling them, or None if the chunk has syntax errors or does not end with a complete element.
+    """
+    scanner = _TextScanner(_read(filepath, start, end))
+    elements = []
+    consumed = 0
+    try:
+        for element in syntactical_analysis.Parser(scanner).parse():
+            elements.append(element)
+            consumed = scanner.count
+    except syntactical_analysis.SyntaxException:
+        return None
+    # The end of line after a loop is discarded by the parser, so it is the only token that can follow the last element.
+    if elements and isinstance(elements[-1], syntactical_analysis.LoopElement) and scanner.count == consumed + 1 and \
+            scanner.last_token == LexTokens.EOL:
+        consumed += 1
+    if consumed != scanner.count:
+        return None
+    return marshal.dumps(tuple(compilation.CompiledTemplate.serialize_element(element) for element in elements))
+
+
+class ParallelParser(BaseManager):
+    """
+    Syntactical parser that splits the template in chunks at the expressions that start a line outside of any loop and
+    analyzes the chunks in a pool of processes. The elements are returned in the same order and with the same contents
+    as engine.syntactical_analysis.Parser with an engine.lexical_analysis.BufferScanner returns them.
+    """
+
+    DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+
+    # Encoding of the bytes-like contents of the elements or None if the contents are strings.
+    encoding = None
+
+    def __init__(self, filepath, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Constructor that initializes the arguments of the object.
+        :param filepath: String containing the path of the template file.
+        :param workers: Integer with the number of processes or None to use one per processor.
+        :param chunk_size: Integer with the minimum number of bytes of each chunk.
+        :raise: IOError when there is no file with such path.
+        :raise: ValueError when the chunk size is not a positive number.
+        """
+        super().__init__(filepath)
+        if chunk_size < 1:
+            raise ValueError("Invalid chunk size {}".format(chunk_size))
+        self.workers = workers
+        self.chunk_size = chunk_size
+
+    def split_points(self):
+        """
+        Scans the template looking for the positions where it can be split in chunks.
+        :return: List of Integers with the position in bytes where each chunk starts followed by the size of the file.
+        """
+        size = os.path.getsize(self._filepath)
+        points = [0]
+        if size == 0:
+            return points + [size]
+        with open(self._filepath, 'rb') as template_file, \
+                mmap.mmap(template_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            depth = 0
+            for match in _SPLIT_REGEX.finditer(buffer):
+                keyword = match.group(1) or match.group(2)
+                if depth == 0 and keyword != b"/loop" and match.group(2) is None and \
+                        match.start() >= points[-1] + self.chunk_size:
+                    points.append(match.start())
+                if keyword == b"#loop":
+                    depth += 1
+                elif keyword == b"/loop":
+                    depth -= 1
+        return points + [size]
+
+    def parse(self):
+        """
+        Parsing function that yields the different syntactical constructions found.
+        :return: ParserElement with the next syntactical construction found.
+        :raise: SyntaxException if it finds syntax errors in the template.
+        """
+        points = self.split_points()
+        if len(points) == 2:
+            yield from syntactical_analysis.Parser(_TextScanner(_read(self._filepath, 0))).parse()
+            return
+
+        self.logger.info("Parsing {} chunks of {}".format(len(points) - 1, self._filepath))
+        with concurrent.futures.ProcessPoolExecutor(self.workers) as pool:
+            chunks = pool.map(_parse_chunk, [self._filepath] * (len(points) - 1), points[:-1], points[1:])
+            for start, data in zip(points, chunks):
+                if data is None:
+                    # The chunk is analyzed again with the rest of the template, so the errors are the same ones the
+                    # whole template has.
+                    yield from syntactical_analysis.Parser(_TextScanner(_read(self._filepath, start))).parse()
+                    return
+                for value in marshal.loads(data):
+                    yield compilation.CompiledTemplate.deserialize_element(value)
+
+
+class _Variables:
+    """
+    Class that provides the variables used by a loop in a worker process as engine.symbol_table.VariableManager does.
+    """
+
+    def __init__(self, variables):
+        """
+        Constructor that initializes the arguments of the object.
+        :param variables: Dictionary with the value of each variable.
+        """
+        self._variables = variables
+
+    def get_replacement(self, key):
+        """
+        Gets the value of a variable.
+        :param key: String containing the variable name.
+        :return: String or List with the replacement value.
+        :raise: VariableNotFound if the variable was not used by the loop.
+        """
+        try:
+            return self._variables[key]
+        except KeyError:
+            raise symbol_table.VariableNotFoundException("The variable '{}' was not defined".format(key))
+
+
+def _init_loop(iterator_variable, data, variables):
+    """
+    Initializes a worker process with the loop it translates, so the body is received once and not once per slice.
+    :param iterator_variable: String with the name of the iterator of the loop.
+    :param data: Bytes with the elements of the body serialized as engine.compilation.CompiledTemplate does.
+    :param variables: Dictionary with the value of the variables used by the loop.
+    """
+    global _worker_loop
+    loop_elements = [compilation.CompiledTemplate.deserialize_element(value) for value in marshal.loads(data)]
+    _worker_loop = (syntactical_analysis.LoopElement(_SLICE_NAME, iterator_variable, loop_elements), variables)
+
+
+def _translate_slice(items, flush_size):
+    """
+    Translates the loop of the worker process for a slice of its array.
+    :param items: List with the items of the slice.
+    :param flush_size: Integer with the number of characters of the translation joined before returning them.
+    :return: List with the translated chunks.
+    :raise: VariableNotFound if a variable used by the loop was not in the file.
+    :raise: VariableHiddenException if an iterator has the same name as a variable of the file.
+    """
+    loop, variables = _worker_loop
+    variables = dict(variables)
+    variables[_SLICE_NAME] = items
+    analyzer = semantic_analysis.SemanticAnalyzer(None, _Variables(variables), flush_size)
+    return list(analyzer.run_elements([loop]))
+
+
+class ParallelLoopTranslator:
+    """
+    Class that translates the top level loops whose array is longer than a threshold in a pool of processes. The array
+    is split in contiguous slices that are translated by the workers and the translations are returned in the same
+    order, so the result is the same one the engine.semantic_analysis.SemanticAnalyzer obtains.
+    """
+
+    DEFAULT_THRESHOLD = 100000
+
+    # Number of slices of the array for each worker process.
+    SLICES_PER_WORKER = 4
+
+    def __init__(self, workers=None, threshold=DEFAULT_THRESHOLD):
+        """
+        Constructor that initializes the arguments of the object.
+        :param workers: Integer with the number of processes or None to use one per processor.
+        :param threshold: Integer with the minimum number of items of the arrays translated in parallel.
+        :raise: ValueError when the number of processes is not a positive number.
+        """
+        if workers is not None and workers < 1:
+            raise ValueError("Invalid number of workers {}".format(workers))
+        self.workers = workers
+        self.threshold = threshold
+
+    @staticmethod
+    def _variable_names(elements, names):
+        """
+        Collects the names of the variables and iterators used by some elements.
+        :param elements: Iterable of engine.syntactical_analysis.ParserElement.
+        :param names: Set where the names are added.
+        """
+        for element in elements:
+            if isinstance(element, syntactical_analysis.ReplacementElement):
+                names.add(element.variable_name)
+            elif isinstance(element, syntactical_analysis.LoopElement):
+                names.add(element.variable_name)
+                names.add(element.iterator_variable)
+                ParallelLoopTranslator._variable_names(element.loop_elements, names)
+
+    def translate(self, loop, scope, flush_size):
+        """
+        Translates a top level loop in the pool of processes if its array is long enough.
+        :param loop: engine.syntactical_analysis.LoopElement to translate.
+        :param scope: engine.symbol_table.Scope with the variables of the file.
+        :param flush_size: Integer with the number of characters of the translation joined before returning them.
+        :return: Iterator over the translated chunks or None if the loop must be translated serially.
+        :raise: VariableNotFound if the variable was not in the file.
+        """
+        loop_array = scope.get_replacement(loop.variable_name)
+        # The streamed arrays are not sliced, so they are read item by item.
+        if isinstance(loop_array, symbol_table.ArrayStream) or len(loop_array) < max(self.threshold, 1):
+            return None
+        names = {loop.iterator_variable}
+        ParallelLoopTranslator._variable_names(loop.loop_elements, names)
+        variables = {}
+        for name in names:
+            try:
+                variables[name] = scope.get_replacement(name)
+            except symbol_table.VariableNotFoundException:
+                pass
+        data = marshal.dumps(tuple(compilation.CompiledTemplate.serialize_element(element)
+                                   for element in loop.loop_elements))
+        return self._translate(loop, loop_array, data, variables, flush_size)
+
+    def _translate(self, loop, loop_array, data, variables, flush_size):
+        """
+        Translates the slices of the array in the pool of processes.
+        :param loop: engine.syntactical_analysis.LoopElement to translate.
+        :param loop_array: List with the items of the loop.
+        :param data: Bytes with the serialized elements of the body of the loop.
+        :param variables: Dictionary with the value of the variables used by the loop.
+        :param flush_size: Integer with the number of characters of the translation joined before returning them.
+        :return: String or bytes-like object with the next translated chunk.
+        :raise: VariableNotFound if a variable used by the loop was not in the file.
+        :raise: VariableHiddenException if an iterator has the same name as a variable of the file.
+        """
+        workers = self.workers or os.cpu_count() or 1
+        slice_size = -(-len(loop_array) // (workers * ParallelLoopTranslator.SLICES_PER_WORKER))
+        slices = [loop_array[start:start + slice_size] for start in range(0, len(loop_array), slice_size)]
+        with concurrent.futures.ProcessPoolExecutor(workers, initializer=_init_loop,
+                                                    initargs=(loop.iterator_variable, data, variables)) as pool:
+            for chunks in pool.map(_translate_slice, slices, [flush_size] * len(slices)):
+                yield from chunks
@@ -1,4 +1,61 @@
-from syntactical_analysis import LoopElement, VerbatimElement, ReplacementElement
+import collections
+import itertools
+import operator
+
+from symbol_table import ArrayStream, Scope, VariableNotFoundException
+from syntactical_analysis import LoopElement, ReplacementElement
+
+# Value returned by the iterators of the loop arrays when they have no more items.
+_END = object()
+
+
+def free_variables(loop, cache):
+    """
+    Obtains the names of the variables a loop depends on: its array and the variables replaced inside it that are not
+    bound by its own iterator or by the iterators of the loops inside it. The loops are visited without recursion, so
+    the depth of the loops is not limited by the recursion limit.
+    :param loop: engine.syntactical_analysis.LoopElement to analyze.
+    :param cache: Dictionary with the names already obtained for each loop by its id, updated with the loops visited.
+    :return: Frozenset with the names of the variables.
+    """
+    pending = [(loop, False)]
+    while pending:
+        element, visited = pending.pop()
+        if id(element) in cache:
+            continue
+        if not visited:
+            pending.append((element, True))
+            pending.extend((child, False) for child in element.loop_elements if isinstance(child, LoopElement))
+            continue
+        names = set()
+        for child in element.loop_elements:
+            if isinstance(child, ReplacementElement):
+                names.add(child.variable_name)
+            elif isinstance(child, LoopElement):
+                names.update(cache[id(child)])
+        names.discard(element.iterator_variable)
+        names.add(element.variable_name)
+        cache[id(element)] = frozenset(names)
+    return cache[id(loop)]
+
+
+def simple_loop_body(loop):
+    """
+    Analyzes whether the body of a loop is made only of verbatim text and replacements, so the loop can be translated
+    in bulk.
+    :param loop: engine.syntactical_analysis.LoopElement to analyze.
+    :return: Tuple with the verbatim strings and the names of the variables replaced in the order of the body, as
+    engine.syntactical_analysis.ReplacementElement, or None if the body has loops or bytes-like verbatim values.
+    """
+    body = []
+    for element in loop.loop_elements:
+        if isinstance(element, ReplacementElement):
+            body.append(element)
+        elif isinstance(element, LoopElement) or not isinstance(element.value, str):
+            return None
+        else:
+            body.append(element.value)
+    return tuple(body)
 
 
 class SemanticAnalyzer:
@@ -6,38 +63,291 @@ class SemanticAnalyzer:
     Class that performs the translation of the template placeholders into their final result.
     """
 
-    def __init__(self, parser, variable_manager):
+    # Number of characters of the translation of a loop joined before returning them.
+    DEFAULT_FLUSH_SIZE = 64 * 1024
+    # Number of characters of the translations of the independent inner loops kept to reuse them.
+    DEFAULT_MEMO_SIZE = 1024 * 1024
+
+    def __init__(self, parser, variable_manager, flush_size=DEFAULT_FLUSH_SIZE, loop_translator=None,
+                 memo_size=DEFAULT_MEMO_SIZE):
         """
         Constructor that initializes the object arguments.
         :param parser: engine.syntactical_analysis.Parser object that provides the syntax elements.
         :param variable_manager: engine.symbol_table.VariableManager that contains the replacement variables.
+        :param flush_size: Integer with the number of characters of the translation of a loop that are joined before
+        returning them. The memory used by a loop is bounded by this size instead of by the length of its translation.
+        :param loop_translator: Object with a translate method that receives a top level loop, the scope and the flush
+        size and returns the translated chunks or None to translate the loop here, such as
+        engine.parallel_analysis.ParallelLoopTranslator, or None to translate all the loops here.
+        :param memo_size: Integer with the number of characters of the translations of the inner loops independent of
+        the enclosing iterators kept to reuse them in the next iterations. The loops whose translation does not fit are
+        translated again in every iteration.
         """
         self.parser = parser
         self.var_mgr = variable_manager
+        self.flush_size = flush_size
+        self.loop_translator = loop_translator
+        self.memo_size = memo_size
+        # Free variables of each loop and whether each inner loop is independent of the enclosing iterators, by id.
+        self._free_variables = {}
+        self._independent_loops = {}
+        # Result of engine.semantic_analysis.simple_loop_body for each loop by id.
+        self._simple_loops = {}
+
+    def _is_independent(self, loop, stack):
+        """
+        Checks whether an inner loop does not depend on the iterators of the enclosing loops, so its translation is the
+        same in every iteration of them.
+        :param loop: engine.syntactical_analysis.LoopElement inside the loops of the stack.
+        :param stack: List with the frames of the enclosing loops.
+        :return: Boolean saying whether the translation of the loop can be reused.
+        """
+        independent = self._independent_loops.get(id(loop))
+        if independent is None:
+            names = free_variables(loop, self._free_variables)
+            independent = not any(frame[0].iterator_variable in names for frame in stack)
+            self._independent_loops[id(loop)] = independent
+        return independent
+
+    def _translate_simple_loop(self, loop, scope, loop_array=None):
+        """
+        Prepares the translation in bulk of a loop whose body is made only of verbatim text and replacements. The body
+        is split in static fragments around the replacements of the iterator, the other replacements are resolved once,
+        and the items are joined in batches of about the flush size without changing the scope for each of them.
+        :param loop: engine.syntactical_analysis.LoopElement to translate.
+        :param scope: engine.symbol_table.Scope with the loop iterators of the translation.
+        :param loop_array: Value of the array of the loop or None to obtain it from the scope.
+        :return: Iterator over the translated chunks or None if the loop must be translated element by element, also
+        when the flush size is 0.
+        :raise: FileParseException if the file has not yet been parsed.
+        :raise: VariableNotFound if the variable was not in the file.
+        :raise: VariableHiddenException if the iterator has the same name as a variable of the file.
+        """
+        if self.flush_size < 1:
+            # Every chunk is returned on its own, so there is nothing to join.
+            return None
+        body = self._simple_loops.get(id(loop), _END)
+        if body is _END:
+            body = self._simple_loops[id(loop)] = simple_loop_body(loop)
+        if body is None:
+            return None
+        if loop_array is None:
+            loop_array = scope.get_replacement(loop.variable_name)
+        fragments = []
+        current = []
+        for part in body:
+            if isinstance(part, str):
+                current.append(part)
+            elif part.variable_name == loop.iterator_variable:
+                fragments.append("".join(current))
+                current = []
+            else:
+                # The errors of the variables and the values that are not strings are left to the translation element
+                # by element.
+                try:
+                    value = scope.get_replacement(part.variable_name)
+                except VariableNotFoundException:
+                    return None
+                if not isinstance(value, str):
+                    return None
+                current.append(value)
+        fragments.append("".join(current))
+        items = iter(loop_array)
+        first = next(items, _END)
+        if first is _END:
+            return iter(())
+        # The iterator raises the same exception it would raise in the translation element by element.
+        scope.check_hidden(loop.iterator_variable, first)
+        if fragments == [""]:
+            # The items are read anyway, so an array that is not correct raises the same exception.
+            collections.deque(items, maxlen=0)
+            return iter(())
+        return self._join_items(fragments, itertools.chain((first,), items))
+
+    def _join_items(self, fragments, items):
+        """
+        Translates the items of a simple loop joining each batch of them at once.
+        :param fragments: List of Strings with the static text around the replacements of the iterator.
+        :param items: Iterator over the items of the loop.
+        :return: String with the translation of a batch of items or the item itself if it is not a string.
+        """
+        static_size = sum(len(fragment) for fragment in fragments)
+        holes = len(fragments) - 1
+        if holes > 1:
+            item_format = "{0}".join(fragment.replace("{", "{{").replace("}", "}}") for fragment in fragments)
+        while True:
+            first = next(items, _END)
+            if first is _END:
+                return
+            item_size = static_size + holes * (len(first) if isinstance(first, str) else 1)
+            batch = [first]
+            batch.extend(itertools.islice(items, max(self.flush_size // max(item_size, 1), 1) - 1))
+            if not all(isinstance(item, str) for item in batch):
+                # The items that are not strings are returned on their own, as the translation element by element does.
+                for item in batch:
+                    for index, fragment in enumerate(fragments):
+                        if index > 0:
+                            yield item
+                        if fragment:
+                            yield fragment
+                continue
+            if holes == 0:
+                yield fragments[0] * len(batch)
+            elif holes == 1:
+                yield fragments[0] + (fragments[1] + fragments[0]).join(batch) + fragments[1]
+            else:
+                yield "".join(map(item_format.format, batch))
 
-    def _translate(self, parser_element):
+    def _translate(self, parser_element, scope, memo):
         """
         Translates the syntactical element received.
         :param parser_element: engine.syntactical_analysis.ParserElement to translate.
-        :return: String with the translation.
+        :param scope: engine.symbol_table.Scope with the loop iterators of the translation.
+        :param memo: Dictionary with the translated chunks of the inner loops independent of the enclosing iterators
+        by the id of the loop and the number of characters kept in all of them by None.
+        :return: String with the translation or bytes-like object for the verbatim elements of a memory mapped template.
         :raise: FileParseException if the file has not yet been parsed.
         :raise: VariableNotFound if the variable was not in the file.
         :raise: VariableHiddenException if a variable with the same name already exists.
         """
-        if isinstance(parser_element, VerbatimElement) or issubclass(parser_element.__class__, VerbatimElement):
+        if isinstance(parser_element, ReplacementElement):
+            yield scope.get_replacement(parser_element.variable_name)
+            return
+        if not isinstance(parser_element, LoopElement):
             yield parser_element.value
-        if isinstance(parser_element, ReplacementElement) or issubclass(parser_element.__class__, ReplacementElement):
-            yield self.var_mgr.get_replacement(parser_element.variable_name)
-        if isinstance(parser_element, LoopElement) or issubclass(parser_element.__class__, LoopElement):
-            translated_elements = []
-            loop_array = self.var_mgr.get_replacement(parser_element.variable_name)
-            for var_value in loop_array:
-                self.var_mgr.add_loop_variable(parser_element.iterator_variable, var_value)
-                for expr in parser_element.loop_elements:
-                    gen = self._translate(expr)
-                    for el in gen:
+            return
+        if self.loop_translator is not None:
+            translation = self.loop_translator.translate(parser_element, scope, self.flush_size)
+            if translation is not None:
+                yield from translation
+                return
+        yield from self._translate_loop(parser_element, scope, memo)
+
+    def _memoize(self, chunks, memo, key):
+        """
+        Returns the translated chunks of an inner loop keeping them in the memo if they fit in the memo size, so the
+        memory does not grow with the length of the translation.
+        :param chunks: Iterator over the translated chunks of the loop.
+        :param memo: Dictionary with the translated chunks of the inner loops by the id of the loop and the number of
+        characters kept in all of them by None.
+        :param key: Integer with the id of the loop.
+        :return: String with the translation or bytes-like object for the verbatim elements of a memory mapped template.
+        """
+        kept = []
+        size = memo.get(None, 0)
+        for chunk in chunks:
+            if kept is not None:
+                size += len(chunk)
+                if size > self.memo_size:
+                    # The rest of the translation is only streamed.
+                    kept = None
+                else:
+                    kept.append(chunk)
+            yield chunk
+        if kept is not None:
+            memo[key] = kept
+            memo[None] = size
+
+    def _translate_loop(self, parser_element, scope, memo, loop_array=None):
+        """
+        Translates a loop. The loops are translated with an explicit stack of frames instead of nested generators, so
+        the cost of each chunk does not depend on how deep the loops are nested. The inner loops that do not depend on
+        the iterators of the enclosing loops are translated once and their chunks are reused in the next iterations,
+        unless their arrays are streamed, and the loops whose body is made only of verbatim text and replacements are
+        translated in bulk.
+        :param parser_element: engine.syntactical_analysis.LoopElement to translate.
+        :param scope: engine.symbol_table.Scope with the loop iterators of the translation.
+        :param memo: Dictionary with the translated chunks of the inner loops independent of the enclosing iterators
+        by the id of the loop and the number of characters kept in all of them by None.
+        :param loop_array: Value of the array of the loop or None to obtain it from the scope.
+        :return: String with the translation or bytes-like object for the verbatim elements of a memory mapped template.
+        :raise: FileParseException if the file has not yet been parsed.
+        :raise: VariableNotFound if the variable was not in the file.
+        :raise: VariableHiddenException if a variable with the same name already exists.
+        """
+        if loop_array is None:
+            loop_array = scope.get_replacement(parser_element.variable_name)
+        simple_translation = self._translate_simple_loop(parser_element, scope, loop_array)
+        if simple_translation is not None:
+            yield from simple_translation
+            return
+        translated_elements = []
+        translated_size = 0
+        # Frames of the loops being translated with the loop element, the iterator of its array and the position of
+        # the next element of its body, or None before the first item, and the index of its iterator in the scope.
+        stack = [[parser_element, iter(loop_array), None, None]]
+        while stack:
+            frame = stack[-1]
+            loop, loop_array, index, scope_index = frame
+            if index is None or index == len(loop.loop_elements):
+                var_value = next(loop_array, _END)
+                if var_value is _END:
+                    if scope_index is not None:
+                        scope.pop()
+                    stack.pop()
+                    continue
+                if scope_index is None:
+                    frame[3] = scope.push(loop.iterator_variable, var_value)
+                else:
+                    scope.set(scope_index, var_value)
+                if not loop.loop_elements:
+                    frame[2] = 0
+                    continue
+                index = 0
+            element = loop.loop_elements[index]
+            frame[2] = index + 1
+            if isinstance(element, LoopElement):
+                if self._is_independent(element, stack):
+                    chunks = memo.get(id(element))
+                    if chunks is None:
+                        inner_array = scope.get_replacement(element.variable_name)
+                        chunks = self._translate_loop(element, scope, memo, inner_array)
+                        # The translation of a streamed array is not kept, so the memory does not grow with it, and
+                        # neither is the one of the last iteration of the enclosing loops, which is not reused. The
+                        # arrays whose length is not known might have more items.
+                        if not isinstance(inner_array, ArrayStream) and any(
+                                operator.length_hint(enclosing[1], 1) > 0 for enclosing in stack):
+                            chunks = self._memoize(chunks, memo, id(element))
+                else:
+                    chunks = self._translate_simple_loop(element, scope)
+                    if chunks is None:
+                        stack.append([element, iter(scope.get_replacement(element.variable_name)), None, None])
+                        continue
+                for el in chunks:
+                    if isinstance(el, str):
                         translated_elements.append(el)
-                self.var_mgr.delete_loop_variable(parser_element.iterator_variable)
+                        translated_size += len(el)
+                        continue
+                    if translated_elements:
+                        yield "".join(translated_elements)
+                        translated_elements = []
+                        translated_size = 0
+                    yield el
+                if translated_elements and translated_size >= self.flush_size:
+                    yield "".join(translated_elements)
+                    translated_elements = []
+                    translated_size = 0
+                continue
+            if isinstance(element, ReplacementElement):
+                el = scope.get_replacement(element.variable_name)
+            else:
+                el = element.value
+            if isinstance(el, str):
+                translated_elements.append(el)
+                translated_size += len(el)
+                if translated_size >= self.flush_size:
+                    yield "".join(translated_elements)
+                    translated_elements = []
+                    translated_size = 0
+                continue
+            # Bytes-like chunks of a memory mapped template are returned without joining them to avoid copying their
+            # contents.
+            if translated_elements:
+                yield "".join(translated_elements)
+                translated_elements = []
+                translated_size = 0
+            yield el
+        if translated_elements:
             yield "".join(translated_elements)
 
     def run(self):
@@ -48,6 +358,32 @@ class SemanticAnalyzer:
         :raise: VariableNotFound if the variable was not in the file.
         :raise: VariableHiddenException if a variable with the same name already exists.
         """
-        for item in self.parser.parse():
-            for translation in self._translate(item):
+        return self.run_elements(self.parser.parse())
+
+    def run_elements(self, elements):
+        """
+        Performs the translation of some top level elements returning the translated elements one by one.
+        :param elements: Iterable of engine.syntactical_analysis.ParserElement to translate.
+        :return: String containing the next translated element.
+        :raise: FileParseException if the file has not yet been parsed.
+        :raise: VariableNotFound if the variable was not in the file.
+        :raise: VariableHiddenException if a variable with the same name already exists.
+        """
+        scope = Scope(self.var_mgr)
+        memo = {}
+        for item in elements:
+            for translation in self._translate(item, scope, memo):
                 yield translation
+
+    def render(self, sink):
+        """
+        Performs the translation of the whole template printing the translated elements in the sink.
+        :param sink: Object with a print method that receives the translated chunks, such as
+        engine.translator.OutputFileManager.
+        :raise: FileParseException if the file has not yet been parsed.
+        :raise: VariableNotFound if the variable was not in the file.
+        :raise: VariableHiddenException if a variable with the same name already exists.
+        """
+        print_chunk = sink.print
+        for translation in self.run():
+            print_chunk(translation)
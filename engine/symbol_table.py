@@ -1,8 +1,34 @@
+import array
 import ast
+import itertools
+import json
+import logging
+import mmap
+import os
 import re
+import sys
+import types
+from abc import ABC, abstractmethod
 
 import utils
 
+# Syntax of a line of the variables file. Further explanation of the regular expression in
+# https://regex101.com/r/Grx1GN/2
+_LINE_REGEX = re.compile(r' *"(?P<token>[a-zA-Z]\w*)" *: *(?P<value>(("[^"]*")|\["[^"]*"(( *, *"[^"]*")+)\])) *$')
+
+# Syntax of the name of a variable.
+_TOKEN_REGEX = re.compile(r'[a-zA-Z]\w*')
+
+# Line of the variables file mapped in memory, with the name of the variable in the first group if the line starts with
+# it. The values are not checked until they are decoded.
+_INDEX_REGEX = re.compile(rb'^[ \r]*(?:"([a-zA-Z]\w*)" *:)?.*$', re.MULTILINE)
+
+# First bytes of a snapshot of variables, with the version of its format.
+_SNAPSHOT_MAGIC = b'TVS\x01'
+
+# Number of items of the variables of a snapshot whose value is a string.
+_SNAPSHOT_STRING = 0xFFFFFFFF
+
 
 class FileParseException(Exception):
     """
@@ -48,7 +74,9 @@ class VariableHiddenException(KeyError):
 
 class VariableManager(utils.BaseManager):
     """
-    Class that manages the replacement variables of the template engine.
+    Class that manages the replacement variables of the template engine. The variables are not modified once the file
+    is parsed, so the same manager can be shared by several translations, also from different threads. The loop
+    iterators of each translation are kept in its own engine.symbol_table.Scope.
     """
 
     def __init__(self, filepath):
@@ -59,21 +87,52 @@ class VariableManager(utils.BaseManager):
         """
         super().__init__(filepath)
         self._variables = None
-        self._loop_variables = []
+
+    @staticmethod
+    def _parse_value(text):
+        """
+        Parses the value of a line without regular expressions. The strings with backslashes are left to
+        ast.literal_eval, so their escape sequences are interpreted the same way.
+        :param text: String with the value of the line without the spaces around it.
+        :return: String or list of strings with the value or None if the value does not have the usual syntax.
+        """
+        if len(text) >= 2 and text[0] == '"' and text[-1] == '"':
+            value = text[1:-1]
+            if '"' in value:
+                return None
+            return ast.literal_eval(text) if '\\' in value else value
+        if len(text) < 4 or not text.startswith('["') or not text.endswith('"]'):
+            return None
+        parts = text[2:-2].split('"')
+        # The parts alternate between the items and the separators, and a list has at least two items.
+        if len(parts) < 3 or len(parts) % 2 == 0:
+            return None
+        if any(separator.strip(' ') != ',' for separator in set(parts[1::2])):
+            return None
+        if '\\' in text:
+            return ast.literal_eval(text)
+        return parts[0::2]
 
     @staticmethod
     def _parse_line(line):
         """
-        Parses the input line to obtain the variable to be replaced and the value.
-        Further explanation of the regular expression in https://regex101.com/r/Grx1GN/2
+        Parses the input line to obtain the variable to be replaced and the value. The usual lines, starting with the
+        name of the variable, are parsed with string methods and the rest with a regular expression.
         :param line: Input line to parse.
         :return: String with the name of the variable and a string or a list of strings with the replacement value.
         :raise: LineParseException if the line has syntax errors.
         :raise: TokenParseException if no token could be found in the line.
         :raise: ValueParseException if no value could be found in the line.
         """
-        matching_regex = r' *"(?P<token>[a-zA-Z]\w*)" *: *(?P<value>(("[^"]*")|\["[^"]*"(( *, *"[^"]*")+)\])) *$'
-        result = re.search(matching_regex, line)
+        if line.startswith('"'):
+            end = line.find('"', 1)
+            if end > 1 and _TOKEN_REGEX.fullmatch(line, 1, end):
+                rest = line[end + 1:].lstrip(' ')
+                if rest.startswith(':'):
+                    value = VariableManager._parse_value(rest[1:].strip(' '))
+                    if value is not None:
+                        return line[1:end], value
+        result = _LINE_REGEX.search(line)
         if not result:
             raise LineParseException("The line '{}' does not have the correct syntax.".format(line))
         if not result.group('token'):
@@ -82,21 +141,48 @@ class VariableManager(utils.BaseManager):
             raise ValueParseException("Unable to find a replacement value in '{}'".format(line))
         return result.group('token'), ast.literal_eval(result.group('value'))
 
-    def parse(self):
+    def read(self):
         """
-        Parses the whole replacements file updating the dictionary `self._variables` with the elements found.
+        Reads the variables of the replacements file. The other formats of variables override this method.
+        :return: Dictionary with the string or the list of strings of each variable by name.
+        :raise: LineParseException if a line of the file is not correct.
         """
-        self._variables = {}
+        variables = {}
         with open(self._filepath, 'r') as f:
             for line in f:
                 line = line.strip(' \r\n')
                 if len(line) > 0:
                     token, value = VariableManager._parse_line(line)
-                    if token in self._variables:
+                    if token in variables:
                         self.logger.warning("The variable '{}' has already been defined".format(token))
-                    self._variables[token] = value
-            if len(self._variables.keys()) == 0:
-                self.logger.warning("No variables found in the replacements file")
+                    variables[token] = value
+        return variables
+
+    def parse(self):
+        """
+        Parses the whole replacements file replacing the read-only mapping `self._variables` with the elements found.
+        :raise: FileParseException if the file is not correct.
+        """
+        variables = self.read()
+        if len(variables) == 0:
+            self.logger.warning("No variables found in the replacements file")
+        self._variables = types.MappingProxyType(variables)
+
+    def memory_size(self):
+        """
+        Estimates the memory used by the variables: the names, the values and the items of the lists.
+        :return: Integer with the number of bytes.
+        :raise: FileParseException if the file has not yet been parsed.
+        """
+        if self._variables is None:
+            raise FileParseException("The file {} has not been parsed yet".format(self._filepath))
+        # The size of the read-only mapping does not include its dictionary.
+        size = sys.getsizeof(self._variables.copy())
+        for name, value in self._variables.items():
+            size += sys.getsizeof(name) + sys.getsizeof(value)
+            if not isinstance(value, str):
+                size += sum(map(sys.getsizeof, value))
+        return size
 
     def get_replacement(self, key):
         """
@@ -114,21 +200,588 @@ class VariableManager(utils.BaseManager):
             raise VariableNotFoundException("The variable '{}' was not defined in the file '{}'".format(
                 key, self._filepath))
 
-    def add_loop_variable(self, key, value):
+
+def _checked_variables(pairs, source):
+    """
+    Checks the names and the values of the variables obtained from a source other than the replacements file.
+    :param pairs: Iterable of tuples (name, value) with the variables.
+    :param source: String with the name of the source used in the messages.
+    :return: Dictionary with the string or the list of strings of each variable by name.
+    :raise: TokenParseException if a name is not a valid variable name.
+    :raise: ValueParseException if a value is not a string or a list of strings.
+    """
+    variables = {}
+    for name, value in pairs:
+        if not isinstance(name, str) or not _TOKEN_REGEX.fullmatch(name):
+            raise TokenParseException("The name '{}' of '{}' is not a valid variable name".format(name, source))
+        if isinstance(value, (list, tuple)) and all(isinstance(item, str) for item in value):
+            value = list(value)
+        elif not isinstance(value, str):
+            raise ValueParseException("The value of the variable '{}' of '{}' is not a string or a list of "
+                                      "strings".format(name, source))
+        variables[name] = value
+    return variables
+
+
+class JsonVariableManager(VariableManager):
+    """
+    Class that manages the replacement variables of a JSON file with an object whose members are the variables.
+    """
+
+    def read(self):
         """
-        Adds a looping variable to
-        :param key: String with the variable name.
-        :param value: String with the variable value
-        :raise: VariableHiddenException if a variable with the same name already exists.
+        Reads the variables of the JSON file.
+        :return: Dictionary with the string or the list of strings of each variable by name.
+        :raise: LineParseException if the file is not a JSON object.
+        :raise: TokenParseException if a name is not a valid variable name.
+        :raise: ValueParseException if a value is not a string or a list of strings.
         """
-        if key in self._variables:
+        with open(self._filepath, 'r', encoding='utf-8') as f:
+            try:
+                document = json.load(f)
+            except ValueError as e:
+                raise LineParseException("The file {} is not correct JSON: {}".format(self._filepath, e))
+        if not isinstance(document, dict):
+            raise LineParseException("The file {} does not have a JSON object".format(self._filepath))
+        return _checked_variables(document.items(), self._filepath)
+
+
+class NdjsonVariableManager(VariableManager):
+    """
+    Class that manages the replacement variables of a file with a JSON object in each line, as the pipelines that
+    produce newline delimited JSON write them. The members of all the objects are the variables.
+    """
+
+    def read(self):
+        """
+        Reads the variables of the objects of the file.
+        :return: Dictionary with the string or the list of strings of each variable by name.
+        :raise: LineParseException if a line is not a JSON object.
+        :raise: TokenParseException if a name is not a valid variable name.
+        :raise: ValueParseException if a value is not a string or a list of strings.
+        """
+        variables = {}
+        with open(self._filepath, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    document = json.loads(line)
+                except ValueError as e:
+                    raise LineParseException("The line {} of {} is not correct JSON: {}".format(
+                        line_number, self._filepath, e))
+                if not isinstance(document, dict):
+                    raise LineParseException("The line {} of {} does not have a JSON object".format(
+                        line_number, self._filepath))
+                for name, value in _checked_variables(document.items(), self._filepath).items():
+                    if name in variables:
+                        self.logger.warning("The variable '{}' has already been defined".format(name))
+                    variables[name] = value
+        return variables
+
+
+class DictVariableManager(VariableManager):
+    """
+    Class that manages the replacement variables of a Python dictionary, so the variables produced by a program do not
+    have to be written in a file.
+    """
+
+    def __init__(self, variables, name='<dict>'):
+        """
+        Constructor that initializes the arguments of the object. The dictionary is copied when it is parsed.
+        :param variables: Mapping with the string or the list of strings of each variable by name.
+        :param name: String with the name of the source used in the messages.
+        """
+        self._filepath = name
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._variables = None
+        self._source = variables
+
+    def read(self):
+        """
+        Checks the variables of the dictionary.
+        :return: Dictionary with the string or the list of strings of each variable by name.
+        :raise: TokenParseException if a name is not a valid variable name.
+        :raise: ValueParseException if a value is not a string or a list of strings.
+        """
+        return _checked_variables(self._source.items(), self._filepath)
+
+
+class SnapshotVariableManager(VariableManager):
+    """
+    Class that manages the replacement variables of a binary snapshot, written once with `save` and loaded close to the
+    speed of reading the file. The snapshot has a header, the table of the variables and the strings:
+    - The magic bytes `TVS\\x01`.
+    - Three little endian unsigned 32 bits integers: the code point of the character that separates the strings, the
+    number of strings and the number of variables.
+    - Three integers for each variable: the index of the string with its name, the index of the string with its value or
+    of the first item of its list, and the number of items of its list or 0xFFFFFFFF if its value is a string.
+    - The strings joined by the separator, a character none of them have, encoded in UTF-8.
+    """
+
+    @staticmethod
+    def _integers(data):
+        """
+        Converts little endian unsigned 32 bits integers to an array.
+        :param data: Bytes-like object with the integers.
+        :return: array.array with the integers.
+        """
+        integers = array.array('I')
+        integers.frombytes(data)
+        if sys.byteorder == 'big':
+            integers.byteswap()
+        return integers
+
+    @staticmethod
+    def save(variables, filepath):
+        """
+        Writes a snapshot of the variables.
+        :param variables: Mapping with the string or the list of strings of each variable by name, such as the one read
+        by any engine.symbol_table.VariableManager.
+        :param filepath: String containing the path of the snapshot.
+        """
+        strings = []
+        table = array.array('I')
+        for name, value in variables.items():
+            strings.append(name)
+            if isinstance(value, str):
+                table.extend((len(strings) - 1, len(strings), _SNAPSHOT_STRING))
+                strings.append(value)
+            else:
+                # The empty lists start at their name, so every index of the table is a string.
+                table.extend((len(strings) - 1, len(strings) if value else len(strings) - 1, len(value)))
+                strings.extend(value)
+        separator = '\x00'
+        text = separator.join(strings)
+        if text.count(separator) != max(len(strings) - 1, 0):
+            used = set(text)
+            separator = next(chr(code) for code in range(1, sys.maxunicode + 1)
+                             if chr(code) not in used and not 0xD800 <= code <= 0xDFFF)
+            text = separator.join(strings)
+        header = array.array('I', (ord(separator), len(strings), len(variables)))
+        if sys.byteorder == 'big':
+            header.byteswap()
+            table.byteswap()
+        with open(filepath, 'wb') as f:
+            f.write(_SNAPSHOT_MAGIC)
+            f.write(header.tobytes())
+            f.write(table.tobytes())
+            f.write(text.encode('utf-8'))
+
+    def read(self):
+        """
+        Reads the variables of the snapshot.
+        :return: Dictionary with the string or the list of strings of each variable by name.
+        :raise: FileParseException if the file is not a correct snapshot.
+        """
+        with open(self._filepath, 'rb') as f:
+            data = f.read()
+        data = memoryview(data)
+        if bytes(data[:4]) != _SNAPSHOT_MAGIC or len(data) < 16:
+            raise FileParseException("The file {} is not a snapshot of variables".format(self._filepath))
+        separator, string_count, variable_count = SnapshotVariableManager._integers(data[4:16])
+        table_end = 16 + 12 * variable_count
+        if len(data) < table_end:
+            raise FileParseException("The snapshot {} is truncated".format(self._filepath))
+        table = SnapshotVariableManager._integers(data[16:table_end])
+        try:
+            text = str(data[table_end:], 'utf-8')
+        except UnicodeDecodeError as e:
+            raise FileParseException("The strings of the snapshot {} are not correct: {}".format(self._filepath, e))
+        strings = text.split(chr(separator)) if string_count > 0 else []
+        if len(strings) != string_count:
+            raise FileParseException("The snapshot {} is truncated".format(self._filepath))
+        # The strings are looked up all at once and the values of the lists are replaced afterwards.
+        starts, counts = table[1::3], table[2::3]
+        try:
+            names = list(map(strings.__getitem__, table[0::3]))
+            values = list(map(strings.__getitem__, starts))
+        except IndexError:
+            raise FileParseException("The table of the snapshot {} is not correct".format(self._filepath))
+        arrays = ()
+        if counts.count(_SNAPSHOT_STRING) != len(counts):
+            arrays = itertools.compress(range(len(counts)), map(_SNAPSHOT_STRING.__ne__, counts))
+        for index in arrays:
+            start, count = starts[index], counts[index]
+            if start + count > string_count:
+                raise FileParseException("The variable {} of the snapshot {} is not correct".format(
+                    index, self._filepath))
+            values[index] = strings[start:start + count]
+        return dict(zip(names, values))
+
+
+class LazyVariableManager(VariableManager):
+    """
+    Class that manages the replacement variables decoding only the ones that are used. The file is mapped in memory and
+    parsed once to index the line of each variable; the values are decoded when they are loaded or first requested.
+    """
+
+    encoding = 'utf-8'
+
+    # Value of the variables not decoded yet.
+    _MISSING = object()
+
+    def __init__(self, filepath):
+        """
+        Constructor that initializes the arguments of the object.
+        :param filepath: String containing the path of the replacements file.
+        :raise: IOError when there is no file with such path.
+        """
+        super().__init__(filepath)
+        self._buffer = None
+        # Position of the start and of the end of the line of each variable, without the end of line.
+        self._index = None
+        self._values = {}
+
+    def _line_name(self, line):
+        """
+        Obtains the name of the variable of a line that does not start with the name of a variable, parsing it
+        completely so its syntax errors are raised while the file is indexed.
+        :param line: Bytes with the line.
+        :return: String with the name of the variable or None if the line is empty.
+        :raise: LineParseException if the line has syntax errors.
+        """
+        line = str(line, self.encoding).strip(' \r')
+        if len(line) == 0:
+            return None
+        return VariableManager._parse_line(line)[0]
+
+    def parse(self):
+        """
+        Indexes the whole replacements file finding the line of each variable without decoding the values.
+        :raise: LineParseException if a line that does not start with the name of a variable has syntax errors.
+        """
+        index = {}
+        with open(self._filepath, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size > 0 else b''
+        for match in _INDEX_REGEX.finditer(self._buffer):
+            name = match.group(1)
+            if name is not None:
+                name = str(name, 'ascii')
+            else:
+                name = self._line_name(match.group())
+                if name is None:
+                    continue
+            if name in index:
+                self.logger.warning("The variable '{}' has already been defined".format(name))
+            index[name] = match.span()
+        if len(index) == 0:
+            self.logger.warning("No variables found in the replacements file")
+        self._values = {}
+        self._index = index
+
+    def load(self, names):
+        """
+        Decodes the values of some variables, ignoring the ones that are not in the file.
+        :param names: Iterable of Strings with the names of the variables.
+        :raise: FileParseException if the file has not yet been parsed.
+        :raise: LineParseException if the line of a variable has syntax errors.
+        """
+        for name in names:
+            try:
+                self.get_replacement(name)
+            except VariableNotFoundException:
+                pass
+
+    @property
+    def loaded_names(self):
+        """
+        Names of the variables already decoded.
+        :return: Frozenset of Strings.
+        """
+        return frozenset(self._values)
+
+    def get_replacement(self, key):
+        """
+        Gets the replacement value for the requested variable decoding it the first time. Decoding the same variable
+        from several threads at once gives the same value, so the manager can be shared as
+        engine.symbol_table.VariableManager.
+        :param key: String containing the variable name.
+        :return: String or List with the replacement value.
+        :raise: FileParseException if the file has not yet been parsed.
+        :raise: VariableNotFound if the variable was not in the file.
+        :raise: LineParseException if the line of the variable has syntax errors.
+        """
+        value = self._values.get(key, LazyVariableManager._MISSING)
+        if value is not LazyVariableManager._MISSING:
+            return value
+        if self._index is None:
+            raise FileParseException("The file {} has not been parsed yet".format(self._filepath))
+        if key not in self._index:
+            raise VariableNotFoundException("The variable '{}' was not defined in the file '{}'".format(
+                key, self._filepath))
+        start, end = self._index[key]
+        value = VariableManager._parse_line(str(self._buffer[start:end], self.encoding).strip(' \r'))[1]
+        self._values[key] = value
+        return value
+
+
+class ArrayStream(ABC):
+    """
+    Abstract class of the array values read item by item from their representation on disk instead of being kept in
+    memory as a list. Each iteration reads the items again, so the array can be looped many times.
+    """
+
+    @abstractmethod
+    def __iter__(self):
+        """
+        Reads the items of the array.
+        :return: String with the next item.
+        """
+
+
+class InlineArrayStream(ArrayStream):
+    """
+    Class that decodes the items of an array of a variables file mapped in memory a block at a time.
+    """
+
+    # Number of bytes of the array decoded at once.
+    DEFAULT_BLOCK_SIZE = 64 * 1024
+
+    def __init__(self, buffer, start, end, encoding='utf-8', block_size=DEFAULT_BLOCK_SIZE):
+        """
+        Constructor that initializes the arguments of the object.
+        :param buffer: mmap.mmap or bytes with the variables file.
+        :param start: Integer with the position after the opening bracket of the array.
+        :param end: Integer with the position of the closing bracket of the array.
+        :param encoding: String with the encoding of the file.
+        :param block_size: Integer with the number of bytes of the array decoded at once.
+        """
+        self._buffer = buffer
+        self._start = start
+        self._end = end
+        self.encoding = encoding
+        self.block_size = block_size
+
+    def _syntax_error(self):
+        """
+        Creates the exception raised when the array does not have the syntax of the variables file.
+        :return: LineParseException with the beginning of the array.
+        """
+        text = str(self._buffer[self._start:min(self._end, self._start + 80)], self.encoding, 'replace')
+        return LineParseException("The array '[{}' does not have the correct syntax.".format(text))
+
+    def __iter__(self):
+        """
+        Decodes the items of the array. The blocks end after the closing quote of an item, so an item is never split.
+        :return: String with the next item.
+        :raise: LineParseException if the array does not have the correct syntax.
+        """
+        buffer, position, end = self._buffer, self._start, self._end
+        count = 0
+        limit = position
+        while True:
+            limit = min(max(limit, position) + self.block_size, end)
+            block = buffer[position:limit]
+            cut = block.rfind(b'"')
+            # The quotes alternate between opening and closing ones, so the block must have an even number of them.
+            if cut >= 0 and block.count(b'"', 0, cut) % 2 == 0:
+                cut = block.rfind(b'"', 0, cut)
+            if cut < 0:
+                if limit < end:
+                    continue
+                if block.strip(b' ') or count < 2:
+                    raise self._syntax_error()
+                return
+            text = str(block[:cut], self.encoding)
+            parts = text.split('"')
+            separators = parts[0::2]
+            if count == 0:
+                if separators[0].strip(' '):
+                    raise self._syntax_error()
+                separators = separators[1:]
+            if any(separator.strip(' ') != ',' for separator in separators):
+                raise self._syntax_error()
+            items = parts[1::2]
+            if '\\' in text:
+                items = [ast.literal_eval('"{}"'.format(item)) if '\\' in item else item for item in items]
+            yield from items
+            count += len(items)
+            position = limit = position + cut + 1
+
+
+class FileArrayStream(ArrayStream):
+    """
+    Class that reads the items of an array from a file with one item per line.
+    """
+
+    def __init__(self, filepath, encoding='utf-8'):
+        """
+        Constructor that initializes the arguments of the object.
+        :param filepath: String containing the path of the file with the items.
+        :param encoding: String with the encoding of the file.
+        :raise: IOError when there is no file with such path.
+        """
+        if not os.path.isfile(filepath):
+            raise IOError("File {} not found".format(filepath))
+        self._filepath = filepath
+        self.encoding = encoding
+
+    def __iter__(self):
+        """
+        Reads the items of the array line by line.
+        :return: String with the next item without the end of line.
+        """
+        with open(self._filepath, 'r', encoding=self.encoding) as f:
+            for line in f:
+                yield line[:-1] if line.endswith('\n') else line
+
+
+class StreamingVariableManager(LazyVariableManager):
+    """
+    Class that manages the replacement variables as engine.symbol_table.LazyVariableManager does, returning the long
+    arrays and the arrays stored in their own files as engine.symbol_table.ArrayStream, so the loops read them item by
+    item.
+    """
+
+    # Number of bytes of the line of an array from which it is streamed instead of decoded as a list.
+    DEFAULT_STREAM_SIZE = 1024 * 1024
+
+    def __init__(self, filepath, array_files=None, stream_size=DEFAULT_STREAM_SIZE):
+        """
+        Constructor that initializes the arguments of the object.
+        :param filepath: String containing the path of the replacements file.
+        :param array_files: Dictionary with the path of the file with one item per line of the arrays by name or None.
+        These arrays replace the variables of the replacements file with the same name.
+        :param stream_size: Integer with the number of bytes of the line of an array from which it is streamed.
+        :raise: IOError when there is no file with such path.
+        :raise: TokenParseException if the name of an array is not a valid variable name.
+        """
+        super().__init__(filepath)
+        self.stream_size = stream_size
+        self._array_files = {}
+        for name, path in (array_files or {}).items():
+            if not _TOKEN_REGEX.fullmatch(name):
+                raise TokenParseException("The array name '{}' is not a valid variable name".format(name))
+            self._array_files[name] = FileArrayStream(path, self.encoding)
+
+    def parse(self):
+        """
+        Indexes the whole replacements file finding the line of each variable without decoding the values.
+        :raise: LineParseException if a line that does not start with the name of a variable has syntax errors.
+        """
+        super().parse()
+        for name, array in self._array_files.items():
+            if name in self._index:
+                self.logger.warning("The variable '{}' has already been defined".format(name))
+            self._values[name] = array
+
+    def get_replacement(self, key):
+        """
+        Gets the replacement value for the requested variable decoding it the first time. The arrays with a line of at
+        least the stream size are returned as engine.symbol_table.InlineArrayStream.
+        :param key: String containing the variable name.
+        :return: String, List or engine.symbol_table.ArrayStream with the replacement value.
+        :raise: FileParseException if the file has not yet been parsed.
+        :raise: VariableNotFound if the variable was not in the file.
+        :raise: LineParseException if the line of the variable has syntax errors.
+        """
+        if key in self._values or self._index is None or key not in self._index:
+            return super().get_replacement(key)
+        start, end = self._index[key]
+        if end - start < self.stream_size:
+            return super().get_replacement(key)
+        buffer = self._buffer
+        # The line of the array ends with the closing bracket and its value starts with the opening one.
+        line_end = end
+        while line_end > start and buffer[line_end - 1] in (13, 32):
+            line_end -= 1
+        value_start = buffer.find(b':', start, line_end) + 1
+        while value_start < line_end and buffer[value_start] == 32:
+            value_start += 1
+        if buffer[value_start:value_start + 2] != b'["' or buffer[line_end - 2:line_end] != b'"]':
+            return super().get_replacement(key)
+        value = self._values[key] = InlineArrayStream(buffer, value_start + 1, line_end - 1, self.encoding)
+        return value
+
+
+class Scope:
+    """
+    Class that stores the loop iterators of a translation on top of the variables of an
+    engine.symbol_table.VariableManager, which is not modified. Each loop pushes a frame with its iterator, updates it
+    by its index in every iteration and pops it at the end. An iterator hides the iterators with the same name of the
+    enclosing loops.
+    """
+
+    __slots__ = ('_variable_manager', '_frames', '_innermost')
+
+    def __init__(self, variable_manager):
+        """
+        Constructor that initializes the arguments of the object.
+        :param variable_manager: engine.symbol_table.VariableManager with the variables of the file.
+        """
+        self._variable_manager = variable_manager
+        # Lists [name, value, index of the previous frame with the same name or None].
+        self._frames = []
+        # Index of the innermost frame of each iterator name.
+        self._innermost = {}
+
+    def check_hidden(self, key, value):
+        """
+        Checks that an iterator does not hide a variable of the file. The iterators of the enclosing loops with the same
+        name can be hidden.
+        :param key: String with the name of the iterator.
+        :param value: Value of the first item of the loop.
+        :raise: VariableHiddenException if a variable of the file has the same name.
+        """
+        if key not in self._innermost:
+            try:
+                hidden = self._variable_manager.get_replacement(key)
+            except VariableNotFoundException:
+                return
             raise VariableHiddenException("The variable '{0}:{1}' hides the existing '{0}':'{2}'".format(
-                key, value, self._variables[key]))
-        self._variables[key] = value
+                key, value, hidden))
+
+    def push(self, key, value):
+        """
+        Adds the iterator of a loop.
+        :param key: String with the name of the iterator.
+        :param value: Value of the first item of the loop.
+        :return: Integer with the index of the frame of the iterator.
+        :raise: VariableHiddenException if a variable of the file has the same name.
+        """
+        self.check_hidden(key, value)
+        self._frames.append([key, value, self._innermost.get(key)])
+        self._innermost[key] = len(self._frames) - 1
+        return len(self._frames) - 1
+
+    def set(self, index, value):
+        """
+        Changes the value of an iterator.
+        :param index: Integer with the index of the frame of the iterator.
+        :param value: Value of the next item of the loop.
+        """
+        self._frames[index][1] = value
 
-    def delete_loop_variable(self, key):
+    def pop(self):
         """
-        Deletes the temporary looping variable.
-        :param key: String with the variable name.
+        Removes the iterator of the innermost loop.
         """
-        self._variables.pop(key, None)
+        key, _, previous = self._frames.pop()
+        if previous is None:
+            del self._innermost[key]
+        else:
+            self._innermost[key] = previous
+
+    def get_replacement(self, key):
+        """
+        Gets the value of an iterator or, if there is no iterator with such name, of a variable of the file.
+        :param key: String containing the variable name.
+        :return: String or List with the replacement value.
+        :raise: FileParseException if the file has not yet been parsed.
+        :raise: VariableNotFound if the variable was not in the file.
+        """
+        index = self._innermost.get(key)
+        if index is not None:
+            return self._frames[index][1]
+        return self._variable_manager.get_replacement(key)
+
+
+# Classes that read each format of variables. They receive the path of the variables file.
+FORMATS = {
+    'text': VariableManager,
+    'json': JsonVariableManager,
+    'ndjson': NdjsonVariableManager,
+    'snapshot': SnapshotVariableManager,
+}
@@ -15,6 +15,8 @@ class ParserElement(ABC):
     Base class to store all the elements detected by the parser.
     """
 
+    __slots__ = ('type',)
+
     def __init__(self, element_type):
         """
         Constructor that initializes the object type.
@@ -28,6 +30,8 @@ class VerbatimElement(ParserElement):
     Utility class to store a verbatim object
     """
 
+    __slots__ = ('value',)
+
     def __init__(self, value=None):
         """
         Constructor that initializes the object arguments.
@@ -42,6 +46,8 @@ class BlankElement(VerbatimElement):
     Special type of VerbatimElement that stores a blank space.
     """
 
+    __slots__ = ()
+
     def __init__(self):
         """
         Constructor that initializes the object arguments.
@@ -55,6 +61,8 @@ class EolElement(VerbatimElement):
     Special type of VerbatimElement that stores an end of line.
     """
 
+    __slots__ = ()
+
     def __init__(self):
         """
         Constructor that initializes the object arguments.
@@ -68,6 +76,8 @@ class ReplacementElement(ParserElement):
     Utility class to store a variable replacement element.
     """
 
+    __slots__ = ('variable_name',)
+
     def __init__(self, variable_name=None):
         """
         Constructor that initializes the object arguments.
@@ -82,6 +92,8 @@ class LoopElement(ParserElement):
     Utility class to store a loop element.
     """
 
+    __slots__ = ('variable_name', 'iterator_variable', 'loop_elements')
+
     def __init__(self, variable_name=None, iterator_variable=None, loop_elements=None):
         """
         Constructor that initializes the object arguments.
@@ -98,6 +110,151 @@ class LoopElement(ParserElement):
             self.loop_elements = loop_elements
 
 
+class _ParseContext:
+    """
+    Utility class to store the constructions that are being parsed.
+    """
+
+    __slots__ = ('loops', 'variable')
+
+    def __init__(self):
+        """
+        Constructor that initializes the object arguments.
+        """
+        self.loops = []
+        self.variable = None
+
+
+def _check_identifier(value):
+    """
+    Checks that the token is a valid variable name.
+    :param value: String with the contents of the token.
+    :raise: SyntaxException if it is not a valid variable name.
+    """
+    if not _IDENTIFIER_REGEX.match(value):
+        raise SyntaxException("Invalid replacement var name: {}".format(value))
+
+
+def _emit(element, context):
+    """
+    Adds a complete element to the loop being parsed.
+    :param element: ParserElement completed.
+    :param context: _ParseContext with the constructions being parsed.
+    :return: The element if it is a top level element or None if it belongs to a loop.
+    """
+    if context.loops:
+        context.loops[-1].loop_elements.append(element)
+        return None
+    return element
+
+
+def _verbatim(value, context):
+    """
+    Transition of a verbatim, blank or eol token outside an expression.
+    """
+    return 0, _emit(VerbatimElement(value), context)
+
+
+def _replacement_variable(value, context):
+    """
+    Transition of the variable name of a replacement ("{{ varName").
+    """
+    _check_identifier(value)
+    context.variable = value
+    return 101, None
+
+
+def _replacement_end(value, context):
+    """
+    Transition of the end of a replacement ("{{ varName }}").
+    """
+    return 0, _emit(ReplacementElement(context.variable), context)
+
+
+def _loop_variable(value, context):
+    """
+    Transition of the array variable of a loop ("{{ #loop varName").
+    """
+    _check_identifier(value)
+    context.loops.append(LoopElement(value))
+    return 201, None
+
+
+def _loop_iterator(value, context):
+    """
+    Transition of the iterator variable of a loop ("{{ #loop varName iterator").
+    """
+    _check_identifier(value)
+    context.loops[-1].iterator_variable = value
+    return 202, None
+
+
+def _loop_end(value, context):
+    """
+    Transition of the end of a loop ("{{ /loop }}").
+    """
+    if not context.loops:
+        raise SyntaxException("End of loop found outside of a loop")
+    return 400, _emit(context.loops.pop(), context)
+
+
+# Regular expression of the valid variable names.
+_IDENTIFIER_REGEX = re.compile(r"[a-zA-Z]\w*")
+
+# Transition table of the state machine of the parser indexed by state and type of token. The transitions that ignore
+# the token store the next state and the rest store a function that returns the next state and the top level element
+# completed, if any. The missing transitions are syntax errors.
+_TRANSITIONS = {
+    0: {
+        LexTokens.EOL: _verbatim,
+        LexTokens.BLANK: _verbatim,
+        LexTokens.VERBATIM: _verbatim,
+        LexTokens.INIT_EXPRESSION: 100,
+    },
+    100: {  # "{{" found
+        LexTokens.BLANK: 100,
+        LexTokens.VERBATIM: _replacement_variable,
+        LexTokens.INIT_LOOP: 200,
+        LexTokens.END_LOOP: 300,
+    },
+    101: {  # "{{ varName" found
+        LexTokens.BLANK: 101,
+        LexTokens.END_EXPRESSION: _replacement_end,
+    },
+    200: {  # "{{ #loop" found
+        LexTokens.BLANK: 200,
+        LexTokens.VERBATIM: _loop_variable,
+    },
+    201: {  # "{{ #loop varName" found
+        LexTokens.BLANK: 201,
+        LexTokens.VERBATIM: _loop_iterator,
+    },
+    202: {  # "{{ #loop varName iterator" found
+        LexTokens.BLANK: 202,
+        LexTokens.END_EXPRESSION: 400,
+    },
+    300: {  # "{{ /loop" found
+        LexTokens.BLANK: 300,
+        LexTokens.END_EXPRESSION: _loop_end,
+    },
+}
+# "{{ #loop varName iterator }}" or "{{ /loop }}" found. The end of line after them is discarded.
+_TRANSITIONS[400] = dict(_TRANSITIONS[0])
+_TRANSITIONS[400][LexTokens.EOL] = 0
+
+# Message of the syntax errors found in each state.
+_ERRORS = {
+    0: "Invalid token {}",
+    100: "Invalid token {} after {{",
+    101: "Invalid token in a variable replacement construction {}",
+    200: "Invalid token in the loop declaration {}",
+    201: "Invalid token in the loop declaration {}",
+    202: "Invalid token in the loop declaration {}",
+    300: "Invalid token in the loop end {}",
+    400: "Invalid token {}",
+}
+
+
 class Parser:
     """
     Syntactical parser for templates.
@@ -117,116 +274,16 @@ class Parser:
         :raise: SyntaxException if it finds syntax errors in the template.
         """
         state = 0
-        replacement_var = ""
-        loop_contents = []
-        loop_level = 0
-        buffered_tokens = None
-        scanner_generator = self._scanner.scan()
-        while True:
-            if buffered_tokens:
-                item = buffered_tokens
-                buffered_tokens = None
+        transitions = _TRANSITIONS[state]
+        context = _ParseContext()
+        for token, value in self._scanner.scan():
+            transition = transitions.get(token)
+            if transition is None:
+                raise SyntaxException(_ERRORS[state].format(value))
+            if type(transition) is int:
+                state = transition
             else:
-                item = next(scanner_generator, None)
-                if not item:
-                    break
-            if state == 0:
-                if item[0] in [LexTokens.EOL, LexTokens.BLANK, LexTokens.VERBATIM]:
-                    verbatim_elem = VerbatimElement(item[1])
-                    if loop_level == 0:
-                        yield verbatim_elem
-                        continue
-                    else:
-                        current_loop_object = loop_contents[loop_level - 1]
-                        current_loop_object.loop_elements.append(verbatim_elem)
-                        continue
-                if item[0] == LexTokens.INIT_EXPRESSION:
-                    state = 100
-                    continue
-                else:
-                    raise SyntaxException("Invalid token {}".format(item([1])))
-
-            if state == 100:  # "{{" found
-                if item[0] == LexTokens.BLANK:
-                    continue
-                if item[0] == LexTokens.VERBATIM:
-                    if not re.match(r"(?P<var>[a-zA-Z]\w*)", item[1]):
-                        raise SyntaxException("Invalid replacement var name: {}".format(item[1]))
-                    replacement_var = item[1]
-                    state = 101
-                    continue
-                if item[0] == LexTokens.INIT_LOOP:
-                    state = 200
-                    continue
-                if item[0] == LexTokens.END_LOOP:
-                    state = 300
-                    continue
-                else:
-                    raise SyntaxException("Invalid token {} after {{".format(item[1]))
-
-            if state == 101:  # "{{ varName" found
-                if item[0] == LexTokens.BLANK:
-                    continue
-                if item[0] == LexTokens.END_EXPRESSION:
-                    replacement_elem = ReplacementElement(replacement_var)
-                    state = 0
-                    if loop_level == 0:
-                        yield replacement_elem
-                        continue
-                    else:
-                        current_loop_object = loop_contents[loop_level - 1]
-                        current_loop_object.loop_elements.append(replacement_elem)
-                        continue
-                else:
-                    raise SyntaxException("Invalid token in a variable replacement construction {}".format(item[1]))
-
-            if state == 200:  # "{{ #loop" found
-                if item[0] == LexTokens.BLANK:
-                    continue
-                if item[0] == LexTokens.VERBATIM:
-                    if not re.match(r"(?P<var>[a-zA-Z]\w*)", item[1]):
-                        raise SyntaxException("Invalid replacement var name: {}".format(item[1]))
-                    state = 201
-                    loop_contents.insert(loop_level, LoopElement(item[1]))
-                    continue
-                else:
-                    raise SyntaxException("Invalid token in the loop declaration {}".format(item[1]))
-
-            if state == 201:  # "{{ #loop varName" found
-                if item[0] == LexTokens.BLANK:
-                    continue
-                if item[0] == LexTokens.VERBATIM:
-                    if not re.match(r"(?P<var>[a-zA-Z]\w*)", item[1]):
-                        raise SyntaxException("Invalid replacement var name: {}".format(item[1]))
-                    current_loop_object = loop_contents[loop_level - 1]
-                    current_loop_object.iterator_variable = item[1]
-                    state = 202
-                    continue
-                else:
-                    raise SyntaxException("Invalid token in the loop declaration {}".format(item[1]))
-
-            if state == 202:  # "{{ #loop varName iterator" found
-                if item[0] == LexTokens.BLANK:
-                    continue
-                if item[0] == LexTokens.END_EXPRESSION:
-                    state = 400
-                    loop_level += 1
-                    continue
-                else:
-                    raise SyntaxException("Invalid token in the loop declaration {}".format(item[1]))
-
-            if state == 300:  # "{{ /loop" found
-                if item[0] == LexTokens.BLANK:
-                    continue
-                if item[0] == LexTokens.END_EXPRESSION:
-                    state = 400
-                    loop_level -= 1
-                    if loop_level == 0:
-                        yield loop_contents[loop_level]
-                    continue
-
-            if state == 400:  # "{{ #loop varName iterator }} or {{ /loop }} found"
-                state = 0
-                if item[0] != LexTokens.EOL:
-                    buffered_tokens = item
-                continue
+                state, element = transition(value, context)
+                if element is not None:
+                    yield element
+            transitions = _TRANSITIONS[state]
@@ -0,0 +1,155 @@
+import hashlib
+import logging
+import os
+import sys
+import tempfile
+
+import code_generation
+import compilation
+import lexical_analysis
+import utils
+
+
+class TemplateCache:
+    """
+    Class that stores the compiled templates in a directory, so the templates are not analyzed again in later runs
+    while their contents do not change. It also stores the templates converted in python code, so their source is not
+    generated and compiled again.
+    """
+
+    DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+    SUFFIX = '.tplcache'
+
+    def __init__(self, cache_dir, max_size=DEFAULT_MAX_SIZE):
+        """
+        Constructor that initializes the arguments of the object creating the cache directory if needed.
+        :param cache_dir: String containing the path of the cache directory.
+        :param max_size: Integer with the maximum number of bytes used by the cache files. The least recently used
+        files are removed when the limit is exceeded.
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def _key(contents, analyzer_class):
+        """
+        Obtains the key of a template in the cache.
+        :param contents: Bytes with the contents of the template file or of the serialized compiled template.
+        :param analyzer_class: engine.lexical_analysis.Scanner class used for the lexical analysis of the template or
+        the class that converts the compiled template.
+        :return: String with the hexadecimal digest that identifies the template.
+        """
+        # The scanner might be a functools.partial with the arguments of the scanner class.
+        analyzer_name = getattr(analyzer_class, 'func', analyzer_class).__name__
+        digest = hashlib.sha256()
+        digest.update("{}:{}:".format(utils.ENGINE_VERSION, analyzer_name).encode())
+        digest.update(contents)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        """
+        Obtains the path of the cache file of a template.
+        :param key: String with the key of the template.
+        :return: String with the path of the file.
+        """
+        return os.path.join(self.cache_dir, key + TemplateCache.SUFFIX)
+
+    def load(self, template_path, scanner_class=lexical_analysis.Scanner):
+        """
+        Obtains the compiled template from the cache or compiles and stores it if it is not there.
+        :param template_path: String containing the path to the template file.
+        :param scanner_class: engine.lexical_analysis.Scanner class used for the lexical analysis of the template.
+        :return: engine.compilation.CompiledTemplate with the elements of the template.
+        :raise: IOError when there is no file with such path.
+        :raise: SyntaxException if it finds syntax errors in the template.
+        """
+        with open(template_path, 'rb') as template_file:
+            key = TemplateCache._key(template_file.read(), scanner_class)
+        return self._load(key, compilation.CompiledTemplate,
+                          lambda: compilation.CompiledTemplate.compile(template_path, scanner_class))
+
+    def load_generated(self, compiled_template):
+        """
+        Obtains the python code of a compiled template from the cache or generates and stores it if it is not there.
+        :param compiled_template: engine.compilation.CompiledTemplate to convert.
+        :return: engine.code_generation.GeneratedTemplate with the template.
+        """
+        # The compiled code depends on the python version.
+        key = TemplateCache._key(sys.implementation.cache_tag.encode() + compiled_template.dumps(),
+                                 code_generation.GeneratedTemplate)
+        return self._load(key, code_generation.GeneratedTemplate,
+                          lambda: code_generation.GeneratedTemplate.generate(compiled_template))
+
+    def _load(self, key, template_class, build):
+        """
+        Obtains a template from its cache file or builds and stores it if it is not there.
+        :param key: String with the key of the template.
+        :param template_class: Class of the template with the loads method.
+        :param build: Function without arguments that builds the template.
+        :return: Object of the template class.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as cache_file:
+                template = template_class.loads(cache_file.read())
+            # The modification time tells which files were used less recently.
+            os.utime(path)
+            self.hits += 1
+            return template
+        except FileNotFoundError:
+            pass
+        except (ValueError, EOFError, TypeError, IndexError, KeyError):
+            # A file that is not a serialized template, even if it is a correct marshal payload, is stale.
+            self.logger.warning("The cache file {} is corrupted. It will be replaced".format(path))
+
+        self.misses += 1
+        template = build()
+        self._store(path, template.dumps())
+        return template
+
+    def _store(self, path, data):
+        """
+        Writes a cache file atomically and evicts the least recently used files if the cache is too big.
+        :param path: String with the path of the cache file.
+        :param data: Bytes with the serialized template.
+        """
+        descriptor, temp_path = tempfile.mkstemp(dir=self.cache_dir)
+        with os.fdopen(descriptor, 'wb') as temp_file:
+            temp_file.write(data)
+        os.replace(temp_path, path)
+        self._evict()
+
+    def _evict(self):
+        """
+        Removes the least recently used cache files until the cache fits in its maximum size.
+        """
+        entries = []
+        total_size = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(TemplateCache.SUFFIX):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_size += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            total_size -= size
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Removes all the files of the cache.
+        """
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(TemplateCache.SUFFIX):
+                os.remove(entry.path)
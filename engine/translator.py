@@ -2,13 +2,22 @@
 # PYTHON_ARGCOMPLETE_OK
 
 import argparse
+import asyncio
+import functools
+import io
 import logging
 import os
+import re
 
+import async_translation
+import code_generation
+import compilation
+import intermediate_representation
+import parallel_analysis
 import lexical_analysis
-import semantic_analysis
 import symbol_table
 import syntactical_analysis
+import template_cache
 try:
     from argcomplete import autocomplete
 except ImportError:
@@ -17,17 +26,92 @@ except ImportError:
         pass
 
 
-class OutputFileManager:
+# Policies that decide when the output file manager writes the buffered chunks: when the buffer reaches its size, also
+# after every chunk with a line break, so the output can be followed while it is translated, or after every chunk.
+FLUSH_POLICIES = ('size', 'line', 'chunk')
+_NEWLINE_REGEX = re.compile(b'\n')
+
+
+class _CountingFileIO(io.FileIO):
     """
-    Class that manages the output file.
+    Class of the raw output file that counts the blocks and the bytes written in it. The buffered and text files only
+    check quickly if an exact io.FileIO is closed, so this class makes every printed chunk slower and is used only when
+    the statistics are logged.
     """
 
     def __init__(self, filepath):
+        """
+        Constructor that opens the file for writing.
+        :param filepath: String containing the path of the file.
+        """
+        super().__init__(filepath, 'w')
+        self.bytes_written = 0
+        self.flushes = 0
+
+    def write(self, data):
+        """
+        Writes a block of bytes in the file.
+        :param data: Bytes-like object to write.
+        :return: Integer with the number of bytes written.
+        """
+        written = super().write(data)
+        self.bytes_written += written
+        self.flushes += 1
+        return written
+
+
+class OutputFileManager:
+    """
+    Class that manages the output file. The translated chunks, usually short words, blanks and line breaks, are joined
+    in the buffer of the file and written in blocks of the buffer size, and the chunks longer than the free space of
+    the buffer are written directly without copying them, so there is no need to gather the chunks in a single
+    vectored write. In text mode the chunks are printed with the write method of the file, which also applies the
+    flush policy.
+    """
+
+    DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+    def __init__(self, filepath, encoding=None, buffer_size=DEFAULT_BUFFER_SIZE, flush_policy='size'):
         """
         Constructor that initializes the arguments of the object.
+        :param filepath: String containing the path of the output file.
+        :param encoding: String with the encoding used to write the file in binary mode, so bytes-like chunks can be
+        written directly. If None the file is written in text mode.
+        :param buffer_size: Integer with the number of bytes buffered before writing them in the file.
+        :param flush_policy: String of the FLUSH_POLICIES that decides when the buffered chunks are written.
+        :raise: ValueError when the flush policy is not known.
         """
+        if flush_policy not in FLUSH_POLICIES:
+            raise ValueError("Unknown flush policy {}".format(flush_policy))
         self.logger = logging.getLogger(self.__class__.__name__)
         self.filepath = filepath
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+        self.flush_policy = flush_policy
+        self._raw = None
+        self._written = 0
+
+    @property
+    def bytes_written(self):
+        """
+        Number of bytes written in the file, without the ones still buffered.
+        :return: Integer with the number of bytes.
+        """
+        if self._raw is None:
+            return 0
+        if isinstance(self._raw, _CountingFileIO):
+            return self._raw.bytes_written
+        return self._written if self._raw.closed else self._raw.tell()
+
+    @property
+    def flushes(self):
+        """
+        Number of blocks written in the file, only counted when the statistics are logged.
+        :return: Integer with the number of writes of the file or None if they are not counted.
+        """
+        if isinstance(self._raw, _CountingFileIO):
+            return self._raw.flushes
+        return 0 if self._raw is None else None
 
     def __enter__(self):
         """
@@ -36,25 +120,66 @@ class OutputFileManager:
         """
         if os.path.isfile(self.filepath):
             self.logger.warning("The file {} already exists. It will be truncated".format(self.filepath))
-        self.file = open(self.filepath, 'w')
+        if self.logger.isEnabledFor(logging.INFO):
+            self._raw = _CountingFileIO(self.filepath)
+        else:
+            self._raw = io.FileIO(self.filepath, 'w')
+        self.file = self._raw
+        if self.flush_policy != 'chunk':
+            self.file = io.BufferedWriter(self._raw, max(self.buffer_size, 1))
+        if self.encoding is None:
+            # The text file applies the line and chunk flush policies itself.
+            self.file = io.TextIOWrapper(self.file, line_buffering=self.flush_policy == 'line',
+                                         write_through=self.flush_policy == 'chunk')
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """
-        Context manager to close the file at the end of the with statement.
+        Context manager to write the buffered chunks and close the file at the end of the with statement.
         :param exc_type:
         :param exc_val:
         :param exc_tb:
         """
         if not self.file.closed:
-            self.file.close()
+            try:
+                self.file.flush()
+                self._written = self._raw.tell()
+            finally:
+                self.file.close()
+        self.logger.info("{} bytes written to {} in {} flushes".format(self.bytes_written, self.filepath,
+                                                                       self.flushes))
 
     def print(self, chunk):
         """
         Prints the specified chunk of text in the output file.
-        :param chunk: String with the text to print.
+        :param chunk: String with the text to print or bytes-like object if the file is written in binary mode.
         """
+        if self.encoding is None:
+            self.file.write(chunk)
+            return
+        if isinstance(chunk, str):
+            chunk = chunk.encode(self.encoding)
         self.file.write(chunk)
+        # The regular expression searches the memory mapped chunks without copying them.
+        if self.flush_policy == 'line' and _NEWLINE_REGEX.search(chunk):
+            self.file.flush()
+
+
+SCANNERS = {
+    'line': lexical_analysis.Scanner,
+    'buffer': lexical_analysis.BufferScanner,
+    'chunked': lexical_analysis.ChunkedScanner,
+    'mapped': lexical_analysis.MappedScanner,
+}
+
+# Functions that convert a compiled template in the object that performs its translation. They receive the compiled
+# template and the engine.template_cache.TemplateCache or None.
+BACKENDS = {
+    'tree': lambda compiled_template, cache: compiled_template,
+    'ir': lambda compiled_template, cache: intermediate_representation.Program.compile(compiled_template),
+    'python': lambda compiled_template, cache: (code_generation.GeneratedTemplate.generate(compiled_template)
+                                                if cache is None else cache.load_generated(compiled_template)),
+}
 
 
 class Template:
@@ -62,27 +187,158 @@ class Template:
     Class that performs the complete replacement of the placeholders of the template.
     """
 
-    def __init__(self, template_path, variables_path, output_path):
+    def __init__(self, template_path, variables_path, output_path, scanner_class=lexical_analysis.Scanner,
+                 cache=None, optimize=False, dump_node_counts=False, backend='tree', workers=None, loop_workers=None,
+                 loop_threshold=parallel_analysis.ParallelLoopTranslator.DEFAULT_THRESHOLD, lazy_variables=False,
+                 stream_arrays=False, array_files=None, variables_format='text', variables_cache=None,
+                 output_buffer_size=OutputFileManager.DEFAULT_BUFFER_SIZE, flush_policy='size'):
         """
         Constructor that initializes the object arguments.
         :param template_path: String containing the path to the template file to analyze.
         :param variables_path: String containing the path to the variables file.
+        :param output_path: String containing the path to the output file.
+        :param scanner_class: engine.lexical_analysis.Scanner class used for the lexical analysis of the template.
+        :param cache: engine.template_cache.TemplateCache used to store the compiled template or None.
+        :param optimize: Boolean saying whether the template is optimized with the variables before the translation.
+        :param dump_node_counts: Boolean saying whether the number of elements before and after the optimization are
+        logged.
+        :param backend: String with the key of the BACKENDS used to translate the template.
+        :param workers: Integer with the number of processes used to parse the template in parallel, as the
+        engine.lexical_analysis.BufferScanner does, or None to parse it with the scanner class.
+        :param loop_workers: Integer with the number of processes used to translate the long top level loops in
+        parallel or None to translate them serially. Only the tree backend supports it.
+        :param loop_threshold: Integer with the minimum number of items of the loops translated in parallel.
+        :param lazy_variables: Boolean saying whether only the variables the template uses are decoded from the
+        variables file, as engine.symbol_table.LazyVariableManager does.
+        :param stream_arrays: Boolean saying whether the long arrays of the variables file are read item by item by the
+        loops, as engine.symbol_table.StreamingVariableManager does. It implies the lazy variables.
+        :param array_files: Dictionary with the path of the file with one item per line of the arrays read item by
+        item by name or None. It implies the streamed arrays.
+        :param variables_format: String with the key of the engine.symbol_table.FORMATS of the variables file.
+        :param variables_cache: engine.variables_cache.VariablesCache used to reuse the parsed variables or None.
+        :param output_buffer_size: Integer with the number of bytes buffered before writing them in the output file.
+        :param flush_policy: String of the FLUSH_POLICIES that decides when the output is written in the file.
+        :raise: ValueError when the loops are translated in parallel with another backend, the format of the variables
+        is not known, the variables of a format other than text are loaded lazily, the variables loaded lazily are
+        cached or the flush policy is not known.
         """
-        scanner = lexical_analysis.Scanner(template_path)
+        if loop_workers is not None and backend != 'tree':
+            raise ValueError("The loops can only be translated in parallel by the tree backend")
+        if variables_format not in symbol_table.FORMATS:
+            raise ValueError("Unknown format of variables {}".format(variables_format))
+        if variables_format != 'text' and (lazy_variables or stream_arrays or array_files):
+            raise ValueError("Only the variables of the text format can be loaded lazily")
+        if variables_cache is not None and (lazy_variables or stream_arrays or array_files):
+            raise ValueError("The variables loaded lazily can not be cached")
+        if flush_policy not in FLUSH_POLICIES:
+            raise ValueError("Unknown flush policy {}".format(flush_policy))
+        scanner = scanner_class(template_path)
+        self.template_path = template_path
+        self.scanner_class = scanner_class
+        self.cache = cache
+        self.optimize = optimize
+        self.dump_node_counts = dump_node_counts
+        self.backend = backend
+        self.encoding = scanner.encoding
         self.parser = syntactical_analysis.Parser(scanner)
-        self.var_mgr = symbol_table.VariableManager(variables_path)
-        self.translator = semantic_analysis.SemanticAnalyzer(self.parser, self.var_mgr)
+        if workers is not None:
+            # The elements are the same ones the buffer scanner finds, so the cache can store them as such.
+            self.parser = parallel_analysis.ParallelParser(template_path, workers)
+            self.scanner_class = lexical_analysis.BufferScanner
+            self.encoding = self.parser.encoding
+        self.loop_translator = None
+        if loop_workers is not None:
+            self.loop_translator = parallel_analysis.ParallelLoopTranslator(loop_workers, loop_threshold)
+        self.compiled_template = None
+        self.variables_path = variables_path
+        self.lazy_variables = lazy_variables or stream_arrays or bool(array_files)
+        self.variables_class = symbol_table.FORMATS[variables_format]
+        if stream_arrays or array_files:
+            self.variables_class = functools.partial(symbol_table.StreamingVariableManager, array_files=array_files)
+        elif lazy_variables:
+            self.variables_class = symbol_table.LazyVariableManager
+        self.variables_cache = variables_cache
+        self.var_mgr = self.variables_class(variables_path)
         self.out_path = output_path
+        self.output_buffer_size = output_buffer_size
+        self.flush_policy = flush_policy
+
+    def compile(self):
+        """
+        Performs the lexical and syntactical analysis of the template the first time it is called.
+        :return: engine.compilation.CompiledTemplate with the elements of the template.
+        :raise: SyntaxException if it finds syntax errors in the template.
+        """
+        if self.compiled_template is None and self.cache is not None:
+            self.compiled_template = self.cache.load(self.template_path, self.scanner_class)
+        elif self.compiled_template is None:
+            self.compiled_template = compilation.CompiledTemplate(self.parser.parse(), self.encoding)
+        return self.compiled_template
+
+    def _renderer(self):
+        """
+        Compiles the template, loads the variables it uses if they are lazy and optimizes it with their values.
+        :return: Renderer of the backend for the compiled template.
+        :raise: SyntaxException if it finds syntax errors in the template.
+        """
+        compiled_template = self.compile()
+        if self.lazy_variables:
+            self.var_mgr.load(compiled_template.variable_names())
+        if self.optimize:
+            compiled_template = compiled_template.optimize(self.var_mgr, self.dump_node_counts)
+        return BACKENDS[self.backend](compiled_template, self.cache)
 
     def replace(self):
         """
         Performs the replacement of the placeholders in the file to the corresponding value in the variable file
-        writing the output in the output file.
+        writing the output in the output file. The template is only analyzed the first time and the variables are not
+        parsed again if they are in the cache of variables.
+        """
+        if self.variables_cache is not None:
+            self.var_mgr = self.variables_cache.load(self.variables_path, self.variables_class)
+        else:
+            self.var_mgr.parse()
+        renderer = self._renderer()
+        with OutputFileManager(self.out_path, self.encoding, self.output_buffer_size, self.flush_policy) as out_mgr:
+            if self.loop_translator is not None:
+                renderer.render(self.var_mgr, out_mgr, loop_translator=self.loop_translator)
+            else:
+                renderer.render(self.var_mgr, out_mgr)
+
+    async def replace_async(self, yield_every=async_translation.DEFAULT_YIELD_EVERY):
+        """
+        Performs the replacement as `replace` does without blocking the event loop: the files are read and written, and
+        the template analyzed and optimized, in the default executor and the translation yields to the event loop every
+        few chunks. The template is only analyzed the first time.
+        :param yield_every: Integer with the number of chunks translated between two yields to the event loop.
+        :raise: ValueError when the backend does not translate the template in chunks or the loops are translated in
+        parallel.
         """
-        self.var_mgr.parse()
-        with OutputFileManager(self.out_path) as out_mgr:
-            for chunk in self.translator.run():
-                out_mgr.print(chunk)
+        if self.loop_translator is not None:
+            raise ValueError("The loops can not be translated in parallel asynchronously")
+        if self.variables_cache is not None:
+            self.var_mgr = await asyncio.get_running_loop().run_in_executor(
+                None, self.variables_cache.load, self.variables_path, self.variables_class)
+        else:
+            self.var_mgr = await async_translation.load_variables(self.variables_path, self.variables_class)
+        # The analysis and the optimization of a large template would block the event loop.
+        renderer = await asyncio.get_running_loop().run_in_executor(None, self._renderer)
+        translator = async_translation.AsyncTranslator(renderer, yield_every)
+        async with async_translation.AsyncOutputFileManager(self.out_path, self.encoding) as out_mgr:
+            await translator.render(self.var_mgr, out_mgr)
+
+
+def _array_file(text):
+    """
+    Parses the argument of an array read from a file.
+    :param text: String with the name of the array and the path to its file separated by an equals sign.
+    :return: Tuple (String, String) with the name and the path.
+    :raise: argparse.ArgumentTypeError if the argument does not have both of them.
+    """
+    name, separator, path = text.partition('=')
+    if not name or not separator or not path:
+        raise argparse.ArgumentTypeError("'{}' is not NAME=PATH".format(text))
+    return name, path
 
 
 def parse_command_line():
@@ -100,6 +356,45 @@ def parse_command_line():
                         help="Path to the variables file.")
     parser.add_argument("-o", "--output_file_path", required=True, default=None, action="store",
                         help="Path to the output file.")
+    parser.add_argument("-s", "--scanner", required=False, default="line", choices=sorted(SCANNERS.keys()),
+                        action="store", help="Lexical analysis mode of the template file.")
+    parser.add_argument("--chunk_size", required=False, default=lexical_analysis.ChunkedScanner.DEFAULT_CHUNK_SIZE,
+                        type=int, action="store", help="Number of characters read at once by the chunked scanner.")
+    parser.add_argument("--cache_dir", required=False, default=None, action="store",
+                        help="Directory where the compiled templates are stored to be reused in later executions.")
+    parser.add_argument("--cache_size", required=False, default=template_cache.TemplateCache.DEFAULT_MAX_SIZE,
+                        type=int, action="store", help="Maximum number of bytes used by the cache directory.")
+    parser.add_argument("--optimize", required=False, default=False, action="store_true",
+                        help="Merges the verbatim text and folds the string variables before the translation.")
+    parser.add_argument("--dump_node_counts", required=False, default=False, action="store_true",
+                        help="Logs the number of elements of the template before and after the optimization.")
+    parser.add_argument("--backend", required=False, default="tree", choices=sorted(BACKENDS.keys()),
+                        action="store", help="Representation of the template used for the translation.")
+    parser.add_argument("--workers", required=False, default=None, type=int, action="store",
+                        help="Number of processes used to parse the template in parallel.")
+    parser.add_argument("--loop_workers", required=False, default=None, type=int, action="store",
+                        help="Number of processes used to translate the long top level loops in parallel with the tree"
+                             " backend.")
+    parser.add_argument("--loop_threshold", required=False,
+                        default=parallel_analysis.ParallelLoopTranslator.DEFAULT_THRESHOLD, type=int, action="store",
+                        help="Minimum number of items of the loops translated in parallel.")
+    parser.add_argument("--variables_format", required=False, default="text",
+                        choices=sorted(symbol_table.FORMATS.keys()), action="store",
+                        help="Format of the variables file.")
+    parser.add_argument("--lazy_variables", required=False, default=False, action="store_true",
+                        help="Decodes only the variables of the variables file used by the template.")
+    parser.add_argument("--stream_arrays", required=False, default=False, action="store_true",
+                        help="Reads the long arrays of the variables file item by item in the loops.")
+    parser.add_argument("--array_file", required=False, default=[], type=_array_file, action="append",
+                        metavar="NAME=PATH",
+                        help="Array read item by item from a file with one item per line. It can be repeated.")
+    parser.add_argument("--output_buffer_size", required=False, default=OutputFileManager.DEFAULT_BUFFER_SIZE, type=int,
+                        action="store", help="Number of bytes buffered before writing them in the output file.")
+    parser.add_argument("--flush_policy", required=False, default="size", choices=FLUSH_POLICIES, action="store",
+                        help="When the buffered output is written: when the buffer is full, also after every line break"
+                             " or after every chunk.")
+    parser.add_argument("--verbose", required=False, default=False, action="store_true",
+                        help="Logs the information messages.")
 
     autocomplete(parser)
     return parser.parse_args()
@@ -110,8 +405,23 @@ def main():
     Main function of the module. Executes the translation.
     """
     args = parse_command_line()
-    template = Template(args.template_file_path, args.variables_file_path, args.output_file_path)
+    if args.verbose or args.dump_node_counts:
+        logging.basicConfig(level=logging.INFO, format="%(name)s: %(message)s")
+    scanner_class = SCANNERS[args.scanner]
+    if scanner_class is lexical_analysis.ChunkedScanner:
+        scanner_class = functools.partial(scanner_class, chunk_size=args.chunk_size)
+    cache = None
+    if args.cache_dir:
+        cache = template_cache.TemplateCache(args.cache_dir, args.cache_size)
+    template = Template(args.template_file_path, args.variables_file_path, args.output_file_path, scanner_class, cache,
+                        args.optimize, args.dump_node_counts, args.backend, args.workers, args.loop_workers,
+                        args.loop_threshold, args.lazy_variables, args.stream_arrays,
+                        dict(args.array_file), args.variables_format, output_buffer_size=args.output_buffer_size,
+                        flush_policy=args.flush_policy)
     template.replace()
+    if cache is not None:
+        logging.getLogger(cache.__class__.__name__).info("Template cache hits: {}, misses: {}, evictions: {}".format(
+            cache.hits, cache.misses, cache.evictions))
 
 
 if __name__ == '__main__':
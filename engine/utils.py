@@ -4,7 +4,11 @@ import os
 from abc import ABC, abstractmethod
 
 
-class LexTokens(enum.Enum):
+# Version of the engine. It must be increased when the syntactical elements generated for a template change.
+ENGINE_VERSION = "1.0"
+
+
+class LexTokens(enum.IntEnum):
     """
     Enumeration for lexical tokens.
     """
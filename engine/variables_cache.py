@@ -0,0 +1,159 @@
+import collections
+import hashlib
+import logging
+import os
+import threading
+
+import symbol_table
+
+
+class _CacheEntry:
+    """
+    Class that stores a parsed variables file with the state of the file when it was parsed.
+    """
+
+    __slots__ = ('signature', 'digest', 'variable_manager', 'size')
+
+    def __init__(self, signature, digest, variable_manager, size):
+        """
+        Constructor that initializes the object arguments.
+        :param signature: Tuple (Integer, Integer) with the modification time in nanoseconds and the size of the file.
+        :param digest: Bytes with the hash of the contents of the file.
+        :param variable_manager: engine.symbol_table.VariableManager already parsed.
+        :param size: Integer with the estimated number of bytes used by the variables.
+        """
+        self.signature = signature
+        self.digest = digest
+        self.variable_manager = variable_manager
+        self.size = size
+
+
+class VariablesCache:
+    """
+    Class that keeps the variables files already parsed in memory, so the translations that use the same variables do
+    not parse them again while the files do not change. A file whose modification time or size changed is hashed, and
+    only parsed again if its contents changed too. The cache can be shared by several threads, as the parsed variables
+    are not modified.
+    """
+
+    DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, verify_contents=False):
+        """
+        Constructor that initializes the arguments of the object.
+        :param max_size: Integer with the maximum number of bytes used by the parsed variables. The least recently used
+        variables are removed when the limit is exceeded.
+        :param verify_contents: Boolean saying whether the contents of the files are hashed in every load, so the
+        changes that keep the modification time and the size of a file are also detected.
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.max_size = max_size
+        self.verify_contents = verify_contents
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # Entries by path and class of variables from the least to the most recently used.
+        self._entries = collections.OrderedDict()
+        self._size = 0
+
+    @staticmethod
+    def _digest(variables_path):
+        """
+        Hashes the contents of a variables file.
+        :param variables_path: String containing the path to the variables file.
+        :return: Bytes with the digest of the file.
+        """
+        digest = hashlib.sha256()
+        with open(variables_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.digest()
+
+    @property
+    def size(self):
+        """
+        Estimated memory used by the parsed variables of the cache.
+        :return: Integer with the number of bytes.
+        """
+        return self._size
+
+    def load(self, variables_path, variables_class=symbol_table.VariableManager):
+        """
+        Obtains the parsed variables of a file from the cache or parses and stores them if they are not there or the
+        file changed.
+        :param variables_path: String containing the path to the variables file.
+        :param variables_class: engine.symbol_table.VariableManager class used to parse the file, as the ones of
+        engine.symbol_table.FORMATS.
+        :return: engine.symbol_table.VariableManager already parsed, shared with the other users of the cache.
+        :raise: IOError when there is no file with such path.
+        :raise: FileParseException if the file is not correct.
+        """
+        key = (os.path.abspath(variables_path), variables_class)
+        stat = os.stat(variables_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature and not self.verify_contents:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.variable_manager
+
+        digest = VariablesCache._digest(variables_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.digest == digest:
+                entry.signature = signature
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.variable_manager
+            self.misses += 1
+
+        # The file is parsed without holding the lock, so the other files can be loaded meanwhile.
+        variable_manager = variables_class(variables_path)
+        variable_manager.parse()
+        self._store(key, _CacheEntry(signature, digest, variable_manager, variable_manager.memory_size()))
+        return variable_manager
+
+    def _store(self, key, entry):
+        """
+        Stores parsed variables and evicts the least recently used ones if the cache is too big.
+        :param key: Tuple (String, class) with the absolute path of the file and the class of the variables.
+        :param entry: engine.variables_cache._CacheEntry to store.
+        """
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous.size
+            self._entries[key] = entry
+            self._size += entry.size
+            while self._size > self.max_size and self._entries:
+                (path, _), evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+                self.evictions += 1
+                self.logger.info("The variables of {} were evicted from the cache".format(path))
+
+    def clear(self):
+        """
+        Removes all the variables of the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+# Cache shared by the whole process, created the first time it is requested.
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def shared_cache():
+    """
+    Obtains the cache of variables shared by the whole process.
+    :return: engine.variables_cache.VariablesCache with the default maximum size.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = VariablesCache()
+        return _shared_cache
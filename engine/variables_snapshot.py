@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# PYTHON_ARGCOMPLETE_OK
+
+import argparse
+import logging
+import time
+
+import symbol_table
+try:
+    from argcomplete import autocomplete
+except ImportError:
+    # If module argcomplete is not available, just skip the completion
+    def autocomplete(_):
+        pass
+
+
+def convert(variables_path, snapshot_path, variables_format='text'):
+    """
+    Parses a variables file and writes its snapshot, so the renders that use the same variables load them faster.
+    :param variables_path: String containing the path to the variables file.
+    :param snapshot_path: String containing the path to the snapshot.
+    :param variables_format: String with the key of the engine.symbol_table.FORMATS of the variables file.
+    :return: Integer with the number of variables of the snapshot.
+    :raise: ValueError when the format is not known.
+    :raise: IOError when there is no file with such path.
+    :raise: FileParseException if the variables file is not correct.
+    """
+    if variables_format not in symbol_table.FORMATS:
+        raise ValueError("Unknown format of variables {}".format(variables_format))
+    var_mgr = symbol_table.FORMATS[variables_format](variables_path)
+    variables = var_mgr.read()
+    symbol_table.SnapshotVariableManager.save(variables, snapshot_path)
+    return len(variables)
+
+
+def parse_command_line():
+    """
+    Parses the user input.
+    :return: argparse.Namespace with the user input.
+    """
+    parser = argparse.ArgumentParser(
+        description="Converts a variables file to a binary snapshot that the template processor loads faster with"
+                    " --variables_format snapshot.",
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-v", "--variables_file_path", required=True, default=None, action="store",
+                        help="Path to the variables file.")
+    parser.add_argument("-o", "--snapshot_file_path", required=True, default=None, action="store",
+                        help="Path to the snapshot file.")
+    parser.add_argument("-f", "--variables_format", required=False, default="text",
+                        choices=sorted(symbol_table.FORMATS.keys()), action="store",
+                        help="Format of the variables file.")
+    parser.add_argument("--verbose", required=False, default=False, action="store_true",
+                        help="Logs the information messages.")
+
+    autocomplete(parser)
+    return parser.parse_args()
+
+
+def main():
+    """
+    Main function of the module. Executes the conversion.
+    """
+    args = parse_command_line()
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO, format="%(name)s: %(message)s")
+    start = time.perf_counter()
+    count = convert(args.variables_file_path, args.snapshot_file_path, args.variables_format)
+    logging.getLogger(symbol_table.SnapshotVariableManager.__name__).info(
+        "{} variables written to {} in {:.3f} s".format(count, args.snapshot_file_path, time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
@@ -33,6 +33,8 @@ setup(
     entry_points={
         'console_scripts': [
             'template = engine.translator:main',
+            'template_batch = engine.batch_translation:main',
+            'template_snapshot = engine.variables_snapshot:main',
         ],
     }
 )
@@ -0,0 +1,193 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import async_translation
+import code_generation
+import compilation
+import intermediate_representation
+import lexical_analysis
+import syntactical_analysis
+from helpers import parsed_variables, StringSink
+from lexical_analisys_tests import path_composer
+from semantic_analysis_tests import expected
+from translator import Template
+
+
+class AsyncStringSink(StringSink):
+    """
+    Utility sink whose print method is a coroutine.
+    """
+
+    async def print(self, chunk):
+        """
+        Appends the chunk to the document.
+        :param chunk: String with the text to print.
+        """
+        super().print(chunk)
+
+
+class BytesWriter:
+    """
+    Utility stream writer that stores the data written.
+    """
+
+    def __init__(self):
+        """
+        Constructor that initializes the object arguments.
+        """
+        self.data = b""
+        self.drains = 0
+
+    def write(self, data):
+        """
+        Appends the data.
+        :param data: Bytes-like object to write.
+        """
+        self.data += bytes(data)
+
+    async def drain(self):
+        """
+        Counts the times the buffer is drained.
+        """
+        self.drains += 1
+
+
+class AsyncTranslatorTest(unittest.TestCase):
+    """
+    Unittests of the asynchronous translation.
+    """
+
+    def setUp(self):
+        """
+        Compiles the template of the tests.
+        """
+        self.compiled_template = compilation.CompiledTemplate.compile(
+            path_composer("template_simple_list_replacements.txt"))
+        self.var_mgr = parsed_variables("correct_var_file.txt")
+
+    def test_render(self):
+        """
+        Tests the translation with the backends that return chunks, with synchronous and asynchronous sinks.
+        """
+        for renderer in [self.compiled_template, intermediate_representation.Program.compile(self.compiled_template)]:
+            for sink in [StringSink(), AsyncStringSink()]:
+                translator = async_translation.AsyncTranslator(renderer, 1)
+                asyncio.run(translator.render(self.var_mgr, sink))
+                self.assertEqual(expected, sink.document)
+        with self.assertRaises(ValueError):
+            async_translation.AsyncTranslator(code_generation.GeneratedTemplate.generate(self.compiled_template))
+
+    def test_cooperative_yield(self):
+        """
+        Tests that the translation yields to the event loop every few chunks.
+        """
+        elements = [syntactical_analysis.VerbatimElement(str(idx)) for idx in range(10)]
+        translator = async_translation.AsyncTranslator(compilation.CompiledTemplate(elements), 3)
+        events = []
+
+        async def translate():
+            async for chunk in translator.run(self.var_mgr):
+                events.append(chunk)
+
+        async def other_task():
+            for _ in range(3):
+                events.append(None)
+                await asyncio.sleep(0)
+
+        async def main():
+            await asyncio.gather(translate(), other_task())
+
+        asyncio.run(main())
+        self.assertEqual(["0", "1", "2", None, "3", "4", "5", None, "6", "7", "8", None, "9"], events)
+
+    def test_stream_sink(self):
+        """
+        Tests that the chunks are encoded and written in the stream.
+        """
+        writer = BytesWriter()
+        asyncio.run(async_translation.AsyncTranslator(self.compiled_template).render(
+            self.var_mgr, async_translation.StreamSink(writer)))
+        self.assertEqual(expected.encode(), writer.data)
+        self.assertGreater(writer.drains, 0)
+
+
+class AsyncOutputFileManagerTest(unittest.TestCase):
+    """
+    Unittests of the asynchronous output file and of the asynchronous replacement of the template.
+    """
+
+    def setUp(self):
+        """
+        Creates the directory of the output files.
+        """
+        self.output_dir = tempfile.mkdtemp()
+        self.output_path = os.path.join(self.output_dir, "output.txt")
+
+    def tearDown(self):
+        """
+        Removes the output files.
+        """
+        shutil.rmtree(self.output_dir)
+
+    def test_print(self):
+        """
+        Tests that the chunks are written in text and binary mode.
+        """
+        async def write(encoding, chunks):
+            async with async_translation.AsyncOutputFileManager(self.output_path, encoding, 4) as out_mgr:
+                for chunk in chunks:
+                    await out_mgr.print(chunk)
+
+        asyncio.run(write(None, ["Darkness", " is ", "ignorance\n"]))
+        with open(self.output_path, 'r') as f:
+            self.assertEqual("Darkness is ignorance\n", f.read())
+        asyncio.run(write('utf-8', [b"Knowledge", memoryview(b" is "), "light\n"]))
+        with open(self.output_path, 'rb') as f:
+            self.assertEqual(b"Knowledge is light\n", f.read())
+
+    def test_replace_async(self):
+        """
+        Tests the asynchronous replacement of several templates at the same time.
+        """
+        templates = [Template(path_composer("template_simple_list_replacements.txt"),
+                              path_composer("correct_var_file.txt"),
+                              os.path.join(self.output_dir, "output{}.txt".format(idx)), scanner_class, backend=backend)
+                     for idx, (scanner_class, backend) in enumerate([(lexical_analysis.Scanner, 'tree'),
+                                                                     (lexical_analysis.MappedScanner, 'tree'),
+                                                                     (lexical_analysis.Scanner, 'ir')])]
+
+        async def main():
+            await asyncio.gather(*(template.replace_async(2) for template in templates))
+
+        asyncio.run(main())
+        for template in templates:
+            with open(template.out_path, 'r') as f:
+                self.assertEqual(expected, f.read())
+
+    def test_replace_async_optimize(self):
+        """
+        Tests that the template is analyzed and optimized outside the thread of the event loop.
+        """
+        threads = []
+
+        class RecordingTemplate(Template):
+            def _renderer(self):
+                threads.append(threading.get_ident())
+                return super()._renderer()
+
+        template = RecordingTemplate(path_composer("template_simple_list_replacements.txt"),
+                                     path_composer("correct_var_file.txt"),
+                                     os.path.join(self.output_dir, "output.txt"), optimize=True)
+        asyncio.run(template.replace_async(2))
+        self.assertEqual(1, len(threads))
+        self.assertNotEqual(threading.get_ident(), threads[0])
+        with open(template.out_path, 'r') as f:
+            self.assertEqual(expected, f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import batch_translation
+import lexical_analysis
+import variables_cache
+import variables_snapshot
+from helpers import other_expected
+from lexical_analisys_tests import path_composer
+from semantic_analysis_tests import expected
+
+
+class BatchTranslatorTest(unittest.TestCase):
+    """
+    Unittests of the translation of a template with many variables files.
+    """
+
+    def setUp(self):
+        """
+        Creates the directory of the output files.
+        """
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """
+        Removes the output files.
+        """
+        shutil.rmtree(self.output_dir)
+
+    def _jobs(self):
+        """
+        Creates the jobs of the test, one of them with a variables file that does not exist.
+        :return: List of tuples (String, String) with the paths of each job.
+        """
+        return [(path_composer(filename), os.path.join(self.output_dir, "output{}.txt".format(idx)))
+                for idx, filename in enumerate(["correct_var_file.txt", "other_var_file.txt", "missing_var_file.txt",
+                                                "correct_var_file.txt"])]
+
+    def _test_batch(self, pool, backend='tree', scanner_class=lexical_analysis.Scanner):
+        """
+        Translates the jobs checking their outputs and their results.
+        :param pool: String with the key of the POOLS used to translate the jobs.
+        :param backend: String with the key of the BACKENDS used to translate the template.
+        :param scanner_class: engine.lexical_analysis.Scanner class used for the lexical analysis of the template.
+        """
+        jobs = self._jobs()
+        batch = batch_translation.BatchTranslator(path_composer("template_simple_list_replacements.txt"),
+                                                  scanner_class, backend=backend, workers=2, pool=pool)
+        results = list(batch.run(iter(jobs)))
+        self.assertEqual(jobs, [(result.variables_path, result.output_path) for result in results])
+        self.assertEqual([True, True, False, True], [result.succeeded for result in results])
+        self.assertTrue(results[2].error.startswith("OSError"), results[2].error)
+        self.assertTrue(all(result.seconds >= 0 for result in results))
+        for (_, output_path), expected_string in zip(jobs, [expected, other_expected, None, expected]):
+            if expected_string is None:
+                self.assertFalse(os.path.exists(output_path))
+                continue
+            with open(output_path, 'r') as f:
+                self.assertEqual(expected_string, f.read(), (pool, backend))
+
+    def test_thread_pool(self):
+        """
+        Tests the translation of the jobs in a pool of threads with every backend.
+        """
+        for backend in ['tree', 'ir', 'python']:
+            self._test_batch('thread', backend)
+
+    def test_process_pool(self):
+        """
+        Tests the translation of the jobs in a pool of processes, also for a memory mapped template.
+        """
+        self._test_batch('process')
+        self._test_batch('process', 'python', lexical_analysis.MappedScanner)
+
+    def test_variables_format(self):
+        """
+        Tests the translation of the jobs with snapshots of the variables files.
+        """
+        jobs = []
+        for idx, filename in enumerate(["correct_var_file.txt", "other_var_file.txt"]):
+            snapshot_path = os.path.join(self.output_dir, "variables{}.tvs".format(idx))
+            variables_snapshot.convert(path_composer(filename), snapshot_path)
+            jobs.append((snapshot_path, os.path.join(self.output_dir, "output{}.txt".format(idx))))
+        for pool in sorted(batch_translation.POOLS):
+            batch = batch_translation.BatchTranslator(path_composer("template_simple_list_replacements.txt"),
+                                                      workers=2, pool=pool, variables_format='snapshot')
+            self.assertTrue(all(result.succeeded for result in batch.run(jobs)))
+            for (_, output_path), expected_string in zip(jobs, [expected, other_expected]):
+                with open(output_path, 'r') as f:
+                    self.assertEqual(expected_string, f.read(), pool)
+
+    def test_variables_cache(self):
+        """
+        Tests that the jobs with the same variables file parse it once.
+        """
+        cache = variables_cache.VariablesCache()
+        batch = batch_translation.BatchTranslator(path_composer("template_simple_list_replacements.txt"), workers=1,
+                                                  variables_cache=cache)
+        results = list(batch.run(self._jobs()))
+        self.assertEqual([True, True, False, True], [result.succeeded for result in results])
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
+        # Each process has its own cache of the same size.
+        batch = batch_translation.BatchTranslator(path_composer("template_simple_list_replacements.txt"), workers=1,
+                                                  pool='process', variables_cache=cache)
+        self.assertEqual([True, True, False, True], [result.succeeded for result in batch.run(self._jobs())])
+        with open(os.path.join(self.output_dir, "output3.txt"), 'r') as f:
+            self.assertEqual(expected, f.read())
+
+    def test_read_jobs(self):
+        """
+        Tests the reading of the jobs file.
+        """
+        jobs_path = os.path.join(self.output_dir, "jobs.txt")
+        with open(jobs_path, 'w') as f:
+            f.write("vars 1.txt\tout 1.txt\n\nvars2.txt\tout2.txt\n")
+        self.assertEqual([("vars 1.txt", "out 1.txt"), ("vars2.txt", "out2.txt")],
+                         batch_translation.read_jobs(jobs_path))
+        with open(jobs_path, 'w') as f:
+            f.write("vars1.txt out1.txt\n")
+        with self.assertRaises(ValueError):
+            batch_translation.read_jobs(jobs_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
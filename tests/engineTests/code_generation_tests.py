@@ -0,0 +1,170 @@
+import shutil
+import tempfile
+import unittest
+
+import code_generation
+import compilation
+import lexical_analysis
+import symbol_table
+import template_cache
+import intermediate_representation_tests
+from helpers import parsed_variables, StringSink
+from lexical_analisys_tests import path_composer
+from semantic_analysis_tests import expected
+from syntactical_analysis import LoopElement, VerbatimElement, ReplacementElement
+
+
+class BytesSink:
+    """
+    Utility class that stores the bytes-like chunks printed.
+    """
+
+    def __init__(self):
+        """
+        Constructor that initializes the object arguments.
+        """
+        self.document = b""
+
+    def print(self, chunk):
+        """
+        Appends the chunk to the document encoding the strings.
+        :param chunk: String or bytes-like object with the text to print.
+        """
+        self.document += chunk.encode() if isinstance(chunk, str) else bytes(chunk)
+
+
+class GeneratedTemplateTest(unittest.TestCase):
+    """
+    Unittests of the templates converted in python code.
+    """
+
+    @staticmethod
+    def _render(elements, filename="correct_var_file.txt"):
+        """
+        Translates some elements with the generated code.
+        :param elements: List of engine.syntactical_analysis.ParserElement to translate.
+        :param filename: String with the name of the variables file.
+        :return: String with the document translated.
+        """
+        sink = StringSink()
+        generated_template = code_generation.GeneratedTemplate.generate(compilation.CompiledTemplate(elements))
+        generated_template.render(parsed_variables(filename), sink)
+        return sink.document
+
+    def test_render(self):
+        """
+        Tests that the generated code translates the templates as the tree does, also when they are optimized.
+        """
+        for scanner_class in [lexical_analysis.Scanner, lexical_analysis.BufferScanner]:
+            compiled_template = compilation.CompiledTemplate.compile(
+                path_composer("template_simple_list_replacements.txt"), scanner_class)
+            var_mgr = parsed_variables("correct_var_file.txt")
+            for template in [compiled_template, compiled_template.optimize(), compiled_template.optimize(var_mgr)]:
+                sink = StringSink()
+                code_generation.GeneratedTemplate.generate(template).render(var_mgr, sink)
+                self.assertEqual(expected, sink.document)
+
+    def test_mapped_template(self):
+        """
+        Tests that the bytes-like verbatim values of a memory mapped template are printed without changes.
+        """
+        compiled_template = compilation.CompiledTemplate.compile(
+            path_composer("template_simple_list_replacements.txt"), lexical_analysis.MappedScanner)
+        generated_template = code_generation.GeneratedTemplate.generate(compiled_template)
+        for template in [generated_template, code_generation.GeneratedTemplate.loads(generated_template.dumps())]:
+            sink = BytesSink()
+            template.render(parsed_variables("correct_var_file.txt"), sink)
+            self.assertEqual(expected.encode(), sink.document)
+            self.assertEqual('utf-8', template.encoding)
+
+    def test_nested_loops(self):
+        """
+        Tests the loops inside loops, including the ones over an enclosing iterator and the empty ones.
+        """
+        elements = [LoopElement("array1", "item", [
+            ReplacementElement("item"), LoopElement("array1", "other", [
+                ReplacementElement("item"), ReplacementElement("other"), LoopElement("item", "letter", [
+                    ReplacementElement("letter")])]),
+            VerbatimElement("\n")]), LoopElement("variable2", "letter", [ReplacementElement("letter")]),
+            VerbatimElement("end")]
+        self.assertEqual(intermediate_representation_tests.ProgramTest._render(elements)[0],
+                         GeneratedTemplateTest._render(elements))
+
+    def test_deep_loops(self):
+        """
+        Tests that the loops nested deeper than the limit of python blocks are translated.
+        """
+        depth = code_generation.MAX_NESTED_LOOPS * 2 + 3
+        elements = [ReplacementElement("item{}".format(depth))]
+        for level in range(depth, 0, -1):
+            elements = [LoopElement("item{}".format(level - 1), "item{}".format(level), elements)]
+        elements = [LoopElement("array1", "item0", elements)]
+        self.assertEqual("abc", GeneratedTemplateTest._render(elements))
+
+    def test_variable_not_found(self):
+        """
+        Tests that a missing variable raises an exception once it is translated.
+        """
+        for element in [ReplacementElement("unknown"), LoopElement("unknown", "item", [])]:
+            sink = StringSink()
+            generated_template = code_generation.GeneratedTemplate.generate(
+                compilation.CompiledTemplate([VerbatimElement("text"), element]))
+            var_mgr = parsed_variables("correct_var_file.txt")
+            with self.assertRaises(symbol_table.VariableNotFoundException):
+                generated_template.render(var_mgr, sink)
+            self.assertEqual("text", sink.document)
+
+    def test_variable_hidden(self):
+        """
+        Tests that the iterators hiding a variable raise an exception.
+        """
+        with self.assertRaises(symbol_table.VariableHiddenException):
+            GeneratedTemplateTest._render([LoopElement("array1", "variable1", [])])
+
+    def test_iterator_hidden(self):
+        """
+        Tests that the iterators hide the iterators with the same name of the enclosing loops.
+        """
+        elements = [LoopElement("array1", "item", [LoopElement("array1", "item", [ReplacementElement("item")]),
+                                                   ReplacementElement("item")])]
+        self.assertEqual("abcaabcbabcc", GeneratedTemplateTest._render(elements))
+
+    def test_empty_hiding_loop(self):
+        """
+        Tests that an empty loop whose iterator hides the iterator of the enclosing loop is translated, as in
+        {{#loop array1 item}}{{#loop item item}}{{/loop}}{{/loop}}.
+        """
+        elements = [LoopElement("array1", "item", [LoopElement("item", "item", [])])]
+        self.assertEqual(intermediate_representation_tests.ProgramTest._render(elements)[0],
+                         GeneratedTemplateTest._render(elements))
+        self.assertEqual("", GeneratedTemplateTest._render(elements))
+
+    def test_empty_template(self):
+        """
+        Tests the translation of a template without elements.
+        """
+        self.assertEqual("", GeneratedTemplateTest._render([]))
+
+    def test_cache(self):
+        """
+        Tests that the generated code is stored in the template cache.
+        """
+        cache_dir = tempfile.mkdtemp()
+        try:
+            cache = template_cache.TemplateCache(cache_dir)
+            compiled_template = cache.load(path_composer("template_simple_list_replacements.txt"))
+            for _ in range(2):
+                sink = StringSink()
+                template_cache.TemplateCache(cache_dir).load_generated(compiled_template).render(
+                    parsed_variables("other_var_file.txt"), sink)
+                self.assertIn("do something with the y", sink.document)
+            cache = template_cache.TemplateCache(cache_dir)
+            cache.load_generated(compiled_template)
+            cache.load_generated(compiled_template.optimize())
+            self.assertEqual((1, 1), (cache.hits, cache.misses))
+        finally:
+            shutil.rmtree(cache_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
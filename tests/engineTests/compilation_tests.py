@@ -0,0 +1,57 @@
+import unittest
+
+import compilation
+import lexical_analysis
+import syntactical_analysis
+from helpers import CountingScanner, other_expected, parsed_variables, StringSink
+from lexical_analisys_tests import path_composer
+from semantic_analysis_tests import expected
+
+
+class CompiledTemplateTest(unittest.TestCase):
+    """
+    Unittests of the compiled template.
+    """
+
+    def test_render_many(self):
+        """
+        Tests that a template is scanned once and rendered many times with different variables.
+        """
+        CountingScanner.scans = 0
+        compiled_template = compilation.CompiledTemplate.compile(
+            path_composer("template_simple_list_replacements.txt"), CountingScanner)
+        for filename, expected_string in [("correct_var_file.txt", expected), ("other_var_file.txt", other_expected),
+                                          ("correct_var_file.txt", expected)]:
+            sink = StringSink()
+            compiled_template.render(parsed_variables(filename), sink)
+            self.assertEqual(expected_string, sink.document)
+        self.assertEqual(1, CountingScanner.scans)
+
+    def test_elements_frozen(self):
+        """
+        Tests that the elements of the loops can not be modified.
+        """
+        compiled_template = compilation.CompiledTemplate.compile(
+            path_composer("parser_loop_with_extra_loop.txt"), lexical_analysis.BufferScanner)
+        loop = compiled_template.elements[0]
+        self.assertIsInstance(loop, syntactical_analysis.LoopElement)
+        self.assertIsInstance(loop.loop_elements, tuple)
+        self.assertIsInstance(loop.loop_elements[-1].loop_elements, tuple)
+        with self.assertRaises(AttributeError):
+            loop.loop_elements.append(syntactical_analysis.VerbatimElement("extra"))
+
+    def test_variable_names(self):
+        """
+        Tests that the variables of the file used by the template exclude the loop iterators.
+        """
+        compiled_template = compilation.CompiledTemplate([
+            syntactical_analysis.ReplacementElement("variable1"), syntactical_analysis.VerbatimElement("text"),
+            syntactical_analysis.LoopElement("array1", "item", [
+                syntactical_analysis.ReplacementElement("item"), syntactical_analysis.LoopElement("item", "letter", [
+                    syntactical_analysis.ReplacementElement("letter"),
+                    syntactical_analysis.ReplacementElement("variable2")])])])
+        self.assertEqual(frozenset(["variable1", "array1", "variable2"]), compiled_template.variable_names())
+
+
+if __name__ == '__main__':
+    unittest.main()
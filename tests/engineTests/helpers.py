@@ -0,0 +1,64 @@
+import lexical_analysis
+import symbol_table
+from lexical_analisys_tests import path_composer
+
+
+other_expected = """some random text
+I wanted to say hi to you
+some other text
+
+do something with the x
+do something with the y
+
+now I say see you to everyone
+more text
+
+I might say hi to some and see you to others
+is that okay?
+"""
+
+
+class StringSink:
+    """
+    Utility class that stores the chunks printed in a string.
+    """
+
+    def __init__(self):
+        """
+        Constructor that initializes the object arguments.
+        """
+        self.document = ""
+
+    def print(self, chunk):
+        """
+        Appends the chunk to the document.
+        :param chunk: String with the text to print.
+        """
+        self.document += chunk
+
+
+class CountingScanner(lexical_analysis.Scanner):
+    """
+    Utility scanner that counts the number of times the template is scanned.
+    """
+
+    scans = 0
+
+    def scan(self):
+        """
+        Performs the lexical analysis of the template file counting it.
+        :return: Tuple (engine.LexTokens, String) containing the type of the token and its contents.
+        """
+        CountingScanner.scans += 1
+        return super().scan()
+
+
+def parsed_variables(filename):
+    """
+    Utility function that creates a parsed variable manager.
+    :param filename: String with the name of the variables file.
+    :return: engine.symbol_table.VariableManager already parsed.
+    """
+    var_mgr = symbol_table.VariableManager(path_composer(filename))
+    var_mgr.parse()
+    return var_mgr
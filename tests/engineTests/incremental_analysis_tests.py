@@ -0,0 +1,158 @@
+import os
+import random
+import tempfile
+import unittest
+
+import incremental_analysis
+import lexical_analysis
+import semantic_analysis
+import symbol_table
+import syntactical_analysis
+from lexical_analisys_tests import path_composer
+from semantic_analysis_tests import expected
+
+
+def serialize(element):
+    """
+    Utility function that converts a syntactical element in a tuple that can be compared.
+    :param element: engine.syntactical_analysis.ParserElement to convert.
+    :return: Tuple with the type and the contents of the element.
+    """
+    if isinstance(element, syntactical_analysis.LoopElement):
+        return ('loop', element.variable_name, element.iterator_variable,
+                tuple(serialize(loop_element) for loop_element in element.loop_elements))
+    if isinstance(element, syntactical_analysis.ReplacementElement):
+        return 'replacement', element.variable_name
+    return 'verbatim', element.value
+
+
+class IncrementalParserTest(unittest.TestCase):
+    """
+    Unittests of the incremental parser.
+    """
+
+    def setUp(self):
+        """
+        Creates a copy of a template that can be edited.
+        """
+        with open(path_composer("template_simple_list_replacements.txt"), 'r') as f:
+            self.source = f.read()
+        with open(path_composer("parser_loop_with_extra_loop.txt"), 'r') as f:
+            self.source += f.read()
+        self.template_file = tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False)
+        self.template_file.write(self.source)
+        self.template_file.close()
+
+    def tearDown(self):
+        """
+        Removes the copy of the template.
+        """
+        os.remove(self.template_file.name)
+
+    def _full_parse(self, source):
+        """
+        Parses the whole template from scratch.
+        :param source: String with the contents of the template.
+        :return: List with the serialized syntactical elements.
+        """
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write(source)
+        try:
+            parser = syntactical_analysis.Parser(lexical_analysis.BufferScanner(f.name))
+            return [serialize(element) for element in parser.parse()]
+        finally:
+            os.remove(f.name)
+
+    def test_parse(self):
+        """
+        Tests that the first analysis is the same as the one of the parser.
+        """
+        parser = incremental_analysis.IncrementalParser(self.template_file.name)
+        obtained = [serialize(element) for element in parser.parse()]
+        self.assertListEqual(self._full_parse(self.source), obtained)
+
+    def test_update_random_edits(self):
+        """
+        Tests that the elements obtained after a sequence of random edits are the same as the ones of parsing the
+        whole template again.
+        """
+        pieces = ['{{', '}}', ' ', '\n', 'x', '{', '}', '{{ item }}', '{{#loop array1 item}}\n', '{{/loop}}\n']
+        rng = random.Random(0)
+        for _ in range(50):
+            source = self.source
+            parser = incremental_analysis.IncrementalParser(self.template_file.name)
+            list(parser.parse())
+            for _ in range(10):
+                start = rng.randrange(len(source) + 1)
+                end = min(len(source), start + rng.randrange(4))
+                text = "".join(rng.choice(pieces) for _ in range(rng.randrange(3)))
+                source = source[:start] + text + source[end:]
+                try:
+                    full = self._full_parse(source)
+                except syntactical_analysis.SyntaxException:
+                    with self.assertRaises(syntactical_analysis.SyntaxException):
+                        parser.update(start, end, text)
+                    continue
+                parser.update(start, end, text)
+                self.assertListEqual(full, [serialize(element) for element in parser.parse()],
+                                     "Different elements after replacing {}:{} with {!r}".format(start, end, text))
+
+    def test_reload(self):
+        """
+        Tests that the file changes are detected after reloading it.
+        """
+        parser = incremental_analysis.IncrementalParser(self.template_file.name)
+        list(parser.parse())
+        source = self.source.replace("do something with", "do {{ item }} with")
+        with open(self.template_file.name, 'w') as f:
+            f.write(source)
+        full = self._full_parse(source)
+        parser.reload()
+        self.assertListEqual(full, [serialize(element) for element in parser.parse()])
+
+    def test_update_region_is_local(self):
+        """
+        Tests that editing a big template only analyzes the elements around the edit.
+        """
+        source = self.source * 200
+        with open(self.template_file.name, 'w') as f:
+            f.write(source)
+        parser = incremental_analysis.IncrementalParser(self.template_file.name)
+        list(parser.parse())
+        position = source.index("now I say", len(source) // 2)
+        parser.update(position, position + 3, "later")
+        region_start, region_end = parser.last_region
+        self.assertLessEqual(region_start, position)
+        self.assertGreaterEqual(region_end, position + 5)
+        self.assertLess(region_end - region_start, len(self.source))
+
+    def test_update_syntax_error(self):
+        """
+        Tests that a syntax error is raised and the template can be fixed with another edit.
+        """
+        parser = incremental_analysis.IncrementalParser(self.template_file.name)
+        list(parser.parse())
+        position = self.source.index("now I say")
+        with self.assertRaises(syntactical_analysis.SyntaxException):
+            parser.update(position, position, "{{ a b }}")
+        parser.update(position, position + 9, "")
+        self.assertListEqual(self._full_parse(self.source), [serialize(element) for element in parser.parse()])
+
+    def test_translate(self):
+        """
+        Tests the translation of the template after an edit.
+        """
+        with open(self.template_file.name, 'w') as f:
+            f.write("")
+        parser = incremental_analysis.IncrementalParser(self.template_file.name)
+        list(parser.parse())
+        with open(path_composer("template_simple_list_replacements.txt"), 'r') as f:
+            parser.update(0, 0, f.read())
+        var_mgr = symbol_table.VariableManager(path_composer("correct_var_file.txt"))
+        var_mgr.parse()
+        translator = semantic_analysis.SemanticAnalyzer(parser, var_mgr)
+        self.assertEqual(expected, "".join(translator.run()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+
+import compilation
+import intermediate_representation
+import lexical_analysis
+import symbol_table
+from helpers import parsed_variables, StringSink
+from lexical_analisys_tests import path_composer
+from semantic_analysis_tests import expected
+from syntactical_analysis import LoopElement, VerbatimElement, ReplacementElement
+
+
+class ProgramTest(unittest.TestCase):
+    """
+    Unittests of the intermediate representation of the templates.
+    """
+
+    @staticmethod
+    def _render(elements, filename="correct_var_file.txt"):
+        """
+        Translates some elements with the tree and with the intermediate representation.
+        :param elements: List of engine.syntactical_analysis.ParserElement to translate.
+        :param filename: String with the name of the variables file.
+        :return: Tuple (String, String) with the document translated by the tree and by the program.
+        """
+        compiled_template = compilation.CompiledTemplate(elements)
+        var_mgr = parsed_variables(filename)
+        tree_sink = StringSink()
+        compiled_template.render(var_mgr, tree_sink)
+        program_sink = StringSink()
+        intermediate_representation.Program.compile(compiled_template).render(var_mgr, program_sink)
+        return tree_sink.document, program_sink.document
+
+    def test_render(self):
+        """
+        Tests that the program translates the templates as the tree does, also when they are optimized.
+        """
+        for scanner_class in [lexical_analysis.Scanner, lexical_analysis.BufferScanner]:
+            compiled_template = compilation.CompiledTemplate.compile(
+                path_composer("template_simple_list_replacements.txt"), scanner_class)
+            var_mgr = parsed_variables("correct_var_file.txt")
+            for template in [compiled_template, compiled_template.optimize(), compiled_template.optimize(var_mgr)]:
+                sink = StringSink()
+                intermediate_representation.Program.compile(template).render(var_mgr, sink)
+                self.assertEqual(expected, sink.document)
+
+    def test_nested_loops(self):
+        """
+        Tests the loops inside loops, including the ones over an enclosing iterator and the empty ones.
+        """
+        elements = [LoopElement("array1", "item", [
+            ReplacementElement("item"), LoopElement("array1", "other", [
+                ReplacementElement("item"), ReplacementElement("other"), LoopElement("item", "letter", [
+                    ReplacementElement("letter")])]),
+            VerbatimElement("\n")]), LoopElement("variable2", "letter", [ReplacementElement("letter")]),
+            VerbatimElement("end")]
+        tree_document, program_document = ProgramTest._render(elements)
+        self.assertEqual(tree_document, program_document)
+        self.assertEqual("aaaaabaaca\n", program_document[:11])
+
+    def test_variable_not_found(self):
+        """
+        Tests that a missing variable raises an exception once it is translated.
+        """
+        for element in [ReplacementElement("unknown"), LoopElement("unknown", "item", [])]:
+            with self.assertRaises(symbol_table.VariableNotFoundException):
+                ProgramTest._render([VerbatimElement("text"), element])
+
+    def test_variable_hidden(self):
+        """
+        Tests that the iterators hiding a variable raise an exception.
+        """
+        compiled_template = compilation.CompiledTemplate([LoopElement("array1", "variable1", [])])
+        program = intermediate_representation.Program.compile(compiled_template)
+        with self.assertRaises(symbol_table.VariableHiddenException):
+            program.render(parsed_variables("correct_var_file.txt"), StringSink())
+
+    def test_iterator_hidden(self):
+        """
+        Tests that the iterators hide the iterators with the same name of the enclosing loops as the tree does.
+        """
+        elements = [LoopElement("array1", "item", [LoopElement("array1", "item", [ReplacementElement("item")]),
+                                                   ReplacementElement("item")])]
+        tree_document, program_document = ProgramTest._render(elements)
+        self.assertEqual(tree_document, program_document)
+        self.assertEqual("abcaabcbabcc", program_document)
+
+    def test_interned_constants(self):
+        """
+        Tests that the repeated verbatim values and variables are stored once.
+        """
+        elements = [VerbatimElement("text"), ReplacementElement("variable1"), VerbatimElement("text"),
+                    LoopElement("array1", "item", [VerbatimElement("text"), ReplacementElement("variable1")])]
+        program = intermediate_representation.Program.compile(compilation.CompiledTemplate(elements))
+        self.assertEqual(("text",), program.constants)
+        self.assertEqual(("variable1", "array1", "item"), program.names)
+        self.assertEqual(7, len(program))
+
+    def test_memory_size(self):
+        """
+        Tests that the program uses less memory than the tree of elements.
+        """
+        compiled_template = compilation.CompiledTemplate.compile(path_composer("template_simple_list_replacements.txt"))
+        tree_size, nodes = intermediate_representation.tree_memory_size(compiled_template.elements)
+        program = intermediate_representation.Program.compile(compiled_template)
+        self.assertEqual(nodes + 1, len(program))
+        self.assertLess(program.memory_size(), tree_size)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -19,18 +19,21 @@ class ScannerTest(unittest.TestCase):
     Unittests of the scanner.
     """
 
+    scanner_class = engine.lexical_analysis.Scanner
+
     def _test_output(self, filename, expected_results):
         """
         Generic method that performs the test based on the init file and the expected results.
         :param filename: String containing the name of the input file used for the test.
         :param expected_results: List of tuples containing the engine.file_managers.Token enumerate and a string or None
         """
-        scanner = engine.lexical_analysis.Scanner(path_composer(filename))
+        scanner = self.scanner_class(path_composer(filename))
         file_analyzed = [token for token in scanner.scan()]
         for idx, expected in enumerate(expected_results):
             obtained = file_analyzed[idx]
             self.assertTrue(expected[0] == obtained[0], "The type of token is not the same.")
             self.assertEqual(expected[1], obtained[1], "The contents of the token are not the same.")
+        self.assertEqual(len(expected_results), len(file_analyzed), "The number of tokens is not the same.")
 
     def test_scan_file(self):
         """
@@ -44,6 +47,192 @@ class ScannerTest(unittest.TestCase):
                  (LexTokens.EOL, "\n")]
         self._test_output("scanner_elements.txt", line1)
 
+    def test_scan_file_without_trailing_eol(self):
+        """
+        Tests that the last character of a file without end of line at the end is not lost.
+        """
+        tokens = [(LexTokens.VERBATIM, "hi"), (LexTokens.BLANK, " "), (LexTokens.INIT_EXPRESSION, None),
+                  (LexTokens.BLANK, " "), (LexTokens.VERBATIM, "variable1"), (LexTokens.BLANK, " "),
+                  (LexTokens.END_EXPRESSION, None)]
+        self._test_output("scanner_no_trailing_eol.txt", tokens)
+
+
+class BufferScannerTest(ScannerTest):
+    """
+    Unittests of the buffer scanner.
+    """
+
+    scanner_class = engine.lexical_analysis.BufferScanner
+
+    def test_scan_file(self):
+        """
+        Tests a file with all the tokens existing in the template.
+        """
+        line1 = [(LexTokens.VERBATIM, "verbatim "),
+                 (LexTokens.INIT_EXPRESSION, None), (LexTokens.END_EXPRESSION, None), (LexTokens.VERBATIM, " "),
+                 (LexTokens.INIT_EXPRESSION, None), (LexTokens.BLANK, " "), (LexTokens.END_EXPRESSION, None),
+                 (LexTokens.VERBATIM, " #loop /loop\n")]
+        self._test_output("scanner_elements.txt", line1)
+
+    def test_scan_file_coalesced_verbatim(self):
+        """
+        Tests that the text between expressions is returned as a single token, splitting the end of line that follows
+        an expression.
+        """
+        tokens = [(LexTokens.INIT_EXPRESSION, None), (LexTokens.BLANK, " "), (LexTokens.INIT_LOOP, None),
+                  (LexTokens.BLANK, " "), (LexTokens.VERBATIM, "array1"), (LexTokens.BLANK, " "),
+                  (LexTokens.VERBATIM, "item"), (LexTokens.BLANK, " "), (LexTokens.END_EXPRESSION, None),
+                  (LexTokens.EOL, "\n"), (LexTokens.VERBATIM, "repeat "),
+                  (LexTokens.INIT_EXPRESSION, None), (LexTokens.BLANK, " "), (LexTokens.VERBATIM, "item"),
+                  (LexTokens.BLANK, " "), (LexTokens.END_EXPRESSION, None), (LexTokens.VERBATIM, " again\n"),
+                  (LexTokens.INIT_EXPRESSION, None), (LexTokens.BLANK, " "), (LexTokens.END_LOOP, None),
+                  (LexTokens.BLANK, " "), (LexTokens.END_EXPRESSION, None), (LexTokens.EOL, "\n")]
+        self._test_output("parser_loop.txt", tokens)
+
+    def test_scan_file_without_trailing_eol(self):
+        """
+        Tests that the last character of a file without end of line at the end is not lost.
+        """
+        tokens = [(LexTokens.VERBATIM, "hi "), (LexTokens.INIT_EXPRESSION, None),
+                  (LexTokens.BLANK, " "), (LexTokens.VERBATIM, "variable1"), (LexTokens.BLANK, " "),
+                  (LexTokens.END_EXPRESSION, None)]
+        self._test_output("scanner_no_trailing_eol.txt", tokens)
+
+
+class ChunkedScannerTest(BufferScannerTest):
+    """
+    Unittests of the chunked scanner.
+    """
+
+    scanner_class = engine.lexical_analysis.ChunkedScanner
+
+    @staticmethod
+    def _coalesce(tokens):
+        """
+        Joins the consecutive VERBATIM tokens that were split in different chunks.
+        :param tokens: Iterable of tuples (engine.LexTokens, String) returned by a scanner.
+        :return: List of tuples (engine.LexTokens, String) without consecutive VERBATIM tokens.
+        """
+        coalesced = []
+        for token, value in tokens:
+            if token == LexTokens.VERBATIM and coalesced and coalesced[-1][0] == LexTokens.VERBATIM:
+                coalesced[-1] = (token, coalesced[-1][1] + value)
+            else:
+                coalesced.append((token, value))
+        return coalesced
+
+    def _test_every_chunk_size(self, filename):
+        """
+        Tests that the tokens obtained are the same as the ones of the buffer scanner no matter where the chunk
+        boundaries fall.
+        :param filename: String containing the name of the input file used for the test.
+        """
+        filepath = path_composer(filename)
+        expected = list(engine.lexical_analysis.BufferScanner(filepath).scan())
+        with open(filepath, 'r') as f:
+            length = len(f.read())
+        for chunk_size in range(1, length + 2):
+            scanner = self.scanner_class(filepath, chunk_size)
+            tokens = list(scanner.scan())
+            in_expression = False
+            for token, value in tokens:
+                if token in (LexTokens.INIT_EXPRESSION, LexTokens.END_EXPRESSION):
+                    in_expression = token == LexTokens.INIT_EXPRESSION
+                # A "{" at the end of a chunk is kept for the next one.
+                if token == LexTokens.VERBATIM and not in_expression:
+                    self.assertLessEqual(len(value), chunk_size + 1, "Verbatim token bigger than the chunk size")
+            self.assertListEqual(expected, ChunkedScannerTest._coalesce(tokens),
+                                 "Different tokens with a chunk size of {}".format(chunk_size))
+
+    def test_scan_delimiters_every_boundary(self):
+        """
+        Tests a file with all the delimiters straddling every possible chunk boundary.
+        """
+        self._test_every_chunk_size("template_simple_list_replacements.txt")
+        self._test_every_chunk_size("parser_loop_with_extra_loop.txt")
+
+    def test_scan_braces_every_boundary(self):
+        """
+        Tests a file with single braces, delimiters without blanks and an unterminated expression at the end.
+        """
+        self._test_every_chunk_size("scanner_braces.txt")
+
+    def test_scan_keyword_prefix_every_boundary(self):
+        """
+        Tests a file with words that start with a keyword, such as "#loopa" and "/loopx".
+        """
+        self._test_every_chunk_size("scanner_keyword_prefix.txt")
+
+    def test_scan_long_words_every_boundary(self):
+        """
+        Tests a file with names of variables longer than several chunks, which are returned whole.
+        """
+        self._test_every_chunk_size("scanner_long_words.txt")
+        for chunk_size in [1, 4, 16]:
+            scanner = self.scanner_class(path_composer("scanner_long_words.txt"), chunk_size)
+            values = [value for _, value in scanner.scan()]
+            self.assertIn("a_variable_name_much_longer_than_several_chunks_of_the_scanner", values)
+            self.assertIn("an_array_with_another_long_name_for_the_loop", values)
+
+    def test_scan_no_trailing_eol_every_boundary(self):
+        """
+        Tests a file without end of line at the end.
+        """
+        self._test_every_chunk_size("scanner_no_trailing_eol.txt")
+
+    def test_invalid_chunk_size(self):
+        """
+        Tests that the chunk size must be positive.
+        """
+        with self.assertRaises(ValueError):
+            self.scanner_class(path_composer("parser_var.txt"), 0)
+
+
+class MappedScannerTest(BufferScannerTest):
+    """
+    Unittests of the memory mapped scanner.
+    """
+
+    scanner_class = engine.lexical_analysis.MappedScanner
+
+    def _test_output(self, filename, expected_results):
+        """
+        Generic method that performs the test based on the init file and the expected results decoding the contents
+        of the memoryview tokens.
+        :param filename: String containing the name of the input file used for the test.
+        :param expected_results: List of tuples containing the engine.file_managers.Token enumerate and a string or None
+        """
+        scanner = self.scanner_class(path_composer(filename))
+        file_analyzed = []
+        for token, value in scanner.scan():
+            if isinstance(value, memoryview):
+                value = str(value, scanner.encoding)
+            file_analyzed.append((token, value))
+        self.assertListEqual(expected_results, file_analyzed)
+
+    def test_scan_verbatim_zero_copy(self):
+        """
+        Tests that the verbatim tokens outside the expressions are views of the mapped file.
+        """
+        scanner = self.scanner_class(path_composer("parser_var.txt"))
+        verbatim = [value for token, value in scanner.scan() if token == LexTokens.VERBATIM]
+        self.assertIsInstance(verbatim[0], memoryview)
+        self.assertEqual(b"hi ", verbatim[0].tobytes())
+        self.assertEqual("variable1", verbatim[1])
+        self.assertIsInstance(verbatim[2], memoryview)
+        self.assertEqual(b"bye\n", verbatim[2].tobytes())
+
+    def test_scan_spans(self):
+        """
+        Tests the offsets of the tokens in the mapped file.
+        """
+        scanner = self.scanner_class(path_composer("parser_var.txt"))
+        spans = list(scanner.scan_spans(scanner.map()))
+        self.assertListEqual([(LexTokens.VERBATIM, 0, 3), (LexTokens.INIT_EXPRESSION, 3, 5), (LexTokens.BLANK, 5, 6),
+                              (LexTokens.VERBATIM, 6, 15), (LexTokens.BLANK, 15, 16),
+                              (LexTokens.END_EXPRESSION, 16, 18), (LexTokens.EOL, 18, 19),
+                              (LexTokens.VERBATIM, 19, 23)], spans)
+
 
 if __name__ == '__main__':
     unittest.main()
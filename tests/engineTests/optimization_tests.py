@@ -0,0 +1,91 @@
+import unittest
+
+import compilation
+import lexical_analysis
+import optimization
+from helpers import parsed_variables, StringSink
+from lexical_analisys_tests import path_composer
+from semantic_analysis_tests import expected
+from syntactical_analysis import LoopElement, VerbatimElement, ReplacementElement
+
+
+class OptimizerTest(unittest.TestCase):
+    """
+    Unittests of the optimizer.
+    """
+
+    def test_merge_verbatim(self):
+        """
+        Tests that the consecutive verbatim elements are merged, also inside the loops.
+        """
+        elements = [VerbatimElement("a"), VerbatimElement(" "), ReplacementElement("variable1"),
+                    LoopElement("array1", "item", [VerbatimElement("b"), VerbatimElement("\n")]),
+                    VerbatimElement("c"), VerbatimElement("\n")]
+        optimized = optimization.Optimizer().optimize(elements)
+        self.assertEqual(4, len(optimized))
+        self.assertEqual("a ", optimized[0].value)
+        self.assertEqual("variable1", optimized[1].variable_name)
+        self.assertEqual(["b\n"], [element.value for element in optimized[2].loop_elements])
+        self.assertEqual("c\n", optimized[3].value)
+        self.assertEqual(2, len(elements[3].loop_elements), "The original loop was modified")
+
+    def test_fold_constants(self):
+        """
+        Tests that the replacements of string variables are folded, but not the arrays, the iterators or the unknown
+        variables.
+        """
+        elements = [VerbatimElement("say "), ReplacementElement("variable1"), VerbatimElement(" "),
+                    ReplacementElement("array1"), ReplacementElement("unknown"),
+                    LoopElement("array1", "variable2", [ReplacementElement("variable2"),
+                                                        ReplacementElement("variable1")])]
+        var_mgr = parsed_variables("correct_var_file.txt")
+        optimized = optimization.Optimizer(var_mgr).optimize(elements)
+        self.assertEqual(4, len(optimized))
+        self.assertEqual("say hello ", optimized[0].value)
+        self.assertEqual("array1", optimized[1].variable_name)
+        self.assertEqual("unknown", optimized[2].variable_name)
+        self.assertEqual("variable2", optimized[3].loop_elements[0].variable_name)
+        self.assertEqual("hello", optimized[3].loop_elements[1].value)
+
+    def test_bytes_not_merged(self):
+        """
+        Tests that the bytes-like verbatim values are not merged.
+        """
+        value = memoryview(b"mapped")
+        optimized = optimization.Optimizer().optimize([VerbatimElement("a"), VerbatimElement(value),
+                                                       VerbatimElement("b"), VerbatimElement("c")])
+        self.assertEqual(["a", value, "bc"], [element.value for element in optimized])
+
+    def test_count_nodes(self):
+        """
+        Tests the number of elements counted, including the ones inside the loops.
+        """
+        compiled_template = compilation.CompiledTemplate.compile(path_composer("parser_loop_with_extra_loop.txt"))
+        self.assertEqual(16, optimization.Optimizer.count_nodes(compiled_template.elements))
+        self.assertEqual(10, optimization.Optimizer.count_nodes(compiled_template.optimize().elements))
+
+    def test_dump_node_counts(self):
+        """
+        Tests that the number of elements is logged.
+        """
+        compiled_template = compilation.CompiledTemplate.compile(path_composer("parser_loop_with_extra_loop.txt"))
+        with self.assertLogs('Optimizer', level='INFO') as logs:
+            compiled_template.optimize(dump_node_counts=True)
+        self.assertIn("Nodes before optimization: 16, after optimization: 10", logs.output[0])
+
+    def test_render_optimized(self):
+        """
+        Tests that the optimized templates are translated in the same way.
+        """
+        for scanner_class in [lexical_analysis.Scanner, lexical_analysis.BufferScanner]:
+            compiled_template = compilation.CompiledTemplate.compile(
+                path_composer("template_simple_list_replacements.txt"), scanner_class)
+            var_mgr = parsed_variables("correct_var_file.txt")
+            for optimized in [compiled_template.optimize(), compiled_template.optimize(var_mgr)]:
+                sink = StringSink()
+                optimized.render(var_mgr, sink)
+                self.assertEqual(expected, sink.document)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+import compilation
+import lexical_analysis
+import parallel_analysis
+import semantic_analysis
+import symbol_table
+import syntactical_analysis
+from incremental_analysis_tests import serialize
+from lexical_analisys_tests import path_composer
+
+
+class ParallelParserTest(unittest.TestCase):
+    """
+    Unittests of the parallel parser.
+    """
+
+    def setUp(self):
+        """
+        Creates a template made of several independent sections.
+        """
+        sections = []
+        for filename in ["template_simple_list_replacements.txt", "parser_loop_with_extra_loop.txt", "parser_var.txt"]:
+            with open(path_composer(filename), 'r') as f:
+                sections.append(f.read())
+        self.source = "".join(sections) * 4
+        self.template_dir = tempfile.mkdtemp()
+        self.template_path = os.path.join(self.template_dir, "template.txt")
+        self._write(self.source)
+
+    def tearDown(self):
+        """
+        Removes the template.
+        """
+        shutil.rmtree(self.template_dir)
+
+    def _write(self, source):
+        """
+        Writes the contents of the template.
+        :param source: String with the contents of the template.
+        """
+        with open(self.template_path, 'w') as f:
+            f.write(source)
+
+    def _serial_parse(self):
+        """
+        Analyzes the template with the serial parser.
+        :return: List with the serialized elements or String with the message of the syntax error.
+        """
+        try:
+            return [serialize(element) for element in
+                    syntactical_analysis.Parser(lexical_analysis.BufferScanner(self.template_path)).parse()]
+        except syntactical_analysis.SyntaxException as e:
+            return str(e)
+
+    def _parallel_parse(self, chunk_size):
+        """
+        Analyzes the template with the parallel parser.
+        :param chunk_size: Integer with the minimum size of the chunks.
+        :return: List with the serialized elements or String with the message of the syntax error.
+        """
+        try:
+            return [serialize(element) for element in
+                    parallel_analysis.ParallelParser(self.template_path, 2, chunk_size).parse()]
+        except syntactical_analysis.SyntaxException as e:
+            return str(e)
+
+    def test_split_points(self):
+        """
+        Tests that the template is only split at the expressions that start a line outside of the loops.
+        """
+        self._write("text\n{{ a }}\n{{ #loop b c }}\n{{ c }}\n{{ /loop }}\nmore {{ d }}\n{{ e }}")
+        self.assertEqual([0, 5, 13, 62, 69], parallel_analysis.ParallelParser(self.template_path, 2, 1).split_points())
+        self.assertEqual([0, 62, 69], parallel_analysis.ParallelParser(self.template_path, 2, 20).split_points())
+
+    def test_same_elements(self):
+        """
+        Tests that the elements are the same ones the serial parser finds for any size of the chunks.
+        """
+        expected = self._serial_parse()
+        for chunk_size in [1, 40, 150, 1000, len(self.source)]:
+            self.assertEqual(expected, self._parallel_parse(chunk_size), chunk_size)
+
+    def test_empty_template(self):
+        """
+        Tests the analysis of an empty template.
+        """
+        self._write("")
+        self.assertEqual([], self._parallel_parse(1))
+
+    def test_syntax_errors(self):
+        """
+        Tests that the syntax errors are the same ones the serial parser finds.
+        """
+        for filename in ["parser_loop_wrong_end_token.txt", "parser_loop_wrong_init_token.txt",
+                         "parser_loop_wrong_less_params.txt", "parser_loop_unbalanced_end.txt",
+                         "parser_var_wrong_extra.txt"]:
+            with open(path_composer(filename), 'r') as f:
+                self._write(self.source + f.read() + self.source)
+            expected = self._serial_parse()
+            self.assertIsInstance(expected, str)
+            self.assertEqual(expected, self._parallel_parse(100), filename)
+
+    def test_random_edits(self):
+        """
+        Tests that the results are the same ones the serial parser finds after removing random pieces of the template,
+        valid or not.
+        """
+        generator = random.Random(7)
+        for _ in range(10):
+            start = generator.randrange(len(self.source))
+            end = start + generator.randrange(1, 20)
+            self._write(self.source[:start] + self.source[end:])
+            self.assertEqual(self._serial_parse(), self._parallel_parse(60), (start, end))
+
+
+class ParallelLoopTranslatorTest(unittest.TestCase):
+    """
+    Unittests of the translation of loops in parallel.
+    """
+
+    def setUp(self):
+        """
+        Creates a template with a long loop and its variables.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.template_path = os.path.join(self.temp_dir, "template.txt")
+        self.variables_path = os.path.join(self.temp_dir, "variables.txt")
+        with open(self.template_path, 'w') as f:
+            f.write("{{ title }}\n{{ #loop items item }}\n<{{ item }}> {{ #loop letters item }}{{ item }}{{ /loop }}"
+                    " {{ title }}\n{{ /loop }}\n{{ #loop letters letter }}\n{{ letter }}\n{{ /loop }}\nend")
+        with open(self.variables_path, 'w') as f:
+            f.write('"title": "list"\n"letters": ["x", "y"]\n')
+            f.write('"items": [{}]\n'.format(", ".join('"item{}"'.format(idx) for idx in range(1000))))
+        self.var_mgr = symbol_table.VariableManager(self.variables_path)
+        self.var_mgr.parse()
+
+    def tearDown(self):
+        """
+        Removes the template and the variables.
+        """
+        shutil.rmtree(self.temp_dir)
+
+    def _translate(self, compiled_template, loop_translator, flush_size=100):
+        """
+        Translates the template.
+        :param compiled_template: engine.compilation.CompiledTemplate to translate.
+        :param loop_translator: engine.parallel_analysis.ParallelLoopTranslator or None.
+        :param flush_size: Integer with the number of characters joined before returning them.
+        :return: String with the translation.
+        """
+        analyzer = semantic_analysis.SemanticAnalyzer(compiled_template, self.var_mgr, flush_size, loop_translator)
+        return "".join(chunk if isinstance(chunk, str) else bytes(chunk).decode() for chunk in analyzer.run())
+
+    def test_same_translation(self):
+        """
+        Tests that the translation is the same one the serial translation obtains for any number of workers.
+        """
+        for scanner_class in [lexical_analysis.Scanner, lexical_analysis.MappedScanner]:
+            compiled_template = compilation.CompiledTemplate.compile(self.template_path, scanner_class)
+            expected = self._translate(compiled_template, None)
+            self.assertIn("<item999> xy list\n", expected)
+            for workers in [1, 3]:
+                loop_translator = parallel_analysis.ParallelLoopTranslator(workers, 10)
+                self.assertEqual(expected, self._translate(compiled_template, loop_translator), workers)
+
+    def test_threshold(self):
+        """
+        Tests that the loops shorter than the threshold and the streamed loops are translated serially.
+        """
+        loop = syntactical_analysis.LoopElement("letters", "letter", [])
+        scope = symbol_table.Scope(self.var_mgr)
+        self.assertIsNone(parallel_analysis.ParallelLoopTranslator(2, 3).translate(loop, scope, 100))
+        self.assertIsNotNone(parallel_analysis.ParallelLoopTranslator(2, 2).translate(loop, scope, 100))
+        stream_mgr = symbol_table.StreamingVariableManager(self.variables_path, stream_size=1)
+        stream_mgr.parse()
+        self.assertIsNone(parallel_analysis.ParallelLoopTranslator(2, 2).translate(loop, symbol_table.Scope(stream_mgr),
+                                                                                   100))
+
+    def test_errors(self):
+        """
+        Tests that the missing and hidden variables of a loop translated in parallel raise the same exceptions.
+        """
+        loop_translator = parallel_analysis.ParallelLoopTranslator(2, 1)
+        for elements, exception in [
+                ([syntactical_analysis.ReplacementElement("unknown")], symbol_table.VariableNotFoundException),
+                ([syntactical_analysis.LoopElement("letters", "title", [])], symbol_table.VariableHiddenException)]:
+            compiled_template = compilation.CompiledTemplate([syntactical_analysis.LoopElement("items", "item",
+                                                                                               elements)])
+            with self.assertRaises(exception):
+                self._translate(compiled_template, loop_translator)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,7 @@
+import os
+import shutil
+import sys
+import tempfile
 import unittest
 
 import lexical_analysis
@@ -23,11 +27,118 @@ is that okay?
 """
 
 
+class ElementsParser:
+    """
+    Utility parser that returns some elements already analyzed.
+    """
+
+    def __init__(self, elements):
+        """
+        Constructor that initializes the object arguments.
+        :param elements: List of engine.syntactical_analysis.ParserElement to return.
+        """
+        self.elements = elements
+
+    def parse(self):
+        """
+        Returns the elements one by one.
+        :return: ParserElement with the next syntactical construction.
+        """
+        return iter(self.elements)
+
+
+class CountingVariables:
+    """
+    Utility variable manager that counts the lookups of each variable.
+    """
+
+    def __init__(self, var_mgr):
+        """
+        Constructor that initializes the object arguments.
+        :param var_mgr: engine.symbol_table.VariableManager with the variables.
+        """
+        self.var_mgr = var_mgr
+        self.lookups = {}
+
+    def get_replacement(self, key):
+        """
+        Gets the value of a variable counting the lookup.
+        :param key: String containing the variable name.
+        :return: String or List with the replacement value.
+        """
+        self.lookups[key] = self.lookups.get(key, 0) + 1
+        return self.var_mgr.get_replacement(key)
+
+
+class DictVariables:
+    """
+    Utility variable manager with the variables of a dictionary.
+    """
+
+    def __init__(self, variables):
+        """
+        Constructor that initializes the object arguments.
+        :param variables: Dictionary with the value of each variable.
+        """
+        self.variables = variables
+
+    def get_replacement(self, key):
+        """
+        Gets the value of a variable.
+        :param key: String containing the variable name.
+        :return: Value of the variable.
+        :raise: VariableNotFound if the variable does not exist.
+        """
+        if key not in self.variables:
+            raise symbol_table.VariableNotFoundException(key)
+        return self.variables[key]
+
+
+class CountingStream(symbol_table.ArrayStream):
+    """
+    Utility array stream that counts the times it is read.
+    """
+
+    def __init__(self, items):
+        """
+        Constructor that initializes the object arguments.
+        :param items: List of Strings with the items of the array.
+        """
+        self.items = items
+        self.reads = 0
+
+    def __iter__(self):
+        """
+        Returns the items one by one counting the read.
+        :return: String with the next item.
+        """
+        self.reads += 1
+        return iter(self.items)
+
+
+class BrokenStream(symbol_table.ArrayStream):
+    """
+    Utility array stream whose syntax is found not to be correct after its first items.
+    """
+
+    def __iter__(self):
+        """
+        Returns two items and raises the exception of an array that is not correct.
+        :return: String with the next item.
+        :raise: LineParseException after the items.
+        """
+        yield "a"
+        yield "b"
+        raise symbol_table.LineParseException("The array does not have the correct syntax.")
+
+
 class SemanticAnalyzerTest(unittest.TestCase):
     """
     Unittest of the Semantics analyzer.
     """
 
+    scanner_class = lexical_analysis.Scanner
+
     def _test_results(self, template_file_name, variable_file_name, expected_string):
         """
         Generic method that performs the test based on the init file and the expected results.
@@ -35,7 +146,7 @@ class SemanticAnalyzerTest(unittest.TestCase):
         :param variable_file_name: String containing the name of the input file with the variables for the test.
         :param expected_string: String with the text to check against.
         """
-        scanner = lexical_analysis.Scanner(path_composer(template_file_name))
+        scanner = self.scanner_class(path_composer(template_file_name))
         parser = syntactical_analysis.Parser(scanner)
         var_mgr = symbol_table.VariableManager(path_composer(variable_file_name))
         var_mgr.parse()
@@ -66,6 +177,193 @@ class SemanticAnalyzerTest(unittest.TestCase):
         """
         self._test_results("template_simple_list_replacements.txt", "correct_var_file.txt", expected)
 
+    def test_flush_size(self):
+        """
+        Tests that the translation of a loop is returned in pieces of the flush size as it is produced.
+        """
+        temp_dir = tempfile.mkdtemp()
+        try:
+            template_path = os.path.join(temp_dir, "template.txt")
+            variables_path = os.path.join(temp_dir, "variables.txt")
+            with open(template_path, 'w') as f:
+                f.write("{{ #loop array1 item }}\n<{{ item }}>\n{{ /loop }}\n")
+            items = ["item{}".format(idx) for idx in range(1000)]
+            with open(variables_path, 'w') as f:
+                f.write('"array1": [{}]\n'.format(", ".join('"{}"'.format(item) for item in items)))
+            var_mgr = symbol_table.VariableManager(variables_path)
+            var_mgr.parse()
+            for flush_size in [0, 100, 1000000]:
+                parser = syntactical_analysis.Parser(self.scanner_class(template_path))
+                chunks = list(semantic_analysis.SemanticAnalyzer(parser, var_mgr, flush_size).run())
+                self.assertEqual("".join("<{}>\n".format(item) for item in items), "".join(chunks))
+                self.assertLess(max(len(chunk) for chunk in chunks), flush_size + len("item999>\n"))
+                self.assertEqual(flush_size > 10000, len(chunks) == 1)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_deep_loops(self):
+        """
+        Tests the translation of loops nested deeper than the recursion limit.
+        """
+        depth = sys.getrecursionlimit() + 100
+        element = syntactical_analysis.ReplacementElement("item{}".format(depth))
+        for level in range(depth, 0, -1):
+            element = syntactical_analysis.LoopElement("item{}".format(level - 1), "item{}".format(level), [element])
+        element = syntactical_analysis.LoopElement("array1", "item0", [element, syntactical_analysis.EolElement()])
+        var_mgr = symbol_table.VariableManager(path_composer("correct_var_file.txt"))
+        var_mgr.parse()
+        translator = semantic_analysis.SemanticAnalyzer(ElementsParser([element]), var_mgr)
+        self.assertEqual("a\nb\nc\n", "".join(translator.run()))
+
+    def test_free_variables(self):
+        """
+        Tests that the free variables of a loop exclude the iterators bound inside it.
+        """
+        inner = syntactical_analysis.LoopElement("array1", "letter", [
+            syntactical_analysis.ReplacementElement("letter"), syntactical_analysis.ReplacementElement("item")])
+        outer = syntactical_analysis.LoopElement("array1", "item", [inner, syntactical_analysis.ReplacementElement(
+            "variable1")])
+        cache = {}
+        self.assertEqual({"array1", "variable1"}, semantic_analysis.free_variables(outer, cache))
+        self.assertEqual({"array1", "item"}, cache[id(inner)])
+
+    def test_independent_loops(self):
+        """
+        Tests that the inner loops that do not depend on the enclosing iterators are translated once.
+        """
+        var_mgr = symbol_table.VariableManager(path_composer("correct_var_file.txt"))
+        var_mgr.parse()
+        independent = syntactical_analysis.LoopElement("array1", "letter", [
+            syntactical_analysis.ReplacementElement("letter"), syntactical_analysis.ReplacementElement("variable2")])
+        dependent = syntactical_analysis.LoopElement("array1", "letter", [
+            syntactical_analysis.ReplacementElement("item"), syntactical_analysis.ReplacementElement("letter")])
+        for inner, expected_string in [(independent, "a:abyebbyecbye|b:abyebbyecbye|c:abyebbyecbye|"),
+                                       (dependent, "a:aaabac|b:babbbc|c:cacbcc|")]:
+            element = syntactical_analysis.LoopElement("array1", "item", [
+                syntactical_analysis.ReplacementElement("item"), syntactical_analysis.VerbatimElement(":"), inner,
+                syntactical_analysis.VerbatimElement("|")])
+            for flush_size in [0, 4, 1000]:
+                variables = CountingVariables(var_mgr)
+                translator = semantic_analysis.SemanticAnalyzer(ElementsParser([element]), variables, flush_size)
+                self.assertEqual(expected_string, "".join(translator.run()))
+                self.assertEqual(1 if inner is independent else 3, variables.lookups["array1"] - 1)
+
+    def test_streamed_arrays(self):
+        """
+        Tests that the streamed arrays are translated as the lists and that the translation of the inner loops over
+        them is not kept.
+        """
+        Verbatim, Replacement = syntactical_analysis.VerbatimElement, syntactical_analysis.ReplacementElement
+        inner = syntactical_analysis.LoopElement("letters", "letter", [
+            Verbatim("("), Replacement("letter"), syntactical_analysis.LoopElement("letters", "other", [
+                Replacement("other")]), Verbatim(")")])
+        element = syntactical_analysis.LoopElement("items", "item", [Replacement("item"), inner, Verbatim("|")])
+        letters = ["a", "b"]
+        expected_string = "".join(semantic_analysis.SemanticAnalyzer(ElementsParser([element]), DictVariables(
+            {"items": ["x", "y", "z"], "letters": letters})).run())
+        self.assertEqual("x(aab)(bab)|y(aab)(bab)|z(aab)(bab)|", expected_string)
+        for flush_size in [0, 4, 1000]:
+            items, stream = CountingStream(["x", "y", "z"]), CountingStream(letters)
+            translator = semantic_analysis.SemanticAnalyzer(ElementsParser([element]), DictVariables(
+                {"items": items, "letters": stream}), flush_size)
+            self.assertEqual(expected_string, "".join(translator.run()))
+            self.assertEqual(1, items.reads)
+            self.assertEqual(9, stream.reads)
+
+    def test_memo_size(self):
+        """
+        Tests that the translation of a large independent inner loop is not kept when it does not fit in the memo size
+        and that the one of the last iteration of the enclosing loop is never kept.
+        """
+        Verbatim, Replacement = syntactical_analysis.VerbatimElement, syntactical_analysis.ReplacementElement
+        inner = syntactical_analysis.LoopElement("letters", "letter", [Replacement("letter"), Verbatim(",")])
+        element = syntactical_analysis.LoopElement("items", "item", [Replacement("item"), inner, Verbatim("|")])
+        letters = ["letter{}".format(idx) for idx in range(5000)]
+        translation = ",".join(letters) + ","
+        for items, memo_size, kept in [(["x", "y"], 1000, False), (["x", "y"], 100000, True), (["x"], 100000, False)]:
+            variables = DictVariables({"items": items, "letters": letters})
+            translator = semantic_analysis.SemanticAnalyzer(None, variables, 16, memo_size=memo_size)
+            memo = {}
+            chunks = list(translator._translate_loop(element, symbol_table.Scope(variables), memo))
+            self.assertEqual("".join(item + translation + "|" for item in items), "".join(chunks))
+            self.assertEqual(kept, id(inner) in memo)
+            self.assertLessEqual(memo.get(None, 0), memo_size)
+
+    def test_empty_loop_array_errors(self):
+        """
+        Tests that the loops without body over an array that is not correct raise the same exceptions as the loops with
+        body, also when they are translated in bulk.
+        """
+        Verbatim, Replacement = syntactical_analysis.VerbatimElement, syntactical_analysis.ReplacementElement
+        variables = DictVariables({"broken": BrokenStream(), "variable1": "hello"})
+        for body in [[], [Verbatim("-")], [Replacement("item")]]:
+            for flush_size in [0, 4, 1000]:
+                translator = semantic_analysis.SemanticAnalyzer(
+                    ElementsParser([syntactical_analysis.LoopElement("broken", "item", body)]), variables, flush_size)
+                with self.assertRaises(symbol_table.LineParseException):
+                    list(translator.run())
+                translator = semantic_analysis.SemanticAnalyzer(
+                    ElementsParser([syntactical_analysis.LoopElement("broken", "variable1", body)]), variables,
+                    flush_size)
+                with self.assertRaises(symbol_table.VariableHiddenException):
+                    list(translator.run())
+
+    def test_simple_loops(self):
+        """
+        Tests that the loops made only of verbatim text and replacements are translated in bulk as the translation
+        element by element does.
+        """
+        Verbatim, Replacement = syntactical_analysis.VerbatimElement, syntactical_analysis.ReplacementElement
+        variables = DictVariables({"array": ["x{}".format(idx) for idx in range(50)], "title": "{t}", "mixed": ["a", 1],
+                                   "pairs": [["a", "b"]], "empty": []})
+        for body in [[Replacement("item")], [Verbatim("<"), Replacement("item"), Verbatim(">\n")], [Verbatim("-")],
+                     [Replacement("item"), Verbatim("{0}"), Replacement("title"), Replacement("item")], []]:
+            element = syntactical_analysis.LoopElement("array", "item", body)
+            self.assertIsNotNone(semantic_analysis.simple_loop_body(element))
+            expected_string = "".join(semantic_analysis.SemanticAnalyzer(ElementsParser([element]), variables, 0).run())
+            for flush_size in [1, 30, 1000]:
+                translator = semantic_analysis.SemanticAnalyzer(ElementsParser([element]), variables, flush_size)
+                self.assertIsNotNone(translator._translate_simple_loop(element, symbol_table.Scope(variables)))
+                chunks = list(translator.run())
+                self.assertEqual(expected_string, "".join(chunks))
+                self.assertLessEqual(len(chunks), 50 if body else 1)
+        for array in ["mixed", "pairs", "empty"]:
+            element = syntactical_analysis.LoopElement(array, "item", [Verbatim("-"), Replacement("item")])
+            self.assertEqual(list(semantic_analysis.SemanticAnalyzer(ElementsParser([element]), variables, 0).run()),
+                             list(semantic_analysis.SemanticAnalyzer(ElementsParser([element]), variables, 100).run()))
+        for element, exception in [
+                (syntactical_analysis.LoopElement("array", "title", [Verbatim("-")]),
+                 symbol_table.VariableHiddenException),
+                (syntactical_analysis.LoopElement("array", "item", [Verbatim("-"), Replacement("unknown")]),
+                 symbol_table.VariableNotFoundException)]:
+            with self.assertRaises(exception):
+                list(semantic_analysis.SemanticAnalyzer(ElementsParser([element]), variables).run())
+        self.assertIsNone(semantic_analysis.simple_loop_body(syntactical_analysis.LoopElement("array", "item", [
+            syntactical_analysis.LoopElement("array", "other", [])])))
+
+
+class BufferScannerSemanticAnalyzerTest(SemanticAnalyzerTest):
+    """
+    Unittest of the Semantics analyzer fed by the buffer scanner.
+    """
+
+    scanner_class = lexical_analysis.BufferScanner
+
+
+class ChunkedScannerSemanticAnalyzerTest(SemanticAnalyzerTest):
+    """
+    Unittest of the Semantics analyzer fed by the chunked scanner with a chunk size that splits the delimiters.
+    """
+
+    @staticmethod
+    def scanner_class(filepath):
+        """
+        Creates a chunked scanner with a small chunk size.
+        :param filepath: String containing the path of the template file.
+        :return: engine.lexical_analysis.ChunkedScanner for the file.
+        """
+        return lexical_analysis.ChunkedScanner(filepath, 7)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,5 +1,14 @@
+import ast
+import json
+import os
+import re
+import shutil
+import tempfile
 import unittest
-from engine.symbol_table import VariableManager, FileParseException, LineParseException
+from engine.symbol_table import VariableManager, LazyVariableManager, StreamingVariableManager, InlineArrayStream, \
+    FileArrayStream, JsonVariableManager, NdjsonVariableManager, DictVariableManager, SnapshotVariableManager, Scope, \
+    FileParseException, LineParseException, TokenParseException, ValueParseException, VariableHiddenException, \
+    VariableNotFoundException
 from lexical_analisys_tests import path_composer
 
 
@@ -70,6 +79,41 @@ class VariableManagerTests(unittest.TestCase):
         except FileParseException:
             pass
 
+    @staticmethod
+    def _regex_parse_line(line):
+        """
+        Parses a line with the regular expression and ast.literal_eval, as the first version of the parser did.
+        :param line: Input line to parse.
+        :return: Tuple (String, String or List) with the name and the value or the class of the exception raised.
+        """
+        result = re.search(r' *"(?P<token>[a-zA-Z]\w*)" *: *(?P<value>(("[^"]*")|\["[^"]*"(( *, *"[^"]*")+)\])) *$',
+                           line)
+        if not result:
+            return LineParseException
+        try:
+            return result.group('token'), ast.literal_eval(result.group('value'))
+        except SyntaxError:
+            return SyntaxError
+
+    def test_parse_line_same_as_regex(self):
+        """
+        Tests that the lines are parsed as the regular expression does, also the unusual ones.
+        """
+        for line in ['"token": "value"', '"token":"value"', '"token"  :  "value"  ', '"t_1": ""', '"token": "a b, c"',
+                     '"token": ["a", "b"]', '"token": ["a","b" ,  "c"]', '"token": ["", ""]', '"token": ["[a]", "b,"]',
+                     '"token": ["a"]', '"token": []', '"token": [ "a", "b"]', '"token": ["a", "b" ]',
+                     '"token": ["a"; "b"]', '"token": ["a", "b"', '"token": "a\\nb"', '"token": ["a\\tb", "c"]',
+                     '"token": "a\\"', '"token": "a"b"', '"token": \t"a"', '"1token": "a"', '"": "a"',
+                     '"tök": "a"', 'prefix "token": "value"', '"a": "x "b": "y"', '"token" "value"',
+                     '"token": "value" extra', '"to ken": "value"']:
+            try:
+                parsed = VariableManager._parse_line(line)
+            except LineParseException:
+                parsed = LineParseException
+            except SyntaxError:
+                parsed = SyntaxError
+            self.assertEqual(VariableManagerTests._regex_parse_line(line), parsed, line)
+
     def _test_parse_correct_file(self, filename):
         """
         Utility method to test the results of reading a correct var file.
@@ -103,5 +147,304 @@ class VariableManagerTests(unittest.TestCase):
         self._test_parse_correct_file('correct_var_file_scrambled.txt')
 
 
+class LazyVariableManagerTests(unittest.TestCase):
+    """
+    Unit tests for the class LazyVariableManager
+    """
+
+    manager_class = LazyVariableManager
+
+    def setUp(self):
+        """
+        Creates a temporary folder for the variables files.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """
+        Removes the temporary folder.
+        """
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, content):
+        """
+        Writes a variables file in the temporary folder.
+        :param content: String with the content of the file.
+        :return: String with the path to the file.
+        """
+        path = os.path.join(self.temp_dir, "variables.txt")
+        with open(path, 'w', newline='') as f:
+            f.write(content)
+        return path
+
+    def test_same_as_eager(self):
+        """
+        Tests that the values are the same ones the eager manager parses.
+        """
+        for filename in ['correct_var_file.txt', 'correct_var_file_duplicates.txt', 'correct_var_file_scrambled.txt',
+                         'other_var_file.txt']:
+            mgr = VariableManager(path_composer(filename))
+            mgr.parse()
+            lazy_mgr = self.manager_class(path_composer(filename))
+            lazy_mgr.parse()
+            for name, value in mgr._variables.items():
+                self.assertEqual(value, lazy_mgr.get_replacement(name), filename)
+            self.assertEqual(set(mgr._variables), set(lazy_mgr._index), filename)
+
+    def test_load_referenced(self):
+        """
+        Tests that only the variables loaded or requested are decoded.
+        """
+        path = self._write('"used": "a"\r\n  "list": ["b", "c"]  \n\n"unused": "d"\n"bad": "x"y"\n"last": "é"')
+        mgr = self.manager_class(path)
+        mgr.parse()
+        self.assertEqual(frozenset(), mgr.loaded_names)
+        mgr.load(["used", "list", "missing"])
+        self.assertEqual(frozenset(["used", "list"]), mgr.loaded_names)
+        self.assertEqual(["b", "c"], mgr.get_replacement("list"))
+        self.assertEqual("é", mgr.get_replacement("last"))
+        self.assertEqual(frozenset(["used", "list", "last"]), mgr.loaded_names)
+        with self.assertRaises(LineParseException):
+            mgr.get_replacement("bad")
+        with self.assertRaises(VariableNotFoundException):
+            mgr.get_replacement("missing")
+
+    def test_unusual_lines(self):
+        """
+        Tests that the lines that do not start with the name of a variable are checked while the file is indexed.
+        """
+        for content in ['"a": "x"\nb: "y"\n', '"a": "x"\n"1b": "y"\n', '"a" "x"\n']:
+            with self.assertRaises(LineParseException):
+                self.manager_class(self._write(content)).parse()
+        mgr = self.manager_class(self._write(''))
+        mgr.parse()
+        with self.assertRaises(VariableNotFoundException):
+            mgr.get_replacement("a")
+
+    def test_not_parsed(self):
+        """
+        Tests that the variables can not be requested before the file is parsed.
+        """
+        with self.assertRaises(FileParseException):
+            self.manager_class(path_composer('correct_var_file.txt')).get_replacement("variable1")
+
+
+class StreamingVariableManagerTests(LazyVariableManagerTests):
+    """
+    Unit tests for the class StreamingVariableManager
+    """
+
+    manager_class = StreamingVariableManager
+
+    def test_inline_arrays(self):
+        """
+        Tests that the long arrays are streamed with the same items as the eager manager parses, whatever the size of
+        the blocks decoded.
+        """
+        items = ["item{}{}é".format(idx, "\\n" if idx % 7 == 0 else "") for idx in range(500)]
+        path = self._write('"variable": "hello"\n  "array" : [{}]  \r\n"small": ["a", "b"]\n'.format(
+            ", ".join('"{}"'.format(item) for item in items)))
+        mgr = VariableManager(path)
+        mgr.parse()
+        stream_mgr = StreamingVariableManager(path, stream_size=100)
+        stream_mgr.parse()
+        array = stream_mgr.get_replacement("array")
+        self.assertIsInstance(array, InlineArrayStream)
+        self.assertEqual(["a", "b"], stream_mgr.get_replacement("small"))
+        self.assertEqual("hello", stream_mgr.get_replacement("variable"))
+        for block_size in [1, 2, 7, 100, InlineArrayStream.DEFAULT_BLOCK_SIZE]:
+            array.block_size = block_size
+            self.assertEqual(mgr.get_replacement("array"), list(array), block_size)
+            self.assertEqual(mgr.get_replacement("array"), list(array), block_size)
+
+    def test_inline_arrays_wrong(self):
+        """
+        Tests that the streamed arrays with syntax errors raise the same exception as the eager manager.
+        """
+        for value in ['["a"]', '["a", "b",]', '["a" "b"]', '["a", "b"x]', '["a", "b]', '["a"; "b"]']:
+            mgr = StreamingVariableManager(self._write('"array": {}\n'.format(value)), stream_size=1)
+            mgr.parse()
+            with self.assertRaises(LineParseException):
+                list(mgr.get_replacement("array"))
+
+    def test_array_files(self):
+        """
+        Tests that the arrays of their own files are read line by line and replace the variables of the file.
+        """
+        array_path = os.path.join(self.temp_dir, "array.txt")
+        with open(array_path, 'w') as f:
+            f.write("a\n\nc, d\n")
+        mgr = StreamingVariableManager(path_composer('correct_var_file.txt'),
+                                       {"array1": array_path, "other": array_path})
+        mgr.parse()
+        for name in ["array1", "other"]:
+            self.assertIsInstance(mgr.get_replacement(name), FileArrayStream)
+            self.assertEqual(["a", "", "c, d"], list(mgr.get_replacement(name)))
+        self.assertEqual("hello", mgr.get_replacement("variable1"))
+        with self.assertRaises(IOError):
+            StreamingVariableManager(path_composer('correct_var_file.txt'), {"array1": array_path + ".missing"})
+        with self.assertRaises(TokenParseException):
+            StreamingVariableManager(path_composer('correct_var_file.txt'), {"1array": array_path})
+
+
+class VariableFormatsTests(unittest.TestCase):
+    """
+    Unit tests for the formats of variables other than the replacements file
+    """
+
+    def setUp(self):
+        """
+        Creates a temporary folder for the variables files.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """
+        Removes the temporary folder.
+        """
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, content, filename="variables.txt"):
+        """
+        Writes a variables file in the temporary folder.
+        :param content: String with the content of the file.
+        :param filename: String with the name of the file.
+        :return: String with the path to the file.
+        """
+        path = os.path.join(self.temp_dir, filename)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def _check(self, mgr, expected_variables):
+        """
+        Parses the variables and checks their values.
+        :param mgr: engine.symbol_table.VariableManager to parse.
+        :param expected_variables: Dictionary with the expected value of each variable.
+        """
+        mgr.parse()
+        self.assertEqual(expected_variables, dict(mgr._variables))
+        for name, value in expected_variables.items():
+            self.assertEqual(value, mgr.get_replacement(name))
+
+    def test_json(self):
+        """
+        Tests the JSON objects and the wrong JSON files.
+        """
+        self._check(JsonVariableManager(self._write(json.dumps(VariableManagerTests.target_dict))),
+                    VariableManagerTests.target_dict)
+        for content, exception in [('{"a": 1}', ValueParseException), ('{"a": ["b", 2]}', ValueParseException),
+                                   ('{"1a": "b"}', TokenParseException), ('["a"]', LineParseException),
+                                   ('{"a": ', LineParseException)]:
+            with self.assertRaises(exception, msg=content):
+                JsonVariableManager(self._write(content)).parse()
+
+    def test_ndjson(self):
+        """
+        Tests the files with a JSON object in each line.
+        """
+        path = self._write('{"variable1": "hello", "array1": ["a", "b", "c"]}\n\n{"variable2": "bye"}\n'
+                           '{"empty": [], "variable1": "hello"}\n')
+        self._check(NdjsonVariableManager(path), dict(VariableManagerTests.target_dict, empty=[]))
+        with self.assertRaises(LineParseException):
+            NdjsonVariableManager(self._write('{"a": "b"}\n"c"\n')).parse()
+
+    def test_dict(self):
+        """
+        Tests the variables of a dictionary.
+        """
+        self._check(DictVariableManager(dict(VariableManagerTests.target_dict, pair=("x", "y"))),
+                    dict(VariableManagerTests.target_dict, pair=["x", "y"]))
+        with self.assertRaises(ValueParseException):
+            DictVariableManager({"a": None}).parse()
+        with self.assertRaises(FileParseException):
+            DictVariableManager({"a": "b"}).get_replacement("a")
+
+    def test_snapshot(self):
+        """
+        Tests that the snapshots have the same variables that were saved, also when the strings have the separator.
+        """
+        path = os.path.join(self.temp_dir, "variables.tvs")
+        for variables in [VariableManagerTests.target_dict, {"a": "", "b": ["", "x\x00y", "\x01"], "c": [], "d": "é"},
+                          {"many": ["item{}".format(idx) for idx in range(1000)]}]:
+            SnapshotVariableManager.save(variables, path)
+            self._check(SnapshotVariableManager(path), variables)
+        mgr = VariableManager(path_composer('correct_var_file_scrambled.txt'))
+        SnapshotVariableManager.save(mgr.read(), path)
+        self._check(SnapshotVariableManager(path), VariableManagerTests.target_dict)
+
+    def test_snapshot_wrong(self):
+        """
+        Tests that the files that are not correct snapshots raise an exception.
+        """
+        path = os.path.join(self.temp_dir, "variables.tvs")
+        SnapshotVariableManager.save(VariableManagerTests.target_dict, path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        for content in [b"", b"TVS\x01", data[:30], data[:-5], data.replace(b"hello", b"hel\x00lo"),
+                        b"text" + data[4:]]:
+            with open(path, 'wb') as f:
+                f.write(content)
+            with self.assertRaises(FileParseException, msg=content):
+                SnapshotVariableManager(path).parse()
+
+
+class ScopeTests(unittest.TestCase):
+    """
+    Unit tests for the class Scope
+    """
+
+    def setUp(self):
+        """
+        Parses the variables used by the scopes.
+        """
+        self.var_mgr = VariableManager(path_composer('correct_var_file.txt'))
+        self.var_mgr.parse()
+
+    def test_iterators(self):
+        """
+        Tests that the iterators hide the enclosing iterators with the same name until they are removed.
+        """
+        scope = Scope(self.var_mgr)
+        outer = scope.push("item", "a")
+        inner = scope.push("item", "x")
+        self.assertEqual("x", scope.get_replacement("item"))
+        scope.set(outer, "b")
+        scope.set(inner, "y")
+        self.assertEqual("y", scope.get_replacement("item"))
+        scope.pop()
+        self.assertEqual("b", scope.get_replacement("item"))
+        self.assertEqual("hello", scope.get_replacement("variable1"))
+        scope.pop()
+        with self.assertRaises(VariableNotFoundException):
+            scope.get_replacement("item")
+
+    def test_variable_hidden(self):
+        """
+        Tests that an iterator with the name of a variable of the file raises an exception.
+        """
+        with self.assertRaises(VariableHiddenException):
+            Scope(self.var_mgr).push("variable1", "a")
+        scope = Scope(self.var_mgr)
+        with self.assertRaises(VariableHiddenException):
+            scope.check_hidden("variable1", "a")
+        scope.check_hidden("item", "a")
+        scope.push("item", "a")
+        scope.check_hidden("item", "b")
+        self.assertEqual("a", scope.get_replacement("item"))
+
+    def test_shared_variables(self):
+        """
+        Tests that the scopes do not modify the variables shared with other scopes.
+        """
+        scope = Scope(self.var_mgr)
+        scope.push("item", "a")
+        other_scope = Scope(self.var_mgr)
+        with self.assertRaises(VariableNotFoundException):
+            other_scope.get_replacement("item")
+        with self.assertRaises(TypeError):
+            self.var_mgr._variables["item"] = "a"
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -134,7 +134,7 @@ class ParserTest(unittest.TestCase):
                                              ReplacementElement("item2"), EolElement()])
                                          ])
                             ]
-        self._test_parse("parser_loop_with_extra_var.txt", expected_results)
+        self._test_parse("parser_loop_with_extra_loop.txt", expected_results)
 
     def test_parse_loop_wrong_init_token(self):
         """
@@ -164,6 +164,27 @@ class ParserTest(unittest.TestCase):
         with self.assertRaises(engine.syntactical_analysis.SyntaxException):
             self._test_parse("parser_loop_wrong_more_params.txt", [])
 
+    def test_parse_loop_wrong_end_params(self):
+        """
+        Tests the parsing of a file with a loop with a wrong syntax because it has tokens in the end of the loop.
+        """
+        with self.assertRaises(engine.syntactical_analysis.SyntaxException):
+            self._test_parse("parser_loop_wrong_end_params.txt", [])
+
+    def test_parse_loop_unbalanced_end(self):
+        """
+        Tests the parsing of a file with the end of a loop outside of a loop.
+        """
+        with self.assertRaises(engine.syntactical_analysis.SyntaxException):
+            self._test_parse("parser_loop_unbalanced_end.txt", [])
+
+    def test_parse_keyword_outside_expression(self):
+        """
+        Tests the parsing of a file with loop keywords outside an expression.
+        """
+        with self.assertRaises(engine.syntactical_analysis.SyntaxException):
+            self._test_parse("parser_keyword_outside_expression.txt", [])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,134 @@
+import marshal
+import os
+import shutil
+import tempfile
+import unittest
+
+import compilation
+import lexical_analysis
+import template_cache
+from helpers import CountingScanner, parsed_variables, StringSink
+from lexical_analisys_tests import path_composer
+from semantic_analysis_tests import expected
+
+
+class TemplateCacheTest(unittest.TestCase):
+    """
+    Unittests of the cache of compiled templates.
+    """
+
+    def setUp(self):
+        """
+        Creates an empty cache directory and a copy of a template that can be modified.
+        """
+        self.cache_dir = tempfile.mkdtemp()
+        self.template_dir = tempfile.mkdtemp()
+        self.template_path = os.path.join(self.template_dir, "template.txt")
+        shutil.copy(path_composer("template_simple_list_replacements.txt"), self.template_path)
+
+    def tearDown(self):
+        """
+        Removes the cache directory and the template.
+        """
+        shutil.rmtree(self.cache_dir)
+        shutil.rmtree(self.template_dir)
+
+    def _render(self, compiled_template):
+        """
+        Renders a compiled template with the correct variables file.
+        :param compiled_template: engine.compilation.CompiledTemplate to render.
+        :return: String with the document rendered.
+        """
+        sink = StringSink()
+        compiled_template.render(parsed_variables("correct_var_file.txt"), sink)
+        return sink.document
+
+    def test_hit_skips_scanner(self):
+        """
+        Tests that a template found in the cache is not scanned again, even by another cache object.
+        """
+        CountingScanner.scans = 0
+        cache = template_cache.TemplateCache(self.cache_dir)
+        self.assertEqual(expected, self._render(cache.load(self.template_path, CountingScanner)))
+        cache = template_cache.TemplateCache(self.cache_dir)
+        self.assertEqual(expected, self._render(cache.load(self.template_path, CountingScanner)))
+        self.assertEqual(1, CountingScanner.scans)
+        self.assertEqual((1, 0), (cache.hits, cache.misses))
+
+    def test_modified_template(self):
+        """
+        Tests that a template is compiled again when its contents change.
+        """
+        cache = template_cache.TemplateCache(self.cache_dir)
+        cache.load(self.template_path)
+        with open(self.template_path, 'a') as f:
+            f.write("{{ variable1 }}\n")
+        self.assertEqual(expected + "hello\n", self._render(cache.load(self.template_path)))
+        self.assertEqual((0, 2), (cache.hits, cache.misses))
+
+    def test_scanner_in_key(self):
+        """
+        Tests that the templates compiled with different scanners are stored separately.
+        """
+        cache = template_cache.TemplateCache(self.cache_dir)
+        cache.load(self.template_path, lexical_analysis.Scanner)
+        compiled_template = cache.load(self.template_path, lexical_analysis.BufferScanner)
+        self.assertEqual((0, 2), (cache.hits, cache.misses))
+        self.assertEqual(11, len(compiled_template.elements))
+
+    def test_mapped_template(self):
+        """
+        Tests that the bytes-like verbatim values of a memory mapped template are stored.
+        """
+        cache = template_cache.TemplateCache(self.cache_dir)
+        cache.load(self.template_path, lexical_analysis.MappedScanner)
+        compiled_template = cache.load(self.template_path, lexical_analysis.MappedScanner)
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+        self.assertEqual('utf-8', compiled_template.encoding)
+        self.assertEqual(b"some random text\nI wanted to say ", compiled_template.elements[0].value)
+
+    def test_eviction(self):
+        """
+        Tests that the least recently used templates are removed when the cache is too big.
+        """
+        size = len(compilation.CompiledTemplate.compile(self.template_path).dumps())
+        cache = template_cache.TemplateCache(self.cache_dir, size * 2 + 64)
+        for idx in range(3):
+            with open(self.template_path, 'a') as f:
+                f.write("{}\n".format(idx))
+            cache.load(self.template_path)
+        self.assertEqual(2, len(os.listdir(self.cache_dir)))
+        self.assertEqual(1, cache.evictions)
+
+    def test_corrupted_file(self):
+        """
+        Tests that a corrupted cache file is replaced.
+        """
+        cache = template_cache.TemplateCache(self.cache_dir)
+        cache.load(self.template_path)
+        for filename in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, filename), 'wb') as f:
+                f.write(b"corrupted")
+        self.assertEqual(expected, self._render(cache.load(self.template_path)))
+        self.assertEqual((0, 2), (cache.hits, cache.misses))
+        self.assertEqual(expected, self._render(cache.load(self.template_path)))
+        self.assertEqual(1, cache.hits)
+
+    def test_wrong_payload(self):
+        """
+        Tests that a cache file with a correct marshal payload that is not a serialized template is replaced.
+        """
+        cache = template_cache.TemplateCache(self.cache_dir)
+        cache.load(self.template_path)
+        payloads = [("utf-8", ((),)), ("utf-8", (("array1", "item"),)), ("utf-8", ((1,),)), ("utf-8", (5,)),
+                    {"utf-8": 1, "elements": 2}, ("utf-8", (("array1", "item", 3),)), [], "text"]
+        for misses, payload in enumerate(payloads, 2):
+            for filename in os.listdir(self.cache_dir):
+                with open(os.path.join(self.cache_dir, filename), 'wb') as f:
+                    f.write(marshal.dumps(payload))
+            self.assertEqual(expected, self._render(cache.load(self.template_path)), payload)
+            self.assertEqual(misses, cache.misses, payload)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,11 @@
+import logging
 import os
 import unittest
 import tempfile
-from translator import OutputFileManager, Template
+from lexical_analysis import MappedScanner, Scanner
+from translator import BACKENDS, FLUSH_POLICIES, OutputFileManager, Template
+from variables_cache import VariablesCache
+from variables_snapshot import convert
 from lexical_analisys_tests import path_composer
 
 
@@ -9,6 +13,14 @@ class OutputFileManagerTest(unittest.TestCase):
     """
     Test for the OutputFileManager class
     """
+    def setUp(self):
+        # The blocks are only counted when the statistics are logged.
+        self.logger = logging.getLogger(OutputFileManager.__name__)
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        self.logger.setLevel(logging.NOTSET)
+
     def test_print(self):
         out_file = tempfile.NamedTemporaryFile()
         out_file_path = os.path.join(tempfile.gettempdir(), out_file.name)
@@ -35,6 +47,70 @@ class OutputFileManagerTest(unittest.TestCase):
                 self.assertEqual(expected[test_line_idx], line)
                 test_line_idx += 1
 
+    def test_buffered_print(self):
+        out_file = tempfile.NamedTemporaryFile()
+        out_file_path = os.path.join(tempfile.gettempdir(), out_file.name)
+        out_file.close()
+        chunks = ["first ", "line\n", "second", " ", "line\n", "last line"]
+
+        for encoding in [None, 'utf-8']:
+            # The text file joins the chunks shorter than its chunk size before buffering them.
+            expected_flushes = {'size': 1 if encoding is None else 3, 'line': 3, 'chunk': 6}
+            for flush_policy in FLUSH_POLICIES:
+                with OutputFileManager(out_file_path, encoding, buffer_size=16, flush_policy=flush_policy) as out_mgr:
+                    for chunk in chunks:
+                        out_mgr.print(chunk)
+                self.assertEqual(expected_flushes[flush_policy], out_mgr.flushes)
+                self.assertEqual(len("".join(chunks)), out_mgr.bytes_written)
+                with open(out_file_path, 'r') as f:
+                    self.assertEqual("".join(chunks), f.read())
+
+    def test_long_chunks(self):
+        out_file = tempfile.NamedTemporaryFile()
+        out_file_path = os.path.join(tempfile.gettempdir(), out_file.name)
+        out_file.close()
+        chunks = [bytes([ord('a') + idx % 26]) * 2000 for idx in range(3000)]
+        chunks.append(memoryview(b"short chunk\n")[6:])
+
+        with OutputFileManager(out_file_path, 'utf-8', buffer_size=1024 * 1024) as out_mgr:
+            for chunk in chunks:
+                out_mgr.print(chunk)
+        self.assertEqual(6, out_mgr.flushes)
+        self.assertEqual(sum(len(chunk) for chunk in chunks), out_mgr.bytes_written)
+        with open(out_file_path, 'rb') as f:
+            self.assertEqual(b"".join(chunks), f.read())
+
+    def test_memoryview_line_flush(self):
+        out_file = tempfile.NamedTemporaryFile()
+        out_file_path = os.path.join(tempfile.gettempdir(), out_file.name)
+        out_file.close()
+        mapped = memoryview(b"first line\nsecond line\nlast line")
+        chunks = [mapped[:6], mapped[6:11], mapped[11:17], " ", mapped[18:23], mapped[23:]]
+
+        with OutputFileManager(out_file_path, 'utf-8', flush_policy='line') as out_mgr:
+            for chunk in chunks:
+                out_mgr.print(chunk)
+            self.assertEqual(2, out_mgr.flushes)
+        self.assertEqual(3, out_mgr.flushes)
+        with open(out_file_path, 'rb') as f:
+            self.assertEqual(b"first line\nsecond line\nlast line", f.read())
+
+    def test_uncounted_flushes(self):
+        out_file = tempfile.NamedTemporaryFile()
+        out_file_path = os.path.join(tempfile.gettempdir(), out_file.name)
+        out_file.close()
+        self.logger.setLevel(logging.WARNING)
+
+        for encoding in [None, 'utf-8']:
+            with OutputFileManager(out_file_path, encoding, buffer_size=16) as out_mgr:
+                out_mgr.print("first line\n")
+                out_mgr.print("second line\n")
+            self.assertIsNone(out_mgr.flushes)
+            self.assertEqual(23, out_mgr.bytes_written)
+
+    def test_unknown_flush_policy(self):
+        self.assertRaises(ValueError, OutputFileManager, "output.txt", None, 1024, 'never')
+
 
 class TemplateTest(unittest.TestCase):
 
@@ -53,6 +129,174 @@ class TemplateTest(unittest.TestCase):
                 line_expected = f_expected.readline()
                 self.assertEqual(line_expected, line_generated)
 
+    def test_replace_twice(self):
+        out_file = tempfile.NamedTemporaryFile()
+        out_file_path = os.path.join(tempfile.gettempdir(), out_file.name)
+        out_file.close()
+        template = Template(
+            path_composer("template_simple_list_replacements.txt"),
+            path_composer("correct_var_file.txt"),
+            out_file_path)
+        template.replace()
+        compiled_template = template.compiled_template
+        template.replace()
+        self.assertIs(compiled_template, template.compiled_template)
+
+        with open(out_file_path, 'r') as f_generated, open(path_composer("template_no_replacements.txt")) as f_expected:
+            self.assertEqual(f_expected.read(), f_generated.read())
+
+    def test_replace_correct_mapped(self):
+        out_file = tempfile.NamedTemporaryFile()
+        out_file_path = os.path.join(tempfile.gettempdir(), out_file.name)
+        out_file.close()
+        template = Template(
+            path_composer("template_simple_list_replacements.txt"),
+            path_composer("correct_var_file.txt"),
+            out_file_path,
+            MappedScanner)
+        template.replace()
+
+        with open(out_file_path, 'r') as f_generated, open(path_composer("template_no_replacements.txt")) as f_expected:
+            self.assertEqual(f_expected.read(), f_generated.read())
+
+    def test_replace_backends(self):
+        out_file = tempfile.NamedTemporaryFile()
+        out_file_path = os.path.join(tempfile.gettempdir(), out_file.name)
+        out_file.close()
+        for backend in BACKENDS:
+            for scanner_class in [Scanner, MappedScanner]:
+                template = Template(
+                    path_composer("template_simple_list_replacements.txt"),
+                    path_composer("correct_var_file.txt"),
+                    out_file_path,
+                    scanner_class,
+                    backend=backend)
+                template.replace()
+
+                with open(out_file_path, 'r') as f_generated, \
+                        open(path_composer("template_no_replacements.txt")) as f_expected:
+                    self.assertEqual(f_expected.read(), f_generated.read(), backend)
+
+    def test_replace_parallel(self):
+        out_file = tempfile.NamedTemporaryFile()
+        out_file_path = os.path.join(tempfile.gettempdir(), out_file.name)
+        out_file.close()
+        template = Template(
+            path_composer("template_simple_list_replacements.txt"),
+            path_composer("correct_var_file.txt"),
+            out_file_path,
+            MappedScanner,
+            workers=2)
+        template.replace()
+
+        with open(out_file_path, 'r') as f_generated, open(path_composer("template_no_replacements.txt")) as f_expected:
+            self.assertEqual(f_expected.read(), f_generated.read())
+
+
+    def test_replace_parallel_loops(self):
+        out_file = tempfile.NamedTemporaryFile()
+        out_file_path = os.path.join(tempfile.gettempdir(), out_file.name)
+        out_file.close()
+        template = Template(
+            path_composer("template_simple_list_replacements.txt"),
+            path_composer("correct_var_file.txt"),
+            out_file_path,
+            loop_workers=2,
+            loop_threshold=2)
+        template.replace()
+
+        with open(out_file_path, 'r') as f_generated, open(path_composer("template_no_replacements.txt")) as f_expected:
+            self.assertEqual(f_expected.read(), f_generated.read())
+        with self.assertRaises(ValueError):
+            Template(path_composer("template_simple_list_replacements.txt"), path_composer("correct_var_file.txt"),
+                     out_file_path, backend='ir', loop_workers=2)
+
+    def test_replace_lazy_variables(self):
+        out_file = tempfile.NamedTemporaryFile()
+        out_file_path = os.path.join(tempfile.gettempdir(), out_file.name)
+        out_file.close()
+        for template_name in ["template_simple_list_replacements.txt", "template_no_replacements.txt"]:
+            template = Template(
+                path_composer(template_name),
+                path_composer("correct_var_file.txt"),
+                out_file_path,
+                lazy_variables=True)
+            template.replace()
+
+            with open(out_file_path, 'r') as f_generated, \
+                    open(path_composer("template_no_replacements.txt")) as f_expected:
+                self.assertEqual(f_expected.read(), f_generated.read())
+        self.assertEqual(frozenset(), template.var_mgr.loaded_names)
+    def test_replace_streamed_arrays(self):
+        out_file = tempfile.NamedTemporaryFile()
+        out_file_path = os.path.join(tempfile.gettempdir(), out_file.name)
+        out_file.close()
+        array_file = tempfile.NamedTemporaryFile('w', suffix=".txt", delete=False)
+        array_file.write("a\nb\nc\n")
+        array_file.close()
+        try:
+            for backend in sorted(BACKENDS):
+                for options in [{"stream_arrays": True}, {"array_files": {"array1": array_file.name}}]:
+                    template = Template(
+                        path_composer("template_simple_list_replacements.txt"),
+                        path_composer("correct_var_file.txt"),
+                        out_file_path,
+                        backend=backend,
+                        **options)
+                    template.replace()
+
+                    with open(out_file_path, 'r') as f_generated, \
+                            open(path_composer("template_no_replacements.txt")) as f_expected:
+                        self.assertEqual(f_expected.read(), f_generated.read(), backend)
+        finally:
+            os.remove(array_file.name)
+    def test_replace_variables_formats(self):
+        out_file = tempfile.NamedTemporaryFile()
+        out_file_path = os.path.join(tempfile.gettempdir(), out_file.name)
+        out_file.close()
+        variables_file = tempfile.NamedTemporaryFile('w', suffix=".json", delete=False)
+        variables_file.write('{"variable1": "hello", "array1": ["a", "b", "c"], "variable2": "bye"}')
+        variables_file.close()
+        snapshot_path = variables_file.name + ".tvs"
+        try:
+            convert(variables_file.name, snapshot_path, 'json')
+            for variables_path, variables_format in [(variables_file.name, 'json'), (snapshot_path, 'snapshot')]:
+                template = Template(
+                    path_composer("template_simple_list_replacements.txt"),
+                    variables_path,
+                    out_file_path,
+                    variables_format=variables_format)
+                template.replace()
+
+                with open(out_file_path, 'r') as f_generated, \
+                        open(path_composer("template_no_replacements.txt")) as f_expected:
+                    self.assertEqual(f_expected.read(), f_generated.read(), variables_format)
+            with self.assertRaises(ValueError):
+                Template(path_composer("template_simple_list_replacements.txt"), snapshot_path, out_file_path,
+                         lazy_variables=True, variables_format='snapshot')
+        finally:
+            os.remove(variables_file.name)
+            os.remove(snapshot_path)
+    def test_replace_variables_cache(self):
+        out_file = tempfile.NamedTemporaryFile()
+        out_file_path = os.path.join(tempfile.gettempdir(), out_file.name)
+        out_file.close()
+        cache = VariablesCache()
+        for template_name in ["template_simple_list_replacements.txt", "template_string_replacements.txt"]:
+            template = Template(
+                path_composer(template_name),
+                path_composer("correct_var_file.txt"),
+                out_file_path,
+                variables_cache=cache)
+            template.replace()
+
+            with open(out_file_path, 'r') as f_generated, \
+                    open(path_composer("template_no_replacements.txt")) as f_expected:
+                self.assertEqual(f_expected.read(), f_generated.read())
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+        with self.assertRaises(ValueError):
+            Template(path_composer("template_simple_list_replacements.txt"), path_composer("correct_var_file.txt"),
+                     out_file_path, lazy_variables=True, variables_cache=cache)
 
 if __name__ == '__main__':
     unittest.main()
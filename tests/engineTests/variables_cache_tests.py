@@ -0,0 +1,131 @@
+import concurrent.futures
+import os
+import shutil
+import tempfile
+import unittest
+
+import symbol_table
+import variables_cache
+
+
+class VariablesCacheTest(unittest.TestCase):
+    """
+    Unittests of the cache of parsed variables.
+    """
+
+    def setUp(self):
+        """
+        Creates a variables file.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.variables_path = self._write("variables.txt", '"variable1": "hello"\n"array1": ["a", "b"]\n')
+
+    def tearDown(self):
+        """
+        Removes the variables files.
+        """
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, filename, content, mtime_ns=None):
+        """
+        Writes a variables file.
+        :param filename: String with the name of the file.
+        :param content: String with the content of the file.
+        :param mtime_ns: Integer with the modification time of the file in nanoseconds or None to keep the current one.
+        :return: String with the path to the file.
+        """
+        path = os.path.join(self.temp_dir, filename)
+        with open(path, 'w') as f:
+            f.write(content)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+        return path
+
+    def test_hits(self):
+        """
+        Tests that the variables are parsed once while the file does not change.
+        """
+        cache = variables_cache.VariablesCache()
+        var_mgr = cache.load(self.variables_path)
+        self.assertEqual("hello", var_mgr.get_replacement("variable1"))
+        self.assertIs(var_mgr, cache.load(self.variables_path))
+        self.assertIs(var_mgr, cache.load(os.path.join(self.temp_dir, ".", "variables.txt")))
+        self.assertEqual((2, 1, 0), (cache.hits, cache.misses, cache.evictions))
+        self.assertEqual(var_mgr.memory_size(), cache.size)
+
+    def test_invalidation(self):
+        """
+        Tests that the variables are parsed again when the contents of the file change, but not when only its
+        modification time changes.
+        """
+        cache = variables_cache.VariablesCache()
+        mtime_ns = os.stat(self.variables_path).st_mtime_ns
+        var_mgr = cache.load(self.variables_path)
+        self._write("variables.txt", '"variable1": "hello"\n"array1": ["a", "b"]\n', mtime_ns + 10 ** 9)
+        self.assertIs(var_mgr, cache.load(self.variables_path))
+        self._write("variables.txt", '"variable1": "bye"\n', mtime_ns + 2 * 10 ** 9)
+        var_mgr = cache.load(self.variables_path)
+        self.assertEqual("bye", var_mgr.get_replacement("variable1"))
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
+        # A change that keeps the modification time and the size is only detected verifying the contents.
+        self._write("variables.txt", '"variable1": "eyb"\n', mtime_ns + 2 * 10 ** 9)
+        self.assertIs(var_mgr, cache.load(self.variables_path))
+        cache.verify_contents = True
+        self.assertEqual("eyb", cache.load(self.variables_path).get_replacement("variable1"))
+
+    def test_formats(self):
+        """
+        Tests that the same file read with different formats are different entries.
+        """
+        cache = variables_cache.VariablesCache()
+        path = self._write("variables.json", '{"variable1": "hello"}')
+        self.assertIsInstance(cache.load(path, symbol_table.JsonVariableManager), symbol_table.JsonVariableManager)
+        with self.assertRaises(symbol_table.LineParseException):
+            cache.load(path)
+        self.assertEqual((0, 2), (cache.hits, cache.misses))
+
+    def test_evictions(self):
+        """
+        Tests that the least recently used variables are evicted when the cache is too big.
+        """
+        paths = [self._write("variables{}.txt".format(idx), '"variable{}": "{}"\n'.format(idx, "x" * 1000))
+                 for idx in range(3)]
+        var_mgr = symbol_table.VariableManager(paths[0])
+        var_mgr.parse()
+        cache = variables_cache.VariablesCache(2 * var_mgr.memory_size())
+        for path in [paths[0], paths[1], paths[0], paths[2], paths[0], paths[1]]:
+            cache.load(path)
+        self.assertEqual((2, 4, 2), (cache.hits, cache.misses, cache.evictions))
+        self.assertLessEqual(cache.size, cache.max_size)
+        cache.clear()
+        self.assertEqual(0, cache.size)
+        cache.load(paths[0])
+        self.assertEqual(5, cache.misses)
+
+    def test_threads(self):
+        """
+        Tests that the cache can be used from several threads at once.
+        """
+        paths = [self._write("variables{}.txt".format(idx), '"variable": "{}"\n'.format(idx)) for idx in range(4)]
+        cache = variables_cache.VariablesCache()
+        with concurrent.futures.ThreadPoolExecutor(8) as executor:
+            values = list(executor.map(lambda path: cache.load(path).get_replacement("variable"), paths * 50))
+        self.assertEqual([str(idx) for idx in range(4)] * 50, values)
+        self.assertEqual(200, cache.hits + cache.misses)
+
+    def test_missing_file(self):
+        """
+        Tests that a file that does not exist raises an exception.
+        """
+        with self.assertRaises(IOError):
+            variables_cache.VariablesCache().load(os.path.join(self.temp_dir, "missing.txt"))
+
+    def test_shared_cache(self):
+        """
+        Tests that the process has a single shared cache.
+        """
+        self.assertIs(variables_cache.shared_cache(), variables_cache.shared_cache())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import symbol_table
+import variables_snapshot
+from lexical_analisys_tests import path_composer
+
+
+class ConvertTest(unittest.TestCase):
+    """
+    Unittests of the conversion of variables files to snapshots.
+    """
+
+    def setUp(self):
+        """
+        Creates the directory of the snapshots.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """
+        Removes the snapshots.
+        """
+        shutil.rmtree(self.temp_dir)
+
+    def test_convert(self):
+        """
+        Tests that the snapshot has the same variables as the variables file.
+        """
+        snapshot_path = os.path.join(self.temp_dir, "variables.tvs")
+        for filename in ["correct_var_file.txt", "other_var_file.txt"]:
+            var_mgr = symbol_table.VariableManager(path_composer(filename))
+            var_mgr.parse()
+            count = variables_snapshot.convert(path_composer(filename), snapshot_path)
+            self.assertEqual(len(var_mgr._variables), count)
+            snapshot_mgr = symbol_table.SnapshotVariableManager(snapshot_path)
+            snapshot_mgr.parse()
+            self.assertEqual(dict(var_mgr._variables), dict(snapshot_mgr._variables))
+
+    def test_unknown_format(self):
+        """
+        Tests that the formats that are not known raise an exception.
+        """
+        with self.assertRaises(ValueError):
+            variables_snapshot.convert(path_composer("correct_var_file.txt"), os.path.join(self.temp_dir, "x.tvs"),
+                                       "yaml")
+
+
+if __name__ == '__main__':
+    unittest.main()